@@ -0,0 +1,54 @@
+"""
+Measures how removing a student, together with its grades, scales with the number of grades of the student
+and with the number of grades stored in all.
+Run from the Assignment09 directory: python -m benchmarks.BenchmarkCascadeDelete
+"""
+from datetime import date
+from time import perf_counter
+
+from logic.ControllerWrapper import ControllerWrapper
+from model.Assignment import Assignment
+from model.Grade import Grade
+from model.Student import Student
+from repository.RepositoryWrapper import RepositoryWrapper
+
+
+def benchmarkRemoveStudent(storageType: str, totalGrades: int, studentGrades: int) -> float:
+    """
+    Fills the repositories with students having the given number of grades each, then removes one student
+    :return: The time spent removing the student, in seconds
+    """
+    repositoryWrapper = RepositoryWrapper(storageType, 'students', 'grades', 'assignments')
+    studentNumber = totalGrades // studentGrades
+    repositoryWrapper.getRepository(Student).addItems(
+        [Student(studentId, 'Student', 911) for studentId in range(studentNumber)]
+    )
+    repositoryWrapper.getRepository(Assignment).addItems(
+        [Assignment(assignmentId, 'Project', date(2018, 10, 2)) for assignmentId in range(studentGrades)]
+    )
+    repositoryWrapper.getRepository(Grade).addItems(
+        [Grade(studentId, assignmentId, 10) for studentId in range(studentNumber)
+         for assignmentId in range(studentGrades)]
+    )
+    controllerWrapper = ControllerWrapper(repositoryWrapper, date(2018, 11, 18))
+
+    start = perf_counter()
+    controllerWrapper.getStudentController().removeStudent(studentNumber // 2)
+    removeTime = perf_counter() - start
+    repositoryWrapper.close()
+    return removeTime
+
+
+def run():
+    print("Storage - Total grades - Student grades - Remove (ms) - Per grade (us)")
+    for storageType in ["memory", "sqlite"]:
+        for totalGrades in [100000, 400000]:
+            for studentGrades in [100, 400, 1600]:
+                removeTime = benchmarkRemoveStudent(storageType, totalGrades, studentGrades)
+                print("{} - {:d} - {:d} - {:.2f} - {:.2f}".format(
+                    storageType, totalGrades, studentGrades, removeTime * 1000, removeTime / studentGrades * 1e6
+                ))
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,55 @@
+"""
+Compares the memory needed to hold grades with the previous, dictionary based Grade class,
+the __slots__ based Grade class and the tuple based GradeRecord.
+Run from the Assignment09 directory: python -m benchmarks.BenchmarkModel [count]
+"""
+import sys
+import tracemalloc
+from time import perf_counter
+
+from model.Grade import Grade, GradeRecord
+
+
+class LegacyGrade:
+    """
+    The previous implementation of Grade, kept as a reference
+    """
+
+    def __init__(self, studentId: int, assignmentId: int, grade: int = None):
+        self.__studentId = studentId
+        self.__assignmentId = assignmentId
+        self.__grade = grade
+
+
+def measure(build) -> tuple:
+    """
+    :return: The time spent building the grades and the memory they hold, in bytes
+    """
+    tracemalloc.start()
+    start = perf_counter()
+    grades = build()
+    buildTime = perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del grades
+    return buildTime, memory
+
+
+def run(count: int):
+    # Keys are built from small integers, which are shared and therefore do not count towards the measured memory
+    keys = [(i % 1000, i // 1000 % 1000, i % 10 + 1) for i in range(count)]
+    builds = [
+        ("Previous Grade (__dict__)", lambda: [LegacyGrade(*key) for key in keys]),
+        ("Grade (__slots__)", lambda: [Grade(*key) for key in keys]),
+        ("GradeRecord (namedtuple)", lambda: [GradeRecord(*key) for key in keys])
+    ]
+
+    print("{:d} grades".format(count))
+    print("Representation - Build (s) - Memory (MB) - Bytes per grade")
+    for name, build in builds:
+        buildTime, memory = measure(build)
+        print("{} - {:.3f} - {:.1f} - {:.0f}".format(name, buildTime, memory / 2 ** 20, memory / count))
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
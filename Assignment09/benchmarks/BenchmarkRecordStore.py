@@ -0,0 +1,59 @@
+"""
+Compares the record file store with the pickled binary store for a large number of grades:
+the time to write them all, to open the file and look one grade up, and to update one grade.
+Run from the Assignment09 directory: python -m benchmarks.BenchmarkRecordStore [count]
+"""
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+from model.Grade import Grade
+from repository.BinaryRepository import BinaryRepository
+from repository.FlushPolicy import CloseFlush
+from repository.RecordRepository import RecordRepository
+
+
+def measure(createRepository, fileName: str, grades: list) -> tuple:
+    """
+    :return: The time spent writing the grades, opening the file and reading one grade, updating one grade,
+    in seconds, and the size of the file in bytes
+    """
+    repository = createRepository(True)
+    start = perf_counter()
+    repository.addItems(grades)
+    repository.close()
+    writeTime = perf_counter() - start
+
+    repository = createRepository(False)
+    start = perf_counter()
+    repository.getItem(Grade(len(grades) // 2000, 100))
+    openTime = perf_counter() - start
+
+    start = perf_counter()
+    repository.updateItem(Grade(len(grades) // 2000, 100, 1))
+    updateTime = perf_counter() - start
+    repository.close()
+    return writeTime, openTime, updateTime, os.path.getsize(fileName)
+
+
+def run(count: int):
+    grades = [Grade(i // 1000, i % 1000, i % 10 + 1) for i in range(count)]
+    with tempfile.TemporaryDirectory() as directory:
+        pickleFile = os.path.join(directory, 'grades.pickle')
+        recordFile = os.path.join(directory, 'grades.records')
+        stores = {
+            "pickle": (lambda cached: BinaryRepository(Grade, pickleFile, CloseFlush() if cached else None),
+                       pickleFile),
+            "record": (lambda cached: RecordRepository(Grade, recordFile), recordFile)
+        }
+        print("Store - Write all (s) - Open and read one (s) - Update one (ms) - File size (MB)")
+        for name, (createRepository, fileName) in stores.items():
+            writeTime, openTime, updateTime, size = measure(createRepository, fileName, grades)
+            print("{} - {:.2f} - {:.2f} - {:.3f} - {:.1f}".format(
+                name, writeTime, openTime, updateTime * 1000, size / 2 ** 20
+            ))
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
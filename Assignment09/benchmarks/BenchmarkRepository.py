@@ -0,0 +1,43 @@
+"""
+Measures how the in-memory repository scales with the number of items.
+Run from the Assignment09 directory: python -m benchmarks.BenchmarkRepository
+"""
+from time import perf_counter
+
+from model.Grade import Grade
+from repository.Repository import Repository
+
+
+def benchmarkInsertAndLookup(itemNumber: int):
+    """
+    Inserts the given number of grades in an empty repository, then looks each of them up
+    :return: The time spent inserting and the time spent looking up, in seconds
+    """
+    grades = [Grade(i // 100, i % 100, 10) for i in range(itemNumber)]
+    repository = Repository(Grade)
+
+    start = perf_counter()
+    for grade in grades:
+        repository.addItem(grade)
+    insertTime = perf_counter() - start
+
+    start = perf_counter()
+    for grade in grades:
+        repository.getItem(grade)
+    lookupTime = perf_counter() - start
+
+    return insertTime, lookupTime
+
+
+def run():
+    print("Items - Insert (s) - Lookup (s) - Insert per item (us) - Lookup per item (us)")
+    for itemNumber in [12500, 25000, 50000, 100000]:
+        insertTime, lookupTime = benchmarkInsertAndLookup(itemNumber)
+        print("{:d} - {:.3f} - {:.3f} - {:.2f} - {:.2f}".format(
+            itemNumber, insertTime, lookupTime,
+            insertTime / itemNumber * 1e6, lookupTime / itemNumber * 1e6
+        ))
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,61 @@
+"""
+Compares the key-based merge sort of sortList with the previous comparator-based shell sort.
+Run from the Assignment09 directory: python -m benchmarks.BenchmarkSort [sizes...]
+"""
+import random
+import sys
+from time import perf_counter
+from typing import List
+
+from lib.CustomComponents import sortList
+
+
+def shellSortList(list: List, compare: callable) -> List:
+    """
+    The previous implementation of sortList, kept as a reference
+    """
+    length = len(list)
+    gap = length // 2
+
+    while gap > 0:
+
+        for i in range(gap, length):
+
+            comparedElement = list[i]
+
+            j = i
+            while j >= gap and compare(list[j - gap], comparedElement) == 1:
+                list[j] = list[j - gap]
+                j -= gap
+            list[j] = comparedElement
+        gap //= 2
+
+    return list
+
+
+def compareIntegers(a, b):
+    if a == b:
+        return 0
+    if a > b:
+        return 1
+    return -1
+
+
+def measure(function, *arguments, **keywordArguments) -> float:
+    start = perf_counter()
+    function(*arguments, **keywordArguments)
+    return perf_counter() - start
+
+
+def run(sizes: List[int]):
+    print("Items - Shell sort with comparator (s) - Merge sort with key (s) - Merge sort with comparator adapter (s)")
+    for size in sizes:
+        items = [random.randint(0, size) for _ in range(size)]
+        shellTime = measure(shellSortList, items[:], compareIntegers)
+        keyTime = measure(sortList, items[:], key=lambda item: item)
+        adapterTime = measure(sortList, items[:], compareIntegers)
+        print("{:d} - {:.3f} - {:.3f} - {:.3f}".format(size, shellTime, keyTime, adapterTime))
+
+
+if __name__ == '__main__':
+    run([int(size) for size in sys.argv[1:]] or [10000, 100000, 1000000])
@@ -0,0 +1,88 @@
+"""
+Measures how the cost of a single change grows with the number of stored items for every file backend.
+Run from the Assignment09 directory: python -m benchmarks.BenchmarkStorage
+"""
+import os
+import tempfile
+from time import perf_counter
+
+from model.Grade import Grade
+from repository.BinaryRepository import BinaryRepository
+from repository.FlushPolicy import CloseFlush
+from repository.JournalRepository import JournalRepository
+from repository.JsonLinesRepository import JsonLinesRepository
+from repository.JsonRepository import JsonRepository
+from repository.SQLiteRepository import SQLiteRepository
+from repository.TextFileRepository import TextFileRepository
+from utils.SQLiteConnector import SQLiteConnector
+
+
+def createRepositories(fileName: str) -> dict:
+    """
+    :return: Functions which create the repositories of every backend, optionally cached until closed
+    """
+    return {
+        "text": lambda cached: TextFileRepository(Grade, fileName + '.csv', CloseFlush() if cached else None),
+        "json": lambda cached: JsonRepository(Grade, fileName + '.json', CloseFlush() if cached else None),
+        "jsonl": lambda cached: JsonLinesRepository(Grade, fileName + '.jsonl', CloseFlush() if cached else None),
+        "binary": lambda cached: BinaryRepository(Grade, fileName + '.bin', CloseFlush() if cached else None),
+        "journal": lambda cached: JournalRepository(Grade, fileName + '.journal'),
+        "sqlite": lambda cached: SQLiteRepository(Grade, 'grades', SQLiteConnector(fileName + '.db'))
+    }
+
+
+def benchmarkChange(createRepository, itemNumber: int, changes: int) -> float:
+    """
+    Stores the given number of grades, then updates some of them one by one
+    :return: The average time spent on an update, in seconds
+    """
+    repository = createRepository(True)
+    with repository.batch():
+        for i in range(itemNumber):
+            repository.addItem(Grade(i // 100, i % 100, 10))
+    repository.close()
+
+    repository = createRepository(False)
+    repository.getItem(Grade(0, 0))
+    start = perf_counter()
+    for i in range(changes):
+        repository.updateItem(Grade(i // 100, i % 100, 5))
+    changeTime = perf_counter() - start
+    repository.close()
+    return changeTime / changes
+
+
+def benchmarkBatch(createRepository, itemNumber: int) -> float:
+    """
+    Adds the given number of grades to an empty repository inside a single batch
+    :return: The time spent, in seconds
+    """
+    repository = createRepository(False)
+    start = perf_counter()
+    with repository.batch():
+        for i in range(itemNumber):
+            repository.addItem(Grade(i // 100, i % 100, 10))
+    batchTime = perf_counter() - start
+    repository.close()
+    return batchTime
+
+
+def run():
+    print("Items - " + " - ".join("{} (ms)".format(name) for name in createRepositories('')))
+    for itemNumber in [1000, 10000, 100000]:
+        with tempfile.TemporaryDirectory() as directory:
+            repositories = createRepositories(os.path.join(directory, 'grades'))
+            times = [benchmarkChange(createRepository, itemNumber, 20) for createRepository in repositories.values()]
+            print("{:d} - ".format(itemNumber) + " - ".join("{:.3f}".format(time * 1000) for time in times))
+
+    print("Adding items in one batch")
+    print("Items - " + " - ".join("{} (ms)".format(name) for name in createRepositories('')))
+    for itemNumber in [100, 1000]:
+        with tempfile.TemporaryDirectory() as directory:
+            repositories = createRepositories(os.path.join(directory, 'grades'))
+            times = [benchmarkBatch(createRepository, itemNumber) for createRepository in repositories.values()]
+            print("{:d} - ".format(itemNumber) + " - ".join("{:.3f}".format(time * 1000) for time in times))
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,104 @@
+"""
+Compares the memory used and the iteration speed of Vector with the previous, list-and-cursor based class.
+Run from the Assignment09 directory: python -m benchmarks.BenchmarkVector [size]
+"""
+import sys
+import tracemalloc
+from time import perf_counter
+
+from lib.CustomComponents import Vector
+
+
+class LegacyVector:
+    """
+    The previous implementation of Vector, kept as a reference
+    """
+
+    def __init__(self, itemType: type):
+        self.__items = []
+        self.__len = 0
+        self.__itemType = itemType
+        self.__pointer = 0
+
+    def __len__(self):
+        return self.__len
+
+    def __getitem__(self, key):
+        if type(key) is not int:
+            raise TypeError
+        if key < 0 or key >= self.__len:
+            raise IndexError
+        return self.__items[key]
+
+    def addItem(self, item):
+        if type(item) is not self.__itemType:
+            raise TypeError
+        self.__items.append(item)
+        self.__len += 1
+
+    def __iter__(self):
+        self.__pointer = 0
+        return self
+
+    def __next__(self):
+        if self.__pointer == self.__len:
+            raise StopIteration
+        item = self.__items[self.__pointer]
+        self.__pointer += 1
+        return item
+
+
+def measureBuild(build) -> tuple:
+    """
+    :return: The built vector, the time spent building it and the memory it holds
+    """
+    tracemalloc.start()
+    start = perf_counter()
+    vector = build()
+    buildTime = perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return vector, buildTime, memory
+
+
+def measureIteration(vector) -> float:
+    start = perf_counter()
+    for _ in vector:
+        pass
+    return perf_counter() - start
+
+
+def measureIndexing(vector) -> float:
+    start = perf_counter()
+    for i in range(len(vector)):
+        unused = vector[i]
+    return perf_counter() - start
+
+
+def run(size: int):
+    def values():
+        return (float(i) for i in range(size))
+
+    def buildLegacy():
+        vector = LegacyVector(float)
+        for value in values():
+            vector.addItem(value)
+        return vector
+
+    builds = [
+        ("Previous Vector, addItem", buildLegacy),
+        ("Vector, extend", lambda: Vector(float, values())),
+        ("Compact Vector, extend", lambda: Vector(float, values(), compact=True))
+    ]
+
+    print("{:d} floats".format(size))
+    print("Vector - Build (s) - Memory (MB) - Iteration (s) - Indexing (s)")
+    for name, build in builds:
+        vector, buildTime, memory = measureBuild(build)
+        print("{} - {:.3f} - {:.1f} - {:.3f} - {:.3f}".format(
+            name, buildTime, memory / 2 ** 20, measureIteration(vector), measureIndexing(vector)
+        ))
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
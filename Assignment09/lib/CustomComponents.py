@@ -1,17 +1,41 @@
-from typing import List
+import pickle
+from array import array
+from bisect import bisect_right
+from functools import cmp_to_key
+from typing import List, Iterable
 from unittest import TestCase
 
 
 class Vector:
     """
-    Custom vector class
+    Custom vector class.
+    Vectors of ints or floats can be created with compact=True, in which case the items are kept in an array
+    of machine values instead of a list of objects.
     """
 
-    def __init__(self, itemType: type):
-        self.__items = []
-        self.__len = 0
+    __slots__ = ('__items', '__itemType')
+
+    __arrayTypeCodes = {
+        int: 'q',
+        float: 'd'
+    }
+
+    def __init__(self, itemType: type, items: Iterable = None, compact: bool = False):
+        """
+        :param itemType: The type of items
+        :param items: Optional items the vector is initialized with
+        :param compact: If True, the items are kept in an array. Only available for int and float
+        :raises: TypeError if compact is requested for another item type or an item is not of the specified type
+        """
         self.__itemType = itemType
-        self.__pointer = 0
+        if compact:
+            if itemType not in Vector.__arrayTypeCodes:
+                raise TypeError
+            self.__items = array(Vector.__arrayTypeCodes[itemType])
+        else:
+            self.__items = []
+        if items is not None:
+            self.extend(items)
 
     @staticmethod
     def fromList(itemList: List, itemType: type):
@@ -21,10 +45,7 @@ class Vector:
         :param itemType: The type of items
         :return: The created vector
         """
-        vector = Vector(itemType)
-        for item in itemList:
-            vector.addItem(item)
-        return vector
+        return Vector(itemType, itemList)
 
     @staticmethod
     def toList(vector):
@@ -33,22 +54,31 @@ class Vector:
         :param vector: The vector of items
         :return: The created list
         """
-        return [item for item in vector]
+        return list(vector)
+
+    def isCompact(self) -> bool:
+        return type(self.__items) is array
 
     def __len__(self):
-        return self.__len
+        return len(self.__items)
 
     def __getitem__(self, key):
+        if type(key) is slice:
+            return Vector(self.__itemType, self.__items[key], self.isCompact())
         if type(key) is not int:
             raise TypeError
-        if key < 0 or key >= self.__len:
+        if key < 0:
             raise IndexError
         return self.__items[key]
 
     def __setitem__(self, key, item):
+        if type(key) is slice:
+            items = self.__checkedItems(item)
+            self.__items[key] = array(self.__items.typecode, items) if self.isCompact() else items
+            return
         if type(key) is not int:
             raise TypeError
-        if key < 0 or key >= self.__len:
+        if key < 0:
             raise IndexError
         if type(item) is not self.__itemType:
             raise TypeError
@@ -56,13 +86,18 @@ class Vector:
         self.__items[key] = item
 
     def __delitem__(self, key):
-        if type(key) is not int:
+        if type(key) is not int and type(key) is not slice:
             raise TypeError
-        if key < 0 or key >= self.__len:
+        if type(key) is int and key < 0:
             raise IndexError
 
         del self.__items[key]
-        self.__len -= 1
+
+    def __contains__(self, item):
+        return item in self.__items
+
+    def __iter__(self):
+        return iter(self.__items)
 
     def addItem(self, item):
         """
@@ -73,65 +108,184 @@ class Vector:
         if type(item) is not self.__itemType:
             raise TypeError
         self.__items.append(item)
-        self.__len += 1
 
-    def __iter__(self):
-        self.__pointer = 0
-        return self
+    def extend(self, items: Iterable):
+        """
+        Adds all the given items to the vector. If one of them is not of the specified type, none is added
+        :param items: Any iterable of items. Items coming from a vector of the same type are not checked again
+        :raises: TypeError if an item is not of the specified type
+        """
+        self.__items.extend(self.__checkedItems(items))
+
+    def __checkedItems(self, items: Iterable):
+        if type(items) is Vector and items.__itemType is self.__itemType:
+            return items.__items
+        items = items if type(items) is list else list(items)
+        itemType = self.__itemType
+        for item in items:
+            if type(item) is not itemType:
+                raise TypeError
+        return items
+
+    def __getstate__(self):
+        return self.__itemType, self.__items
 
-    def __next__(self):
-        if self.__pointer == self.__len:
-            raise StopIteration
-        item = self.__items[self.__pointer]
-        self.__pointer += 1
-        return item
+    def __setstate__(self, state):
+        if type(state) is dict:
+            # Written by the previous version of the class, which kept its attributes in a dictionary
+            state = state['_Vector__itemType'], state['_Vector__items']
+        self.__itemType, self.__items = state
 
 
-def sortList(list: List, compare: callable) -> List:
+def sortList(list: List, compare: callable = None, key: callable = None, reverse: bool = False) -> List:
     """
-    Sorts the list by the criteria imposed by the compare function
+    Sorts the list with a stable natural merge sort. The key of every element is computed once,
+    after which the elements are ordered by comparing their keys directly.
     :param list: A list of elements - will be modified
-    :param compare: A function that compares two elements and returns the result accordingly:
-    1 -> The first item is greater than the second one
+    :param compare: Optional function that compares two elements and returns the result accordingly:
+    positive -> The first item is greater than the second one
     0 -> The items are equal
-    -1 -> The second item is greater than the first one
+    negative -> The second item is greater than the first one
+    :param key: Optional function that returns the value by which an element is ordered
+    :param reverse: If True, the elements are sorted in descending order, keeping equal elements in their original order
     :return: The sorted list
     """
-    length = len(list)
-    gap = length // 2
-
-    while gap > 0:
+    if compare is not None:
+        compareKey = cmp_to_key(compare)
+        key = compareKey if key is None else (lambda item, itemKey=key: compareKey(itemKey(item)))
+
+    items = list[::-1] if reverse else list[:]
+    keys = [key(item) for item in items] if key is not None else items[:]
+    _mergeSort(keys, items)
+    if reverse:
+        items.reverse()
+    list[:] = items
+    return list
 
-        for i in range(gap, length):
 
-            comparedElement = list[i]
+_MIN_RUN = 32
 
-            j = i
-            while j >= gap and compare(list[j - gap], comparedElement) == 1:
-                list[j] = list[j - gap]
-                j -= gap
-            list[j] = comparedElement
-        gap //= 2
 
-    return list
+def _mergeSort(keys: List, items: List):
+    """
+    Sorts both lists by the values in keys, moving the items along with their keys
+    """
+    length = len(keys)
+    runEnds = []
+    start = 0
+    while start < length:
+        end = _findRun(keys, items, start, length)
+        forcedEnd = min(start + _MIN_RUN, length)
+        if end < forcedEnd:
+            _insertionSort(keys, items, start, end, forcedEnd)
+            end = forcedEnd
+        runEnds.append(end)
+        start = end
+
+    while len(runEnds) > 1:
+        mergedRunEnds = []
+        start = 0
+        for i in range(0, len(runEnds) - 1, 2):
+            _merge(keys, items, start, runEnds[i], runEnds[i + 1])
+            start = runEnds[i + 1]
+            mergedRunEnds.append(start)
+        if len(runEnds) % 2 == 1:
+            mergedRunEnds.append(runEnds[-1])
+        runEnds = mergedRunEnds
+
+
+def _findRun(keys: List, items: List, start: int, length: int) -> int:
+    """
+    Finds the longest ordered run beginning at start. Strictly descending runs are reversed in place.
+    :return: The end of the run (exclusive)
+    """
+    end = start + 1
+    if end == length:
+        return end
+    if keys[end] < keys[start]:
+        while end + 1 < length and keys[end + 1] < keys[end]:
+            end += 1
+        end += 1
+        keys[start:end] = keys[start:end][::-1]
+        items[start:end] = items[start:end][::-1]
+        return end
+    while end < length and not keys[end] < keys[end - 1]:
+        end += 1
+    return end
+
+
+def _insertionSort(keys: List, items: List, start: int, sortedEnd: int, end: int):
+    """
+    Extends the sorted range [start, sortedEnd) up to end with a binary insertion sort
+    """
+    for position in range(sortedEnd, end):
+        itemKey = keys[position]
+        target = bisect_right(keys, itemKey, start, position)
+        if target != position:
+            item = items[position]
+            keys[target + 1:position + 1] = keys[target:position]
+            items[target + 1:position + 1] = items[target:position]
+            keys[target] = itemKey
+            items[target] = item
+
+
+def _merge(keys: List, items: List, start: int, middle: int, end: int):
+    """
+    Merges the sorted ranges [start, middle) and [middle, end), taking from the left one on equal keys
+    """
+    if not keys[middle] < keys[middle - 1]:
+        return
+    leftKeys = keys[start:middle]
+    leftItems = items[start:middle]
+    leftLength = middle - start
+    left = 0
+    right = middle
+    destination = start
+    while left < leftLength and right < end:
+        if keys[right] < leftKeys[left]:
+            keys[destination] = keys[right]
+            items[destination] = items[right]
+            right += 1
+        else:
+            keys[destination] = leftKeys[left]
+            items[destination] = leftItems[left]
+            left += 1
+        destination += 1
+    if left < leftLength:
+        keys[destination:end] = leftKeys[left:]
+        items[destination:end] = leftItems[left:]
 
 
 def filterList(list: List, accepted: callable) -> List:
     """
-    Filters the list according to the acceptance function provided
+    Filters the list according to the acceptance function provided.
+    The accepted elements are moved towards the front of the list, which is then truncated once.
     :param list: A list of elements - will be modified
     :param accepted: A function that establishes if an element should be kept in the list or not
     :return: The filtered list
     """
-    i = 0
-    while i < len(list):
-        if accepted(list[i]):
-            i += 1
-        else:
-            del list[i]
+    writePosition = 0
+    for readPosition in range(len(list)):
+        element = list[readPosition]
+        if accepted(element):
+            if writePosition != readPosition:
+                list[writePosition] = element
+            writePosition += 1
+    del list[writePosition:]
     return list
 
 
+def filterIter(iterable, accepted: callable):
+    """
+    Lazily yields the elements accepted by the acceptance function, without modifying the iterable
+    :param iterable: Any iterable of elements
+    :param accepted: A function that establishes if an element should be yielded or not
+    """
+    for element in iterable:
+        if accepted(element):
+            yield element
+
+
 class TestComponents(TestCase):
 
     def setUp(self):
@@ -220,6 +374,22 @@ class TestComponents(TestCase):
 
         self.assertEqual(sortList(integerList, compareFunction), [1, 2, 3, 4, 5])
 
+    def testSortKey(self):
+        integerList = [(i * 7919) % 1000 for i in range(1000)]
+        self.assertEqual(sortList(integerList[:], key=lambda a: a), sorted(integerList))
+        self.assertEqual(sortList(integerList[:], reverse=True), sorted(integerList, reverse=True))
+
+        pairList = [(i % 3, i) for i in range(100)]
+        self.assertEqual(sortList(pairList[:], key=lambda pair: pair[0]), sorted(pairList, key=lambda pair: pair[0]))
+        self.assertEqual(sortList(pairList[:], key=lambda pair: pair[0], reverse=True),
+                         sorted(pairList, key=lambda pair: pair[0], reverse=True))
+
+        def compareFirst(a, b):
+            return a[0] - b[0]
+
+        self.assertEqual(sortList(pairList[:], compareFirst), sorted(pairList, key=lambda pair: pair[0]))
+        self.assertEqual(sortList([], key=lambda a: a), [])
+
     def testFilter(self):
         integerList = [5, 4, 3, 2, 1]
 
@@ -227,6 +397,59 @@ class TestComponents(TestCase):
             return a % 2 == 0
 
         self.assertEqual(filterList(integerList, acceptanceFunction), [4, 2])
+        self.assertEqual(integerList, [4, 2])
+
+        integerList = list(range(10000))
+        self.assertIs(filterList(integerList, acceptanceFunction), integerList)
+        self.assertEqual(integerList, list(range(0, 10000, 2)))
+        self.assertEqual(filterList([1, 3], acceptanceFunction), [])
+
+        integerList = [5, 4, 3, 2, 1]
+        self.assertEqual(list(filterIter(integerList, acceptanceFunction)), [4, 2])
+        self.assertEqual(integerList, [5, 4, 3, 2, 1])
+
+    def testSlice(self):
+        self.integerVector.extend([1, 2, 3, 4, 5])
+        self.assertEqual(Vector.toList(self.integerVector[1:3]), [2, 3])
+        self.integerVector[0:2] = [7, 8]
+        self.assertEqual(Vector.toList(self.integerVector), [7, 8, 3, 4, 5])
+        del self.integerVector[3:]
+        self.assertEqual(Vector.toList(self.integerVector), [7, 8, 3])
+        with self.assertRaises(TypeError):
+            self.integerVector[0:1] = ["item"]
+
+    def testExtend(self):
+        self.integerVector.extend(range(3))
+        self.assertEqual(len(self.integerVector), 3)
+        with self.assertRaises(TypeError):
+            self.integerVector.extend([3, "item"])
+        self.assertEqual(len(self.integerVector), 3)
+        self.integerVector.extend(Vector(int, [3, 4]))
+        self.assertEqual(Vector.toList(self.integerVector), [0, 1, 2, 3, 4])
+
+    def testCompact(self):
+        vector = Vector(int, range(5), compact=True)
+        self.assertTrue(vector.isCompact())
+        self.assertEqual(vector[4], 4)
+        vector.addItem(5)
+        self.assertEqual(Vector.toList(vector), [0, 1, 2, 3, 4, 5])
+        self.assertTrue(vector[1:3].isCompact())
+        with self.assertRaises(TypeError):
+            vector.addItem(1.5)
+        with self.assertRaises(TypeError):
+            Vector(str, compact=True)
+
+    def testNestedIteration(self):
+        self.integerVector.extend([1, 2, 3])
+        pairs = [(a, b) for a in self.integerVector for b in self.integerVector]
+        self.assertEqual(len(pairs), 9)
+
+    def testPickle(self):
+        self.stringVector.extend(["a", "b"])
+        vector = pickle.loads(pickle.dumps(self.stringVector))
+        self.assertEqual(Vector.toList(vector), ["a", "b"])
+        with self.assertRaises(TypeError):
+            vector.addItem(1)
 
     def testIterator(self):
         integerList = [5, 4, 3, 2, 1]
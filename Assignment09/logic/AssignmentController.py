@@ -1,5 +1,6 @@
 import datetime
 import random
+from contextlib import nullcontext
 from copy import copy
 from typing import List
 
@@ -14,23 +15,33 @@ from repository.Repository import Repository
 
 class AssignmentController:
 
-    def __init__(self, assignmentRepository: Repository, changesStack: ChangesStack, deleteCallback: callable = None):
+    def __init__(self, assignmentRepository: Repository, changesStack: ChangesStack, deleteCallback: callable = None,
+                 unitOfWork: callable = nullcontext):
+        """
+        :param deleteCallback: Called with the removed assignment, to remove what depends on it
+        :param unitOfWork: Returns a context manager running a removal and its callback as a single unit
+        """
         self.__assignmentRepository = assignmentRepository
         self.__changesStack = changesStack
         self.__deleteCallback = deleteCallback
+        self.__unitOfWork = unitOfWork
 
     def listAssignments(self) -> List[Assignment]:
         """
         Returns a list of assignments sorted in ascending order by their IDs
         """
+        return sortList(self.__assignmentRepository.getItems(), key=lambda assignment: assignment.getAssignmentId())
 
-        def compareAssignmentIds(assignment1, assignment2):
-            id1 = assignment1.getAssignmentId()
-            id2 = assignment2.getAssignmentId()
-            return (id1 - id2) / abs(id1 - id2)
+    def getAssignmentPage(self, offset: int, limit: int, sortField: str = None,
+                          reverse: bool = False) -> List[Assignment]:
+        """
+        Returns at most limit assignments, starting at the offset, in ascending order of their IDs
+        or of the given field (assignmentId, description or deadline)
+        """
+        return self.__assignmentRepository.getPage(offset, limit, sortField, reverse)
 
-        return sortList(
-            self.__assignmentRepository.getItems(), compareAssignmentIds)
+    def countAssignments(self) -> int:
+        return self.__assignmentRepository.count()
 
     def addAssignment(self, assignmentId: int, description: str, deadline: datetime.date) -> Assignment:
         """
@@ -48,13 +59,14 @@ class AssignmentController:
         Removes an assignment from the repository
         """
         assignment = self.findAssignment(assignmentId)
-        self.__assignmentRepository.deleteItem(assignment)
-        self.__changesStack.beginCommit()
-        self.__changesStack.addChange(ChangesStack.ItemRemoved(assignment))
-        if self.__deleteCallback is not None:
-            self.__deleteCallback(assignment)
-        else:
-            self.__changesStack.endCommit()
+        with self.__unitOfWork():
+            self.__assignmentRepository.deleteItem(assignment)
+            self.__changesStack.beginCommit()
+            self.__changesStack.addChange(ChangesStack.ItemRemoved(assignment))
+            if self.__deleteCallback is not None:
+                self.__deleteCallback(assignment)
+            else:
+                self.__changesStack.endCommit()
 
     def findAssignment(self, assignmentId: int) -> Assignment:
         """
@@ -77,10 +89,7 @@ class AssignmentController:
         AssignmentValidator.validateAssignment(newAssignment)
         self.__assignmentRepository.updateItem(newAssignment)
 
-        self.__changesStack.beginCommit()
-        self.__changesStack.addChange(ChangesStack.ItemRemoved(assignment))
-        self.__changesStack.addChange(ChangesStack.ItemAdded(newAssignment))
-        self.__changesStack.endCommit()
+        self.__changesStack.addChange(ChangesStack.ItemUpdated(assignment, newAssignment), newCommit=True)
 
     def addRandomAssignments(self, number):
         descriptionTitles = [
@@ -134,6 +143,7 @@ class AssignmentController:
             "drawings"
         ]
 
+        assignments = []
         for i in range(number):
             descriptionTitle = random.choice(descriptionTitles)
             descriptionSubject = random.choice(descriptionSubjects)
@@ -143,7 +153,14 @@ class AssignmentController:
                           " " + descriptionNoun
 
             assignmentDate = self.randomDate(datetime.date(2018, 1, 1), datetime.date(2020, 1, 1))
-            self.addAssignment(i, description, assignmentDate)
+            assignment = Assignment(i, description, assignmentDate)
+            AssignmentValidator.validateAssignment(assignment)
+            assignments.append(assignment)
+        self.__assignmentRepository.addItems(assignments)
+        self.__changesStack.beginCommit()
+        for assignment in assignments:
+            self.__changesStack.addChange(ChangesStack.ItemAdded(assignment))
+        self.__changesStack.endCommit()
 
     @staticmethod
     def randomDate(start, end):
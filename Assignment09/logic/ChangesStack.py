@@ -1,10 +1,25 @@
+import json
+import sys
 from copy import copy
 from typing import List
 
+from logic.HistoryStore import HistoryStore
+from model.Assignment import Assignment
+from model.Grade import Grade
+from model.Student import Student
+from utils.JSONConverter import JSONConverter
+
 
 class ChangesStack:
     """
-    The stack of changes committed to the repository
+    The stack of changes committed to the repository.
+    Commits are kept in a ring buffer of a fixed number of slots, optionally also limited to an estimated number
+    of bytes; the oldest commits are dropped to make room for new ones. Committing after an undo drops the undone
+    commits by moving the end of the stack, instead of copying the rest of it.
+    Changes hold immutable records of the items, and an update only holds the old values of the fields it changed.
+    With a history store, every commit is also written to the disk, and the ring buffer holds a window of the history:
+    older commits are read back one at a time as they are undone, and newer ones as they are redone.
+    The stored commits are encoded as JSON, and the items read back are validated like those of the JSON files.
     """
 
     class Change:
@@ -13,10 +28,30 @@ class ChangesStack:
         """
 
         def __init__(self, item):
-            self.__item = copy(item)
+            self.__itemType = type(item)
+            # Records are immutable, so they are kept instead of copies of the items
+            self.__record = item.toRecord() if hasattr(item, "toRecord") else copy(item)
+
+        def getItemType(self) -> type:
+            return self.__itemType
 
         def getItem(self):
-            return self.__item
+            """
+            Returns a new copy of the changed item
+            """
+            return self._toItem(self.__record)
+
+        def getSize(self) -> int:
+            """
+            Returns an estimate of the memory held by the change, in bytes
+            """
+            return sys.getsizeof(self) + ChangesStack._getValueSize(self.__record)
+
+        def _getRecord(self):
+            return self.__record
+
+        def _toItem(self, record):
+            return self.__itemType.fromRecord(record) if hasattr(self.__itemType, "fromRecord") else copy(record)
 
     class ItemAdded(Change):
         pass
@@ -24,25 +59,93 @@ class ChangesStack:
     class ItemRemoved(Change):
         pass
 
-    def __init__(self, changesHandler):
-        self.__changesStack = []
-        self.__currentCommit = []
-        self.__currentIndex = -1
+    class ItemUpdated(Change):
+        """
+        An update of an item, holding the updated item and the old values of the fields which changed
+        """
+
+        def __init__(self, oldItem, newItem):
+            ChangesStack.Change.__init__(self, newItem)
+            oldRecord = oldItem.toRecord()
+            self.__oldValues = {field: oldValue for field, oldValue, newValue
+                                in zip(oldRecord._fields, oldRecord, self._getRecord()) if oldValue != newValue}
+
+        def getOldItem(self):
+            """
+            Returns a new copy of the item as it was before the update
+            """
+            return self._toItem(self._getRecord()._replace(**self.__oldValues))
+
+        def getSize(self) -> int:
+            return ChangesStack.Change.getSize(self) + ChangesStack._getValueSize(self.__oldValues)
+
+    def __init__(self, changesHandler, maxDepth: int = 1000, maxBytes: int = 0, historyStore: HistoryStore = None):
+        """
+        :param maxDepth: The largest number of commits kept in memory
+        :param maxBytes: The largest estimated size of the commits kept in memory, in bytes, or 0 for no limit.
+        The last commit is kept even if it is larger.
+        :param historyStore: The store keeping the commits on the disk, if any. Without one, the commits which do
+        not fit in memory are lost; with one, they are read back when they are undone or redone.
+        """
         self.__changesHandler = changesHandler
+        self.__maxDepth = max(1, maxDepth)
+        self.__maxBytes = maxBytes
+        self.__historyStore = historyStore
+        self.__grouping = False
+        self.__reset()
+        if historyStore is not None:
+            self.__load()
 
     def beginCommit(self):
         """
         Initializes a new commit
         """
-        self.__currentCommit = []
+        if not self.__grouping:
+            self.__currentCommit = []
 
     def endCommit(self):
         """
-        Appends the current commit to the changes stack
+        Appends the current commit to the changes stack, dropping the undone commits and, if needed, the oldest ones
+        """
+        if not self.__grouping:
+            self.__storeCommit()
+
+    def beginGroup(self):
+        """
+        Starts gathering the changes of the commits made until endGroup into a single commit
+        """
+        self.__grouping = True
+        self.__currentCommit = []
+
+    def endGroup(self):
+        """
+        Appends the gathered changes to the changes stack as a single commit, if there are any
+        """
+        self.__grouping = False
+        if len(self.__currentCommit) > 0:
+            self.__storeCommit()
+        self.__currentCommit = []
+
+    def abortGroup(self) -> List[Change]:
+        """
+        Stops gathering changes without committing them
+        :return: The changes gathered since beginGroup
         """
-        self.__changesStack = self.__changesStack[:self.__currentIndex + 1]
-        self.__changesStack.append(self.__currentCommit)
-        self.__currentIndex += 1
+        changes = self.__currentCommit if self.__grouping else []
+        self.__grouping = False
+        self.__currentCommit = []
+        return changes
+
+    def __storeCommit(self):
+        if self.__historyStore is not None:
+            self.__historyStore.append(ChangesStack.__encodeCommit(self.__currentCommit))
+        self.__dropUndone()
+        if self.__count == self.__maxDepth:
+            self.__dropOldest()
+        self.__pushNewest(self.__currentCommit)
+        self.__applied += 1
+        while 0 < self.__maxBytes < self.__size and self.__count > 1:
+            self.__dropOldest()
 
     def addChange(self, change: Change, newCommit=False):
         """
@@ -61,11 +164,14 @@ class ChangesStack:
         Undoes the last operation
         :return: True if succeeded, False otherwise
         """
-        if self.__currentIndex == -1:
-            return False
-        commit: List[ChangesStack.Change] = self.__changesStack[self.__currentIndex]
+        if self.__applied == 0:
+            if self.__historyStore is None or self.__base <= self.__historyStore.getFirst():
+                return False
+            self.__readOlder()
+        commit: List[ChangesStack.Change] = self.__commits[self.__slot(self.__applied - 1)]
         self.__changesHandler.handleChanges(commit, reverse=True)
-        self.__currentIndex -= 1
+        self.__applied -= 1
+        self.__saveApplied()
         return True
 
     def redo(self) -> bool:
@@ -73,20 +179,160 @@ class ChangesStack:
         Reverses the last undo operation
         :return: True if succeeded, False otherwise
         """
-        if self.__currentIndex == len(self.__changesStack) - 1:
-            return False
-        commit: List[ChangesStack.Change] = self.__changesStack[self.__currentIndex + 1]
+        if self.__applied == self.__count:
+            if self.__historyStore is None or self.__base + self.__count == self.__historyStore.getCount():
+                return False
+            self.__readNewer()
+        commit: List[ChangesStack.Change] = self.__commits[self.__slot(self.__applied)]
         self.__changesHandler.handleChanges(commit, reverse=False)
-        self.__currentIndex += 1
+        self.__applied += 1
+        self.__saveApplied()
         return True
 
     def clearStack(self):
         """
         Clears the changes stack
         """
-        self.__changesStack = []
+        self.__reset()
+        if self.__historyStore is not None:
+            self.__historyStore.clear()
+
+    def getDepth(self) -> int:
+        """
+        Returns the number of commits which can be undone
+        """
+        if self.__historyStore is None:
+            return self.__applied
+        return self.__base + self.__applied - self.__historyStore.getFirst()
+
+    def getSize(self) -> int:
+        """
+        Returns the estimated size of the commits kept in memory, in bytes
+        """
+        return self.__size
+
+    def __reset(self):
+        self.__commits = [None] * self.__maxDepth
+        self.__commitSizes = [0] * self.__maxDepth
         self.__currentCommit = []
-        self.__currentIndex = -1
+        # The slot of the oldest commit in memory, its position in the whole history,
+        # the number of commits in memory and the number of them which are applied
+        self.__start = 0
+        self.__base = 0
+        self.__count = 0
+        self.__applied = 0
+        self.__size = 0
+
+    def __load(self):
+        # Only the last applied commits are read, the others are read once they are undone or redone
+        self.__base = self.__historyStore.getApplied()
+        while self.__base > self.__historyStore.getFirst() and self.__count < self.__maxDepth:
+            self.__pushOldest(self.__readCommit(self.__base - 1))
+            if 0 < self.__maxBytes < self.__size and self.__count > 1:
+                self.__dropOldest()
+                break
+
+    def __readOlder(self):
+        if self.__count == self.__maxDepth:
+            self.__dropNewest()
+        self.__pushOldest(self.__readCommit(self.__base - 1))
+        while 0 < self.__maxBytes < self.__size and self.__count > 1:
+            self.__dropNewest()
+
+    def __readNewer(self):
+        if self.__count == self.__maxDepth:
+            self.__dropOldest()
+        self.__pushNewest(self.__readCommit(self.__base + self.__count))
+        while 0 < self.__maxBytes < self.__size and self.__count > 1:
+            self.__dropOldest()
+
+    def __readCommit(self, position: int) -> list:
+        return ChangesStack.__decodeCommit(self.__historyStore.read(position))
+
+    def __saveApplied(self):
+        if self.__historyStore is not None:
+            self.__historyStore.setApplied(self.__base + self.__applied)
+
+    def __slot(self, position: int) -> int:
+        return (self.__start + position) % self.__maxDepth
+
+    def __pushNewest(self, commit: list):
+        slot = self.__slot(self.__count)
+        self.__commits[slot] = commit
+        self.__commitSizes[slot] = sum(change.getSize() for change in commit)
+        self.__size += self.__commitSizes[slot]
+        self.__count += 1
+
+    def __pushOldest(self, commit: list):
+        self.__start = self.__slot(-1)
+        self.__commits[self.__start] = commit
+        self.__commitSizes[self.__start] = sum(change.getSize() for change in commit)
+        self.__size += self.__commitSizes[self.__start]
+        self.__base -= 1
+        self.__count += 1
+        self.__applied += 1
+
+    def __dropUndone(self):
+        # Each commit is released at most once, so this takes constant time for every commit made
+        for position in range(self.__applied, self.__count):
+            slot = self.__slot(position)
+            self.__commits[slot] = None
+            self.__size -= self.__commitSizes[slot]
+        self.__count = self.__applied
+
+    def __dropNewest(self):
+        slot = self.__slot(self.__count - 1)
+        self.__commits[slot] = None
+        self.__size -= self.__commitSizes[slot]
+        self.__count -= 1
+
+    def __dropOldest(self):
+        self.__commits[self.__start] = None
+        self.__size -= self.__commitSizes[self.__start]
+        self.__start = self.__slot(1)
+        self.__base += 1
+        self.__count -= 1
+        self.__applied -= 1
+
+    __changeNames = {ItemAdded: "added", ItemRemoved: "removed", ItemUpdated: "updated"}
+    __itemTypes = {itemType.__name__: itemType for itemType in [Student, Grade, Assignment]}
+
+    @staticmethod
+    def __encodeCommit(commit: list) -> bytes:
+        changes = []
+        for change in commit:
+            encodedChange = {
+                "change": ChangesStack.__changeNames[type(change)],
+                "type": change.getItemType().__name__,
+                "item": JSONConverter.convertItemToDict(change.getItem())
+            }
+            if isinstance(change, ChangesStack.ItemUpdated):
+                encodedChange["oldItem"] = JSONConverter.convertItemToDict(change.getOldItem())
+            changes.append(encodedChange)
+        return json.dumps(changes, separators=(',', ':')).encode()
+
+    @staticmethod
+    def __decodeCommit(data: bytes) -> list:
+        commit = []
+        for encodedChange in json.loads(data):
+            itemType = ChangesStack.__itemTypes[encodedChange["type"]]
+            item = JSONConverter.convertDictToItem(itemType, encodedChange["item"])
+            if encodedChange["change"] == "updated":
+                oldItem = JSONConverter.convertDictToItem(itemType, encodedChange["oldItem"])
+                commit.append(ChangesStack.ItemUpdated(oldItem, item))
+            elif encodedChange["change"] == "removed":
+                commit.append(ChangesStack.ItemRemoved(item))
+            else:
+                commit.append(ChangesStack.ItemAdded(item))
+        return commit
+
+    @staticmethod
+    def _getValueSize(value) -> int:
+        if isinstance(value, dict):
+            return sys.getsizeof(value) + sum(map(ChangesStack._getValueSize, value.values()))
+        if isinstance(value, tuple):
+            return sys.getsizeof(value) + sum(map(ChangesStack._getValueSize, value))
+        return sys.getsizeof(value)
 
 
 class ChangesHandler:
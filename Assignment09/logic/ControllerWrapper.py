@@ -1,20 +1,46 @@
+from contextlib import ExitStack, contextmanager
 from datetime import date
-from typing import List, Type, Union
+from typing import List
 
 from logic.AssignmentController import AssignmentController
 from logic.ChangesStack import ChangesStack, ChangesHandler
 from logic.GradeController import GradeController
+from logic.HistoryStore import HistoryStore
 from logic.StudentController import StudentController
 from model.Assignment import Assignment
 from model.Grade import Grade
 from model.Student import Student
+from repository.RepositoryError import RepositoryError
 from repository.RepositoryWrapper import RepositoryWrapper
 
 
 class ControllerWrapper(ChangesHandler):
-    def __init__(self, repositoryWrapper: RepositoryWrapper, currentDate: date):
+    # The field of the grades linking them to each type of item, and the getter of its value
+    __gradeLinks = {
+        Student: ("studentId", Student.getStudentId),
+        Assignment: ("assignmentId", Assignment.getAssignmentId)
+    }
+
+    def __init__(self, repositoryWrapper: RepositoryWrapper, currentDate: date,
+                 historyDepth: int = 1000, historyBytes: int = 0, historyLocation: str = ''):
+        """
+        :param historyDepth: The largest number of operations which can be undone, or which are kept in memory
+        if the history is stored
+        :param historyBytes: The largest estimated size of the undo history kept in memory in bytes, 0 for no limit
+        :param historyLocation: The files the undo history is stored in, so it is kept after the program stops,
+        or an empty string to keep it in memory only. The files keep the last 10 * historyDepth operations.
+        The operations are stored as they are made, so the repositories must write every change as it is made
+        as well, or a crash could leave the history ahead of the data.
+        :raises RepositoryError: If the history is stored but the repositories do not write every change
+        """
         self.__repositoryWrapper = repositoryWrapper
-        self.__changesStack = ChangesStack(self)
+        historyStore = None
+        if historyLocation != '':
+            if not repositoryWrapper.writesEveryChange():
+                raise RepositoryError("The undo history can only be stored with repositories writing every change")
+            historyStore = HistoryStore(historyLocation, 10 * historyDepth)
+        self.__changesStack = ChangesStack(self, historyDepth, historyBytes, historyStore)
+        self.__unitDepth = 0
 
         studentRepository = repositoryWrapper.getRepository(Student)
         gradeRepository = repositoryWrapper.getRepository(Grade)
@@ -23,12 +49,14 @@ class ControllerWrapper(ChangesHandler):
         self.__studentController = StudentController(
             studentRepository,
             self.__changesStack,
-            self.cascadeDelete
+            self.cascadeDelete,
+            self.unitOfWork
         )
         self.__assignmentController = AssignmentController(
             repositoryWrapper.getRepository(Assignment),
             self.__changesStack,
-            self.cascadeDelete
+            self.cascadeDelete,
+            self.unitOfWork
         )
         self.__gradeController = GradeController(
             studentRepository, gradeRepository,
@@ -44,54 +72,123 @@ class ControllerWrapper(ChangesHandler):
     def getAssignmentController(self) -> AssignmentController:
         return self.__assignmentController
 
+    @contextmanager
+    def unitOfWork(self):
+        """
+        Runs the operations made inside the with block as a single unit. Their changes are stored together,
+        in a batch of every repository, and are recorded as a single commit. If an exception leaves the block,
+        the changes made are reverted and nothing is recorded; the exception is raised again, with any error
+        raised while reverting the changes as its cause.
+        The databases store the unit in a single transaction. The file repositories are written one file at a time,
+        when the batch ends, so a crash between two of the files can leave only some of them written.
+        A unit of work started inside another one is part of it.
+        """
+        if self.__unitDepth > 0:
+            yield
+            return
+        self.__unitDepth += 1
+        self.__changesStack.beginGroup()
+        grouping = True
+        try:
+            with ExitStack() as stack:
+                for itemType in [Student, Assignment, Grade]:
+                    stack.enter_context(self.__repositoryWrapper.getRepository(itemType).batch())
+                try:
+                    yield
+                except BaseException as error:
+                    changes = self.__changesStack.abortGroup()
+                    grouping = False
+                    try:
+                        self.handleChanges(changes, reverse=True)
+                    except Exception as revertError:
+                        raise error from revertError
+                    raise
+        except BaseException:
+            if grouping:
+                self.__changesStack.abortGroup()
+            raise
+        else:
+            self.__changesStack.endGroup()
+        finally:
+            self.__unitDepth -= 1
+
     def cascadeDelete(self, item):
-        if type(item) is Student or Assignment:
-            gradeRepository = self.__repositoryWrapper.getRepository(Grade)
-            gradeList = gradeRepository.getItems()
-            linkedGrades = [grade for grade in gradeList if self.__gradeLinked(grade, item)]
+        """
+        Deletes the grades linked to a removed student or assignment and ends the commit of the removal.
+        The grades are found through the index of the grade repository on the linking field
+        and deleted together, so the cost depends on the number of linked grades only.
+        """
+        if type(item) in ControllerWrapper.__gradeLinks:
+            field, getId = ControllerWrapper.__gradeLinks[type(item)]
+            linkedGrades = self.__repositoryWrapper.getRepository(Grade).deleteBy(**{field: getId(item)})
             for grade in linkedGrades:
                 self.__changesStack.addChange(ChangesStack.ItemRemoved(grade))
-                gradeRepository.deleteItem(grade)
-            self.__changesStack.endCommit()
-
-    @staticmethod
-    def __gradeLinked(grade: Grade, item):
-        if type(item) is Student:
-            return grade.getStudentId() == item.getStudentId()
-        elif type(item) is Assignment:
-            return grade.getAssignmentId() == item.getAssignmentId()
+        self.__changesStack.endCommit()
 
     def populateRepository(self):
         """
         Adds default data to the repository
         """
-        self.__studentController.addRandomStudents(50)
-        self.__assignmentController.addRandomAssignments(50)
-        self.__gradeController.addRandomGrades(40, 40, 50)
+        with self.__repositoryWrapper.getRepository(Student).batch(), \
+                self.__repositoryWrapper.getRepository(Assignment).batch(), \
+                self.__repositoryWrapper.getRepository(Grade).batch():
+            self.__studentController.addRandomStudents(50)
+            self.__assignmentController.addRandomAssignments(50)
+            self.__gradeController.addRandomGrades(40, 40, 50)
 
         self.clearHistory()
 
     def handleChanges(self, changesList: List[ChangesStack.Change], reverse):
         """
-        Handles changes provided by the ChangesStack
+        Handles changes provided by the ChangesStack.
+        The changes made to the same item are merged into their net effect: an item added and then removed is left
+        alone, and an item removed and then added again is updated. The remaining changes are grouped by item type
+        and applied with one bulk operation per group, inside a batch of every repository involved, so a commit
+        is stored once whatever its size.
         """
-        if reverse:
-            functionDict = {
-                ChangesStack.ItemAdded: self.removeItem,
-                ChangesStack.ItemRemoved: self.addItem
-            }
-            iteratedList = reversed(changesList)
-        else:
-            functionDict = {
-                ChangesStack.ItemAdded: self.addItem,
-                ChangesStack.ItemRemoved: self.removeItem
-            }
-            iteratedList = changesList
+        netChanges = {}
+        for change in (reversed(changesList) if reverse else changesList):
+            operation, item = ControllerWrapper.__replayedOperation(change, reverse)
+            key = change.getItemType(), self.__repositoryWrapper.getRepository(change.getItemType()).getKey(item)
+            merged = ControllerWrapper.__mergeOperations(netChanges[key][0], operation) if key in netChanges \
+                else operation
+            if merged is None:
+                del netChanges[key]
+            else:
+                netChanges[key] = merged, item
+
+        groups = {}
+        for (itemType, key), (operation, item) in netChanges.items():
+            groups.setdefault((operation, itemType), []).append(item)
+        functionDict = {"remove": self.removeItems, "update": self.updateItems, "add": self.addItems}
+        with ExitStack() as stack:
+            for itemType in {itemType for operation, itemType in groups}:
+                stack.enter_context(self.__repositoryWrapper.getRepository(itemType).batch())
+            # Removals go first, so an item is never added twice
+            for operation in ["remove", "update", "add"]:
+                for (groupOperation, itemType), items in groups.items():
+                    if groupOperation == operation:
+                        functionDict[operation](items)
 
-        for change in iteratedList:
-            itemType: Type[Union[ChangesStack.ItemAdded, ChangesStack.ItemRemoved]] = type(change)
-            item = change.getItem()
-            functionDict[itemType](item)
+    @staticmethod
+    def __replayedOperation(change: ChangesStack.Change, reverse: bool) -> tuple:
+        if type(change) is ChangesStack.ItemUpdated:
+            return "update", change.getOldItem() if reverse else change.getItem()
+        if (type(change) is ChangesStack.ItemAdded) != reverse:
+            return "add", change.getItem()
+        return "remove", change.getItem()
+
+    @staticmethod
+    def __mergeOperations(first: str, second: str):
+        """
+        Returns the operation with the effect of the two operations made one after the other on an item,
+        or None if they cancel each other
+        """
+        if first == "add":
+            return None if second == "remove" else "add"
+        if first == "remove" and second == "add":
+            return "update"
+        return second
 
     def addItem(self, item):
         self.__repositoryWrapper.getRepository(type(item)).addItem(item)
@@ -99,6 +196,24 @@ class ControllerWrapper(ChangesHandler):
     def removeItem(self, item):
         self.__repositoryWrapper.getRepository(type(item)).deleteItem(item)
 
+    def addItems(self, items: list):
+        """
+        Adds items of the same type
+        """
+        self.__repositoryWrapper.getRepository(type(items[0])).addItems(items)
+
+    def removeItems(self, items: list):
+        """
+        Removes items of the same type
+        """
+        self.__repositoryWrapper.getRepository(type(items[0])).deleteItems(items)
+
+    def updateItems(self, items: list):
+        """
+        Updates items of the same type
+        """
+        self.__repositoryWrapper.getRepository(type(items[0])).updateItems(items)
+
     def clearHistory(self):
         self.__changesStack.clearStack()
 
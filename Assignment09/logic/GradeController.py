@@ -3,15 +3,16 @@ import random
 from copy import copy
 from typing import List
 
-from lib.CustomComponents import sortList, filterList
+from lib.CustomComponents import sortList, filterIter
 from logic.ChangesStack import ChangesStack
 from logic.ControllerError import *
+from logic.GradeStatistics import GradeStatistics
+from logic.GradeTable import GradeTable
 from model.Assignment import Assignment
-from model.Grade import Grade
+from model.Grade import Grade, GradeRecord
 from model.Student import Student
 from model.Validators import GradeValidator
 from repository.Repository import Repository
-from repository.RepositoryError import DuplicateItemError
 
 
 class StudentWithAverageDTO:
@@ -47,6 +48,8 @@ class GradeController:
         self.__assignmentRepository = assignmentRepository
         self.__changesStack = changesStack
         self.__currentDate = currentDate
+        self.__statistics = GradeStatistics(gradeRepository, assignmentRepository, currentDate)
+        self.__gradeTable = GradeTable(gradeRepository) if GradeTable.isAvailable() else None
 
     def findStudent(self, studentId: int) -> Student:
         """
@@ -87,20 +90,25 @@ class GradeController:
         """
         Checks if there are any students within the specified group
         """
-        if group not in [student.getGroup() for student in self.__studentRepository.getItems()]:
+        if not any(student.getGroup() == group for student in self.__studentRepository.getItemsIter()):
             raise GroupNotFound
 
     def assignToGroup(self, group: int, assignmentId: int):
         """
         Gives an assignment to the specified group
         """
-        groupStudents = [student for student in self.__studentRepository.getItems() if student.getGroup() == group]
+        groupStudents = self.__studentRepository.findBy(group=group)
+        if len(groupStudents) == 0:
+            return
+        self.findAssignment(assignmentId)
+        assignedStudentIds = {grade.getStudentId()
+                              for grade in self.__gradeRepository.findBy(assignmentId=assignmentId)}
+        grades = [Grade(student.getStudentId(), assignmentId) for student in groupStudents
+                  if student.getStudentId() not in assignedStudentIds]
+        self.__gradeRepository.addItems(grades)
         self.__changesStack.beginCommit()
-        for student in groupStudents:
-            try:
-                self.assignToStudent(student.getStudentId(), assignmentId, newCommit=False)
-            except DuplicateItemError:
-                pass
+        for grade in grades:
+            self.__changesStack.addChange(ChangesStack.ItemAdded(grade))
         self.__changesStack.endCommit()
 
     def listStudentGrades(self, studentId: int) -> List[Grade]:
@@ -108,16 +116,14 @@ class GradeController:
         Lists all the grades for the student with the given ID
         """
         self.findStudent(studentId)
-        # return [grade for grade in self.__gradeRepository.getItems() if grade.getStudentId() == studentId]
-        return filterList(self.__gradeRepository.getItems(), lambda grade: grade.getStudentId() == studentId)
+        return self.__gradeRepository.findBy(studentId=studentId)
 
     def listAssignmentGrades(self, assignmentId) -> List[Grade]:
         """
         Lists all the grades for the assignment with the given ID
         """
         self.findAssignment(assignmentId)
-        # return [grade for grade in self.__gradeRepository.getItems() if grade.getAssignmentId() == assignmentId]
-        return filterList(self.__gradeRepository.getItems(), lambda grade: grade.getAssignmentId() == assignmentId)
+        return self.__gradeRepository.findBy(assignmentId=assignmentId)
 
     def findGrade(self, studentId: int, assignmentId: int) -> Grade:
         """
@@ -144,10 +150,7 @@ class GradeController:
         GradeValidator.validateGrade(newGradeObject)
         self.__gradeRepository.updateItem(newGradeObject)
 
-        self.__changesStack.beginCommit()
-        self.__changesStack.addChange(ChangesStack.ItemRemoved(gradeObject))
-        self.__changesStack.addChange(ChangesStack.ItemAdded(newGradeObject))
-        self.__changesStack.endCommit()
+        self.__changesStack.addChange(ChangesStack.ItemUpdated(gradeObject, newGradeObject), newCommit=True)
 
     def getStudentUngradedAssignments(self, studentId: int) -> List[Assignment]:
         """
@@ -155,8 +158,7 @@ class GradeController:
         """
         self.findStudent(studentId)
         studentGrades = self.listStudentGrades(studentId)
-        # studentNoneGrades = [grade for grade in studentGrades if grade.getGrade() is None]
-        studentNoneGrades = filterList(studentGrades, lambda grade: grade.getGrade() is None)
+        studentNoneGrades = filterIter(studentGrades, lambda grade: grade.getGrade() is None)
         return [self.findAssignment(grade.getAssignmentId()) for grade in studentNoneGrades]
 
     def validateGrading(self, studentId: int, assignmentId: int) -> Grade:
@@ -179,17 +181,7 @@ class GradeController:
         """
         grades = self.listAssignmentGrades(assignmentId)
         students = [self.findStudent(grade.getStudentId()) for grade in grades]
-
-        def compareStudentNames(student1, student2):
-            name1 = student1.getName()
-            name2 = student2.getName()
-            if name1 == name2:
-                return 0
-            if name1 > name2:
-                return 1
-            return -1
-
-        return sortList(students, compareStudentNames)
+        return sortList(students, key=lambda student: student.getName())
 
     def getStudentsForAssignmentSortedByGrade(self, assignmentId: int) -> List[Student]:
         """
@@ -198,17 +190,7 @@ class GradeController:
         grades = self.listAssignmentGrades(assignmentId)
         noneGrades = [grade for grade in grades if grade.getGrade() is None]
         givenGrades = [grade for grade in grades if grade.getGrade() is not None]
-
-        def compareGrades(grade1, grade2):
-            gradeValue1 = grade1.getGrade()
-            gradeValue2 = grade2.getGrade()
-            if gradeValue1 == gradeValue2:
-                return 0
-            if gradeValue1 > gradeValue2:
-                return -1
-            return 1
-
-        sortedGrades = sortList(givenGrades, compareGrades)
+        sortedGrades = sortList(givenGrades, key=lambda grade: grade.getGrade(), reverse=True)
         students = [self.findStudent(grade.getStudentId()) for grade in sortedGrades + noneGrades]
         return students
 
@@ -216,60 +198,39 @@ class GradeController:
         """
         Returns a list of tuples with the students and their average grades,
         sorted in descending order of the average grade received for all assignments.
+        The students are read through the repository view and copied into model objects only for the result.
         """
-        DTOList = []
-        students = self.__studentRepository.getItems()
-        for student in students:
-            sum = 0
-            number = 0
-            for grade in self.listStudentGrades(student.getStudentId()):
-                if grade.getGrade() is not None:
-                    sum += grade.getGrade()
-                    number += 1
-            average = sum / number if number != 0 else 0
-            DTOList.append(StudentWithAverageDTO(student, average))
-
-        def compareStudentWithAverageDTO(dto1, dto2):
-            average1 = dto1.getAverage()
-            average2 = dto2.getAverage()
-
-            if average1 == average2:
-                return 0
-            if average1 > average2:
-                return -1
-            return 1
-
-        return sortList(DTOList, compareStudentWithAverageDTO)
+        if self.__gradeTable is not None:
+            students = list(self.__studentRepository.view())
+            averages = self.__gradeTable.getStudentAverages([student.getStudentId() for student in students])
+            return [StudentWithAverageDTO(Student.fromRecord(students[position]), float(averages[position]))
+                    for position in GradeTable.descendingOrder(averages)]
+
+        DTOList = [StudentWithAverageDTO(Student.fromRecord(student),
+                                         self.__statistics.getStudentAverage(student.getStudentId()))
+                   for student in self.__studentRepository.view()]
+        return sortList(DTOList, key=lambda dto: dto.getAverage(), reverse=True)
 
     def getAssignmentsSortedByAverage(self) -> List[AssignmentWithAverageDTO]:
         """
         Return a list of tuples consisting of all assignments and their average grades for which there is at least one
         grade, sorted in descending order of the average grade received by all students who received that assignment.
         """
+        if self.__gradeTable is not None:
+            assignments = list(self.__assignmentRepository.view())
+            averages = self.__gradeTable.getAssignmentAverages(
+                [assignment.getAssignmentId() for assignment in assignments]
+            )
+            return [AssignmentWithAverageDTO(Assignment.fromRecord(assignments[position]), float(averages[position]))
+                    for position in GradeTable.descendingOrder(averages)]
+
         DTOList = []
-        assignments = self.__assignmentRepository.getItems()
-        for assignment in assignments:
-            sum = 0
-            number = 0
-            for grade in self.listAssignmentGrades(assignment.getAssignmentId()):
-                if grade.getGrade() is not None:
-                    sum += grade.getGrade()
-                    number += 1
-            if number != 0:
-                average = sum / number
-                DTOList.append(AssignmentWithAverageDTO(assignment, average))
-
-        def compareAssignmentWithAverageDTO(dto1, dto2):
-            average1 = dto1.getAverage()
-            average2 = dto2.getAverage()
-
-            if average1 == average2:
-                return 0
-            if average1 > average2:
-                return -1
-            return 1
-
-        return sortList(DTOList, compareAssignmentWithAverageDTO)
+        for assignment in self.__assignmentRepository.view():
+            average = self.__statistics.getAssignmentAverage(assignment.getAssignmentId())
+            if average is not None:
+                DTOList.append(AssignmentWithAverageDTO(Assignment.fromRecord(assignment), average))
+
+        return sortList(DTOList, key=lambda dto: dto.getAverage(), reverse=True)
 
     def getGrade(self, studentId: int, assignmentId: int) -> Grade:
         self.findStudent(studentId)
@@ -281,20 +242,37 @@ class GradeController:
         """
         Returns a list with all students who are late in handing in at least one assignment.
         These are all the students who have an ungraded assignment for which the deadline has passed.
+        The students are sorted by their IDs, as the order of the repository changes when items are deleted.
+        """
+        if self.__gradeTable is not None:
+            overdueAssignmentIds = [assignment.getAssignmentId() for assignment in self.__assignmentRepository.view()
+                                    if self.__currentDate > assignment.getDeadline()]
+            lateStudentIds = self.__gradeTable.getStudentsWithUngradedAssignments(overdueAssignmentIds)
+            lateStudents = [Student.fromRecord(student) for student in self.__studentRepository.view()
+                            if student.getStudentId() in lateStudentIds]
+        else:
+            lateStudents = [Student.fromRecord(student) for student in self.__studentRepository.view()
+                            if self.__statistics.isStudentLate(student.getStudentId())]
+        return sortList(lateStudents, key=lambda student: student.getStudentId())
+
+    def listGrades(self) -> List[GradeRecord]:
+        """
+        Returns read-only records of all the grades
+        """
+        return list(self.__gradeRepository.view())
+
+    def getGradePage(self, offset: int, limit: int, sortField: str = None, reverse: bool = False) -> List[Grade]:
+        """
+        Returns at most limit grades, starting at the offset, in ascending order of their student and assignment IDs
+        or of the given field (studentId, assignmentId or grade). Grades not given yet come first.
         """
-        studentList = []
-        for student in self.__studentRepository.getItems():
-            ungradedAssignments = self.getStudentUngradedAssignments(student.getStudentId())
-            for assignment in ungradedAssignments:
-                if self.__currentDate > assignment.getDeadline():
-                    studentList.append(student)
-                    break
-        return studentList
+        return self.__gradeRepository.getPage(offset, limit, sortField, reverse)
 
-    def listGrades(self) -> List[Grade]:
-        return self.__gradeRepository.getItems()
+    def countGrades(self) -> int:
+        return self.__gradeRepository.count()
 
     def addRandomGrades(self, studentNumber: int, assignmentNumber: int, number: int):
+        grades = {}
         for i in range(number):
             grade = random.randint(0, 10)
             if grade == 0:
@@ -303,8 +281,7 @@ class GradeController:
             while not valid:
                 studentId = random.randint(0, studentNumber - 1)
                 assignmentId = random.randint(0, assignmentNumber - 1)
-                try:
-                    self.__gradeRepository.addItem(Grade(studentId, assignmentId, grade))
-                    valid = True
-                except DuplicateItemError:
-                    pass
+                newGrade = Grade(studentId, assignmentId, grade)
+                valid = newGrade not in grades and self.__gradeRepository.viewItem(newGrade) is None
+            grades[newGrade] = None
+        self.__gradeRepository.addItems(grades)
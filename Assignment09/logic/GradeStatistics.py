@@ -0,0 +1,170 @@
+import datetime
+
+from model.Assignment import Assignment
+from model.Grade import Grade
+from repository.Repository import Repository
+from repository.RepositoryObserver import RepositoryObserver
+
+
+class GradeStatistics:
+    """
+    Keeps the sum and the number of given grades for every student and assignment, together with the ungraded
+    assignments of every student. Everything is computed in a single pass over the grades when first needed,
+    then kept up to date as grades are added, removed or set.
+    """
+
+    class GradeObserver(RepositoryObserver):
+
+        def __init__(self, statistics):
+            self.__statistics = statistics
+
+        def itemAdded(self, item):
+            self.__statistics._gradeAdded(item)
+
+        def itemUpdated(self, item):
+            self.__statistics._gradeUpdated(item)
+
+        def itemRemoved(self, item):
+            self.__statistics._gradeRemoved(item)
+
+        def collectionReloaded(self):
+            self.__statistics._gradesReloaded()
+
+    class AssignmentObserver(RepositoryObserver):
+
+        def __init__(self, statistics):
+            self.__statistics = statistics
+
+        def itemAdded(self, item):
+            self.__statistics._deadlineChanged(item)
+
+        def itemUpdated(self, item):
+            self.__statistics._deadlineChanged(item)
+
+        def itemRemoved(self, item):
+            self.__statistics._deadlineRemoved(item)
+
+        def collectionReloaded(self):
+            self.__statistics._deadlinesReloaded()
+
+    def __init__(self, gradeRepository: Repository, assignmentRepository: Repository, currentDate: datetime.date):
+        self.__gradeRepository = gradeRepository
+        self.__assignmentRepository = assignmentRepository
+        self.__currentDate = currentDate
+
+        self.__gradesValid = False
+        self.__gradeValues = {}
+        self.__studentTotals = {}
+        self.__assignmentTotals = {}
+        self.__ungradedAssignments = {}
+
+        self.__deadlines = None
+        self.__lateFlags = {}
+
+        gradeRepository.addObserver(GradeStatistics.GradeObserver(self))
+        assignmentRepository.addObserver(GradeStatistics.AssignmentObserver(self))
+
+    def getStudentAverage(self, studentId: int) -> float:
+        """
+        Returns the average of the given grades of the student, 0 if the student has no given grade
+        """
+        self.__ensureGrades()
+        total = self.__studentTotals.get(studentId)
+        return total[0] / total[1] if total is not None and total[1] != 0 else 0
+
+    def getAssignmentAverage(self, assignmentId: int):
+        """
+        Returns the average of the given grades for the assignment, None if no grade was given for it
+        """
+        self.__ensureGrades()
+        total = self.__assignmentTotals.get(assignmentId)
+        return total[0] / total[1] if total is not None and total[1] != 0 else None
+
+    def isStudentLate(self, studentId: int) -> bool:
+        """
+        Checks if the student has an ungraded assignment whose deadline has passed
+        """
+        self.__ensureGrades()
+        late = self.__lateFlags.get(studentId)
+        if late is None:
+            deadlines = self.__ensureDeadlines()
+            late = any(assignmentId in deadlines and self.__currentDate > deadlines[assignmentId]
+                       for assignmentId in self.__ungradedAssignments.get(studentId, {}))
+            self.__lateFlags[studentId] = late
+        return late
+
+    def __ensureGrades(self):
+        if self.__gradesValid:
+            return
+        grades = self.__gradeRepository.view()
+        self.__gradeValues = {}
+        self.__studentTotals = {}
+        self.__assignmentTotals = {}
+        self.__ungradedAssignments = {}
+        self.__lateFlags = {}
+        for grade in grades:
+            self.__count(grade.getStudentId(), grade.getAssignmentId(), grade.getGrade())
+        self.__gradesValid = True
+
+    def __ensureDeadlines(self) -> dict:
+        if self.__deadlines is None:
+            self.__deadlines = {assignment.getAssignmentId(): assignment.getDeadline()
+                                for assignment in self.__assignmentRepository.view()}
+        return self.__deadlines
+
+    def __count(self, studentId: int, assignmentId: int, value):
+        self.__gradeValues[(studentId, assignmentId)] = value
+        self.__lateFlags.pop(studentId, None)
+        if value is None:
+            self.__ungradedAssignments.setdefault(studentId, {})[assignmentId] = None
+            return
+        studentTotal = self.__studentTotals.setdefault(studentId, [0, 0])
+        studentTotal[0] += value
+        studentTotal[1] += 1
+        assignmentTotal = self.__assignmentTotals.setdefault(assignmentId, [0, 0])
+        assignmentTotal[0] += value
+        assignmentTotal[1] += 1
+
+    def __uncount(self, studentId: int, assignmentId: int):
+        key = (studentId, assignmentId)
+        if key not in self.__gradeValues:
+            return
+        value = self.__gradeValues.pop(key)
+        self.__lateFlags.pop(studentId, None)
+        if value is None:
+            self.__ungradedAssignments[studentId].pop(assignmentId, None)
+            return
+        self.__studentTotals[studentId][0] -= value
+        self.__studentTotals[studentId][1] -= 1
+        self.__assignmentTotals[assignmentId][0] -= value
+        self.__assignmentTotals[assignmentId][1] -= 1
+
+    def _gradeAdded(self, grade: Grade):
+        if self.__gradesValid:
+            self.__count(grade.getStudentId(), grade.getAssignmentId(), grade.getGrade())
+
+    def _gradeUpdated(self, grade: Grade):
+        if self.__gradesValid:
+            self.__uncount(grade.getStudentId(), grade.getAssignmentId())
+            self.__count(grade.getStudentId(), grade.getAssignmentId(), grade.getGrade())
+
+    def _gradeRemoved(self, grade: Grade):
+        if self.__gradesValid:
+            self.__uncount(grade.getStudentId(), grade.getAssignmentId())
+
+    def _gradesReloaded(self):
+        self.__gradesValid = False
+
+    def _deadlineChanged(self, assignment: Assignment):
+        if self.__deadlines is not None:
+            self.__deadlines[assignment.getAssignmentId()] = assignment.getDeadline()
+        self.__lateFlags = {}
+
+    def _deadlineRemoved(self, assignment: Assignment):
+        if self.__deadlines is not None:
+            self.__deadlines.pop(assignment.getAssignmentId(), None)
+        self.__lateFlags = {}
+
+    def _deadlinesReloaded(self):
+        self.__deadlines = None
+        self.__lateFlags = {}
@@ -0,0 +1,182 @@
+from repository.Repository import Repository
+from repository.RepositoryObserver import RepositoryObserver
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class GradeTable:
+    """
+    Columnar copy of the grades, kept in NumPy arrays of student IDs, assignment IDs and grade values,
+    with a mask marking the grades which were given. Averages are computed for all students or assignments
+    at once, by grouping the given grades with numpy.unique and summing them with numpy.bincount.
+    The arrays are built from the grade repository when first needed and then kept up to date as grades
+    are added, removed or set. Only available when NumPy is installed.
+    """
+
+    class GradeObserver(RepositoryObserver):
+
+        def __init__(self, table):
+            self.__table = table
+
+        def itemAdded(self, item):
+            self.__table._gradeAdded(item)
+
+        def itemUpdated(self, item):
+            self.__table._gradeUpdated(item)
+
+        def itemRemoved(self, item):
+            self.__table._gradeRemoved(item)
+
+        def collectionReloaded(self):
+            self.__table._gradesReloaded()
+
+    @staticmethod
+    def isAvailable() -> bool:
+        return numpy is not None
+
+    def __init__(self, gradeRepository: Repository):
+        self.__gradeRepository = gradeRepository
+        self.__valid = False
+        self.__size = 0
+        self.__positions = None
+        self.__groupTotals = {}
+        self.__studentIds = None
+        self.__assignmentIds = None
+        self.__grades = None
+        self.__given = None
+        gradeRepository.addObserver(GradeTable.GradeObserver(self))
+
+    def getStudentAverages(self, studentIds: list):
+        """
+        Returns an array with the average of the given grades of every student, 0 for a student without one
+        """
+        self.__ensureColumns()
+        return numpy.nan_to_num(self.__averages('studentId', self.__studentIds, studentIds), nan=0.0)
+
+    def getAssignmentAverages(self, assignmentIds: list):
+        """
+        Returns an array with the average of the given grades for every assignment, NaN for an assignment
+        without one
+        """
+        self.__ensureColumns()
+        return self.__averages('assignmentId', self.__assignmentIds, assignmentIds)
+
+    def getStudentsWithUngradedAssignments(self, assignmentIds: list) -> set:
+        """
+        Returns the IDs of the students who have not been graded yet for at least one of the assignments
+        """
+        self.__ensureColumns()
+        ungraded = ~self.__given[:self.__size]
+        assignmentIds = numpy.array(assignmentIds, dtype=numpy.int64)
+        matches = numpy.isin(self.__assignmentIds[:self.__size][ungraded], assignmentIds)
+        return set(numpy.unique(self.__studentIds[:self.__size][ungraded][matches]).tolist())
+
+    @staticmethod
+    def descendingOrder(values) -> list:
+        """
+        Returns the positions of the values in descending order, keeping equal values in their original order.
+        NaN values are left out.
+        """
+        positions = numpy.flatnonzero(~numpy.isnan(values))
+        return positions[numpy.argsort(-values[positions], kind='stable')].tolist()
+
+    def __averages(self, field: str, column, ids: list):
+        # The totals of every group are kept until the grades change
+        if field not in self.__groupTotals:
+            given = self.__given[:self.__size]
+            groups, groupPositions = numpy.unique(column[:self.__size][given], return_inverse=True)
+            sums = numpy.bincount(groupPositions, weights=self.__grades[:self.__size][given], minlength=len(groups))
+            counts = numpy.bincount(groupPositions, minlength=len(groups))
+            self.__groupTotals[field] = groups, sums, counts
+        groups, sums, counts = self.__groupTotals[field]
+
+        ids = numpy.array(ids, dtype=numpy.int64)
+        averages = numpy.full(len(ids), numpy.nan)
+        if len(groups) == 0:
+            return averages
+        positions = numpy.minimum(numpy.searchsorted(groups, ids), len(groups) - 1)
+        found = groups[positions] == ids
+        averages[found] = sums[positions[found]] / counts[positions[found]]
+        return averages
+
+    def __ensureColumns(self):
+        if self.__valid:
+            return
+        grades = list(self.__gradeRepository.view())
+        self.__size = len(grades)
+        self.__allocate(max(16, 2 * self.__size))
+        # The positions of the grades are only looked up when grades are changed
+        self.__positions = None
+        self.__groupTotals = {}
+        if self.__size > 0:
+            studentIds, assignmentIds, values = zip(*grades)
+            self.__studentIds[:self.__size] = studentIds
+            self.__assignmentIds[:self.__size] = assignmentIds
+            given = numpy.array([value is not None for value in values], dtype=bool)
+            self.__given[:self.__size] = given
+            self.__grades[:self.__size] = [value if value is not None else 0 for value in values]
+        self.__valid = True
+
+    def __getPositions(self) -> dict:
+        if self.__positions is None:
+            keys = zip(self.__studentIds[:self.__size].tolist(), self.__assignmentIds[:self.__size].tolist())
+            self.__positions = {key: position for position, key in enumerate(keys)}
+        return self.__positions
+
+    def __allocate(self, capacity: int):
+        def grow(column, dtype):
+            newColumn = numpy.zeros(capacity, dtype=dtype)
+            if column is not None and self.__valid:
+                newColumn[:self.__size] = column[:self.__size]
+            return newColumn
+
+        self.__studentIds = grow(self.__studentIds, numpy.int64)
+        self.__assignmentIds = grow(self.__assignmentIds, numpy.int64)
+        self.__grades = grow(self.__grades, numpy.float64)
+        self.__given = grow(self.__given, bool)
+
+    def __set(self, position: int, grade):
+        self.__groupTotals = {}
+        self.__studentIds[position] = grade.getStudentId()
+        self.__assignmentIds[position] = grade.getAssignmentId()
+        self.__given[position] = grade.getGrade() is not None
+        self.__grades[position] = grade.getGrade() if grade.getGrade() is not None else 0
+
+    def _gradeAdded(self, grade):
+        if not self.__valid:
+            return
+        if self.__size == len(self.__studentIds):
+            self.__allocate(2 * self.__size)
+        self.__set(self.__size, grade)
+        self.__getPositions()[(grade.getStudentId(), grade.getAssignmentId())] = self.__size
+        self.__size += 1
+
+    def _gradeUpdated(self, grade):
+        if not self.__valid:
+            return
+        position = self.__getPositions().get((grade.getStudentId(), grade.getAssignmentId()))
+        if position is None:
+            self.__valid = False
+            return
+        self.__set(position, grade)
+
+    def _gradeRemoved(self, grade):
+        if not self.__valid:
+            return
+        position = self.__getPositions().pop((grade.getStudentId(), grade.getAssignmentId()), None)
+        if position is None:
+            self.__valid = False
+            return
+        self.__groupTotals = {}
+        last = self.__size - 1
+        if position != last:
+            for column in [self.__studentIds, self.__assignmentIds, self.__grades, self.__given]:
+                column[position] = column[last]
+            self.__positions[(int(self.__studentIds[position]), int(self.__assignmentIds[position]))] = position
+        self.__size = last
+
+    def _gradesReloaded(self):
+        self.__valid = False
@@ -0,0 +1,184 @@
+import os
+import struct
+import zlib
+
+from repository.RepositoryError import RepositoryError
+
+
+class HistoryStore:
+    """
+    Undo history kept on the disk, so it is not lost when the program stops.
+    The encoded commits are appended to a log, fileName + '.log', as they are made. A fixed-width index,
+    fileName + '.idx', holds the offset, length and checksum of every commit in the log, so any commit is read
+    with two seeks, however long the history is. The commits are numbered from the first one ever stored; the index
+    starts with the number of its first commit, and fileName + '.state' holds the number of commits which are applied,
+    the others being undone.
+    Committing after an undo drops the undone commits by truncating the log and the index. Once more than twice
+    the largest number of commits are stored, the oldest ones are dropped by writing the newest ones to new files,
+    so the store does not grow without limit and each commit is copied a constant number of times on average.
+    An index entry is only written after its commit, so one cut short by a crash is dropped when the store is opened.
+    The commits are stored as they are made, so the data files must be written after every change as well,
+    or a crash could leave the history ahead of the data.
+    """
+
+    __headerFormat = struct.Struct('<Q')
+    __indexFormat = struct.Struct('<QII')
+    __stateFormat = struct.Struct('<Q')
+
+    def __init__(self, fileName: str, maxCount: int = 10000):
+        """
+        :param maxCount: The number of newest commits kept when the oldest ones are dropped
+        """
+        self.__logFileName = fileName + '.log'
+        self.__indexFileName = fileName + '.idx'
+        self.__stateFileName = fileName + '.state'
+        self.__maxCount = max(1, maxCount)
+        self.__recoverCompaction()
+        open(self.__logFileName, 'ab').close()
+        if not os.path.exists(self.__indexFileName) or \
+                os.path.getsize(self.__indexFileName) < HistoryStore.__headerFormat.size:
+            with open(self.__indexFileName, 'wb') as file:
+                file.write(HistoryStore.__headerFormat.pack(0))
+        with open(self.__indexFileName, 'rb') as file:
+            self.__first = HistoryStore.__headerFormat.unpack(file.read(HistoryStore.__headerFormat.size))[0]
+
+        logSize = os.path.getsize(self.__logFileName)
+        entriesSize = os.path.getsize(self.__indexFileName) - HistoryStore.__headerFormat.size
+        self.__count = self.__first + entriesSize // HistoryStore.__indexFormat.size
+        while self.__count > self.__first and sum(self.__readEntry(self.__count - 1)[:2]) > logSize:
+            self.__count -= 1
+        self.__truncate(self.__count)
+
+        self.__applied = self.__count
+        if os.path.exists(self.__stateFileName):
+            with open(self.__stateFileName, 'rb') as file:
+                state = file.read(HistoryStore.__stateFormat.size)
+            if len(state) == HistoryStore.__stateFormat.size:
+                self.__applied = max(self.__first, min(HistoryStore.__stateFormat.unpack(state)[0], self.__count))
+
+    def getFirst(self) -> int:
+        """
+        Returns the number of the oldest commit stored
+        """
+        return self.__first
+
+    def getCount(self) -> int:
+        """
+        Returns the number of the commit following the newest one stored, undone or not
+        """
+        return self.__count
+
+    def getApplied(self) -> int:
+        """
+        Returns the number of the commit following the last applied one
+        """
+        return self.__applied
+
+    def setApplied(self, applied: int):
+        self.__applied = applied
+        with open(self.__stateFileName, 'r+b' if os.path.exists(self.__stateFileName) else 'wb') as file:
+            file.write(HistoryStore.__stateFormat.pack(applied))
+
+    def append(self, data: bytes):
+        """
+        Stores an encoded commit after the applied ones, dropping the undone commits, and marks it as applied
+        """
+        if self.__count > self.__applied:
+            self.__truncate(self.__applied)
+        with open(self.__logFileName, 'ab') as file:
+            offset = file.tell()
+            file.write(data)
+        with open(self.__indexFileName, 'ab') as file:
+            file.write(HistoryStore.__indexFormat.pack(offset, len(data), zlib.crc32(data)))
+        self.__count += 1
+        self.setApplied(self.__count)
+        if self.__count - self.__first > 2 * self.__maxCount:
+            self.__compact()
+
+    def read(self, position: int) -> bytes:
+        """
+        Reads the encoded commit with the given number
+        """
+        offset, length, checksum = self.__readEntry(position)
+        with open(self.__logFileName, 'rb') as file:
+            file.seek(offset)
+            data = file.read(length)
+        if len(data) != length or zlib.crc32(data) != checksum:
+            raise RepositoryError("Corrupted undo history")
+        return data
+
+    def clear(self):
+        """
+        Removes all the commits
+        """
+        with open(self.__logFileName, 'wb'):
+            pass
+        with open(self.__indexFileName, 'wb') as file:
+            file.write(HistoryStore.__headerFormat.pack(0))
+        self.__first = 0
+        self.__count = 0
+        self.setApplied(0)
+
+    def __readEntry(self, position: int) -> tuple:
+        with open(self.__indexFileName, 'rb') as file:
+            file.seek(self.__entryOffset(position))
+            return HistoryStore.__indexFormat.unpack(file.read(HistoryStore.__indexFormat.size))
+
+    def __entryOffset(self, position: int) -> int:
+        return HistoryStore.__headerFormat.size + (position - self.__first) * HistoryStore.__indexFormat.size
+
+    def __truncate(self, count: int):
+        logSize = sum(self.__readEntry(count - 1)[:2]) if count > self.__first else 0
+        with open(self.__logFileName, 'r+b') as file:
+            file.truncate(logSize)
+        with open(self.__indexFileName, 'r+b') as file:
+            file.truncate(self.__entryOffset(count))
+        self.__count = count
+
+    def __compact(self):
+        # The new index is written before the new log and replaces the old one first, so a new log left alone
+        # by a crash was written whole; __recoverCompaction finishes or discards a compaction stopped midway
+        first = self.__count - self.__maxCount
+        logStart = self.__readEntry(first)[0]
+        with open(self.__indexFileName, 'rb') as source, open(self.__indexFileName + '.tmp', 'wb') as file:
+            source.seek(self.__entryOffset(first))
+            file.write(HistoryStore.__headerFormat.pack(first))
+            for entry in HistoryStore.__indexFormat.iter_unpack(source.read()):
+                file.write(HistoryStore.__indexFormat.pack(entry[0] - logStart, entry[1], entry[2]))
+            file.flush()
+            os.fsync(file.fileno())
+        with open(self.__logFileName, 'rb') as source, open(self.__logFileName + '.tmp', 'wb') as file:
+            source.seek(logStart)
+            file.write(source.read())
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(self.__indexFileName + '.tmp', self.__indexFileName)
+        os.replace(self.__logFileName + '.tmp', self.__logFileName)
+        self.__first = first
+
+    def __recoverCompaction(self):
+        if os.path.exists(self.__indexFileName + '.tmp'):
+            # Stopped before replacing anything: the old files are still whole
+            os.remove(self.__indexFileName + '.tmp')
+            if os.path.exists(self.__logFileName + '.tmp'):
+                os.remove(self.__logFileName + '.tmp')
+        elif os.path.exists(self.__logFileName + '.tmp'):
+            # The new log is only kept if the index was replaced by the one describing it
+            if self.__indexedLogSize() == os.path.getsize(self.__logFileName + '.tmp'):
+                os.replace(self.__logFileName + '.tmp', self.__logFileName)
+            else:
+                os.remove(self.__logFileName + '.tmp')
+
+    def __indexedLogSize(self):
+        """
+        Returns the size of the log described by the index file, or None if it has no entries
+        """
+        if not os.path.exists(self.__indexFileName):
+            return None
+        entries = (os.path.getsize(self.__indexFileName) - HistoryStore.__headerFormat.size) \
+            // HistoryStore.__indexFormat.size
+        if entries <= 0:
+            return None
+        with open(self.__indexFileName, 'rb') as file:
+            file.seek(HistoryStore.__headerFormat.size + (entries - 1) * HistoryStore.__indexFormat.size)
+            return sum(HistoryStore.__indexFormat.unpack(file.read(HistoryStore.__indexFormat.size))[:2])
@@ -1,4 +1,5 @@
 import random
+from contextlib import nullcontext
 from copy import copy
 from typing import List
 
@@ -12,22 +13,32 @@ from repository.Repository import Repository
 
 class StudentController:
 
-    def __init__(self, studentRepository: Repository, changesStack: ChangesStack, deleteCallback: callable = None):
+    def __init__(self, studentRepository: Repository, changesStack: ChangesStack, deleteCallback: callable = None,
+                 unitOfWork: callable = nullcontext):
+        """
+        :param deleteCallback: Called with the removed student, to remove what depends on it
+        :param unitOfWork: Returns a context manager running a removal and its callback as a single unit
+        """
         self.__studentRepository = studentRepository
         self.__changesStack = changesStack
         self.__deleteCallback = deleteCallback
+        self.__unitOfWork = unitOfWork
 
     def listStudents(self) -> List[Student]:
         """
         Returns a list of students sorted in ascending order by their IDs
         """
+        return sortList(self.__studentRepository.getItems(), key=lambda student: student.getStudentId())
 
-        def compareStudentIds(student1, student2):
-            id1 = student1.getStudentId()
-            id2 = student2.getStudentId()
-            return (id1 - id2) / abs(id1 - id2)
+    def getStudentPage(self, offset: int, limit: int, sortField: str = None, reverse: bool = False) -> List[Student]:
+        """
+        Returns at most limit students, starting at the offset, in ascending order of their IDs
+        or of the given field (studentId, name or group)
+        """
+        return self.__studentRepository.getPage(offset, limit, sortField, reverse)
 
-        return sortList(self.__studentRepository.getItems(), compareStudentIds)
+    def countStudents(self) -> int:
+        return self.__studentRepository.count()
 
     def addStudent(self, studentId: int, name: str, group: int) -> Student:
         """
@@ -45,14 +56,15 @@ class StudentController:
         Removes a student from the repository
         """
         student = self.findStudent(studentId)
-        self.__studentRepository.deleteItem(student)
+        with self.__unitOfWork():
+            self.__studentRepository.deleteItem(student)
 
-        self.__changesStack.beginCommit()
-        self.__changesStack.addChange(ChangesStack.ItemRemoved(student))
-        if self.__deleteCallback is not None:
-            self.__deleteCallback(student)
-        else:
-            self.__changesStack.endCommit()
+            self.__changesStack.beginCommit()
+            self.__changesStack.addChange(ChangesStack.ItemRemoved(student))
+            if self.__deleteCallback is not None:
+                self.__deleteCallback(student)
+            else:
+                self.__changesStack.endCommit()
 
     def findStudent(self, studentId: int) -> Student:
         """
@@ -75,10 +87,7 @@ class StudentController:
         newStudent.setGroup(group)
         StudentValidator.validateStudent(newStudent)
         self.__studentRepository.updateItem(newStudent)
-        self.__changesStack.beginCommit()
-        self.__changesStack.addChange(ChangesStack.ItemRemoved(student))
-        self.__changesStack.addChange(ChangesStack.ItemAdded(newStudent))
-        self.__changesStack.endCommit()
+        self.__changesStack.addChange(ChangesStack.ItemUpdated(student, newStudent), newCommit=True)
 
     def addRandomStudents(self, number):
         firstNames = [
@@ -121,8 +130,16 @@ class StudentController:
             916,
             917
         ]
+        students = []
         for i in range(number):
             firstName = random.choice(firstNames)
             lastName = random.choice(lastNames)
             group = random.choice(groups)
-            self.addStudent(i, firstName + " " + lastName, group)
+            student = Student(i, firstName + " " + lastName, group)
+            StudentValidator.validateStudent(student)
+            students.append(student)
+        self.__studentRepository.addItems(students)
+        self.__changesStack.beginCommit()
+        for student in students:
+            self.__changesStack.addChange(ChangesStack.ItemAdded(student))
+        self.__changesStack.endCommit()
@@ -16,11 +16,18 @@ def run():
         settings["repository"],
         settings["studentRepositoryLocation"],
         settings["gradeRepositoryLocation"],
-        settings["assignmentRepositoryLocation"]
+        settings["assignmentRepositoryLocation"],
+        settings["flushPolicy"],
+        settings["flushInterval"],
+        settings["journalCompactionSize"],
+        settings["databaseLocation"],
+        settings["connectionPoolSize"]
     )
     now = datetime.now()
     currentDate = date(now.year, now.month, now.day)
-    controllerWrapper = ControllerWrapper(repositoryWrapper, currentDate)
+    controllerWrapper = ControllerWrapper(repositoryWrapper, currentDate,
+                                          int(settings["historyDepth"]), int(settings["historyBytes"]),
+                                          settings["historyLocation"])
     if repositoryWrapper.isEmpty():
         controllerWrapper.populateRepository()
 
@@ -29,7 +36,10 @@ def run():
         ui = GUI(controllerWrapper)
     else:
         ui = MenuUI(controllerWrapper)
-    ui.run()
+    try:
+        ui.run()
+    finally:
+        repositoryWrapper.close()
 
 
 if __name__ == '__main__':
@@ -1,3 +1,4 @@
+from collections import namedtuple
 from datetime import date
 
 
@@ -6,6 +7,8 @@ class Assignment:
     Represents an assignment
     """
 
+    __slots__ = ('__assignmentId', '__description', '__deadline')
+
     def __init__(self, assignmentId: int, description: str = None, deadline: date = None):
         self.__assignmentId = assignmentId
         self.__description = description
@@ -26,15 +29,60 @@ class Assignment:
     def setDeadline(self, deadline: date):
         self.__deadline = deadline
 
+    def toRecord(self):
+        """
+        Returns an immutable copy of the assignment
+        """
+        return AssignmentRecord(self.__assignmentId, self.__description, self.__deadline)
+
+    @staticmethod
+    def fromRecord(record):
+        return Assignment(record.assignmentId, record.description, record.deadline)
+
     def __str__(self):
         return "{:d} - {} - {:%d.%m.%Y}".format(self.__assignmentId, self.__description, self.__deadline)
 
     def __eq__(self, other):
         if id(self) == id(other):
             return True
+        if type(other) is not Assignment:
+            return NotImplemented
         if self.__assignmentId == other.__assignmentId:
             return True
         return False
 
+    def __hash__(self):
+        return hash(self.__assignmentId)
+
     def __copy__(self):
         return Assignment(self.__assignmentId, self.__description, self.__deadline)
+
+    def __getstate__(self):
+        return self.__assignmentId, self.__description, self.__deadline
+
+    def __setstate__(self, state):
+        if type(state) is dict:
+            # Pickled before the class used __slots__
+            state = state['_Assignment__assignmentId'], state['_Assignment__description'], \
+                    state['_Assignment__deadline']
+        self.__assignmentId, self.__description, self.__deadline = state
+
+
+class AssignmentRecord(namedtuple('AssignmentRecord', ['assignmentId', 'description', 'deadline'])):
+    """
+    Immutable, tuple-backed representation of an assignment, for read-only queries
+    """
+
+    __slots__ = ()
+
+    def getAssignmentId(self):
+        return self.assignmentId
+
+    def getDescription(self):
+        return self.description
+
+    def getDeadline(self):
+        return self.deadline
+
+    def __str__(self):
+        return "{:d} - {} - {:%d.%m.%Y}".format(self.assignmentId, self.description, self.deadline)
@@ -1,8 +1,13 @@
+from collections import namedtuple
+
+
 class Grade:
     """
     Represents a grade
     """
 
+    __slots__ = ('__studentId', '__assignmentId', '__grade')
+
     def __init__(self, studentId: int, assignmentId: int, grade: int = None):
         self.__studentId = studentId
         self.__assignmentId = assignmentId
@@ -20,6 +25,16 @@ class Grade:
     def setGrade(self, grade: int):
         self.__grade = grade
 
+    def toRecord(self):
+        """
+        Returns an immutable copy of the grade
+        """
+        return GradeRecord(self.__studentId, self.__assignmentId, self.__grade)
+
+    @staticmethod
+    def fromRecord(record):
+        return Grade(record.studentId, record.assignmentId, record.grade)
+
     def __str__(self):
         gradeText = str(self.__grade) if self.__grade is not None else "No grade"
         return "{:d} - {:d} - {}".format(self.__studentId, self.__assignmentId, gradeText)
@@ -27,9 +42,44 @@ class Grade:
     def __eq__(self, other):
         if id(self) == id(other):
             return True
+        if type(other) is not Grade:
+            return NotImplemented
         if self.__studentId == other.__studentId and self.__assignmentId == other.__assignmentId:
             return True
         return False
 
+    def __hash__(self):
+        return hash((self.__studentId, self.__assignmentId))
+
     def __copy__(self):
         return Grade(self.__studentId, self.__assignmentId, self.__grade)
+
+    def __getstate__(self):
+        return self.__studentId, self.__assignmentId, self.__grade
+
+    def __setstate__(self, state):
+        if type(state) is dict:
+            # Pickled before the class used __slots__
+            state = state['_Grade__studentId'], state['_Grade__assignmentId'], state['_Grade__grade']
+        self.__studentId, self.__assignmentId, self.__grade = state
+
+
+class GradeRecord(namedtuple('GradeRecord', ['studentId', 'assignmentId', 'grade'])):
+    """
+    Immutable, tuple-backed representation of a grade, for read-only queries
+    """
+
+    __slots__ = ()
+
+    def getStudentId(self) -> int:
+        return self.studentId
+
+    def getAssignmentId(self) -> int:
+        return self.assignmentId
+
+    def getGrade(self) -> int:
+        return self.grade
+
+    def __str__(self):
+        gradeText = str(self.grade) if self.grade is not None else "No grade"
+        return "{:d} - {:d} - {}".format(self.studentId, self.assignmentId, gradeText)
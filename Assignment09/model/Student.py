@@ -1,8 +1,13 @@
+from collections import namedtuple
+
+
 class Student:
     """
     Represents a student
     """
 
+    __slots__ = ('__studentId', '__name', '__group')
+
     def __init__(self, studentId: int, name: str = None, group: int = None):
         self.__studentId = studentId
         self.__name = name
@@ -23,15 +28,59 @@ class Student:
     def setGroup(self, group: int):
         self.__group = group
 
+    def toRecord(self):
+        """
+        Returns an immutable copy of the student
+        """
+        return StudentRecord(self.__studentId, self.__name, self.__group)
+
+    @staticmethod
+    def fromRecord(record):
+        return Student(record.studentId, record.name, record.group)
+
     def __str__(self):
         return "{:d} - {} - {}".format(self.__studentId, self.__name, self.__group)
 
     def __eq__(self, other):
         if id(self) == id(other):
             return True
+        if type(other) is not Student:
+            return NotImplemented
         if self.__studentId == other.__studentId:
             return True
         return False
 
+    def __hash__(self):
+        return hash(self.__studentId)
+
     def __copy__(self):
         return Student(self.__studentId, self.__name, self.__group)
+
+    def __getstate__(self):
+        return self.__studentId, self.__name, self.__group
+
+    def __setstate__(self, state):
+        if type(state) is dict:
+            # Pickled before the class used __slots__
+            state = state['_Student__studentId'], state['_Student__name'], state['_Student__group']
+        self.__studentId, self.__name, self.__group = state
+
+
+class StudentRecord(namedtuple('StudentRecord', ['studentId', 'name', 'group'])):
+    """
+    Immutable, tuple-backed representation of a student, for read-only queries
+    """
+
+    __slots__ = ()
+
+    def getStudentId(self) -> int:
+        return self.studentId
+
+    def getName(self) -> str:
+        return self.name
+
+    def getGroup(self) -> int:
+        return self.group
+
+    def __str__(self):
+        return "{:d} - {} - {}".format(self.studentId, self.name, self.group)
@@ -5,23 +5,37 @@ from repository.FileRepository import FileRepository
 
 
 class BinaryRepository(FileRepository):
+    """
+    Repository pickled in a binary file. The number of items is written before the collection,
+    so it can be read without loading the whole file
+    """
 
     def _loadList(self):
         file = None
         try:
             file = open(self._fileName, 'rb')
-            self._collection = pickle.load(file)
+            header = pickle.load(file)
+            # Files written before the header was introduced hold only the collection
+            self._collection = header if type(header) is Vector else pickle.load(file)
         except FileNotFoundError:
             self._collection = Vector(self._itemType)
         finally:
             if file is not None:
                 file.close()
 
-    def _saveList(self):
+    def _saveList(self, items):
+        with self._openReplacement('wb') as file:
+            pickle.dump(len(items), file)
+            pickle.dump(items, file)
+
+    def _countFile(self):
         file = None
         try:
-            file = open(self._fileName, 'wb')
-            pickle.dump(self._collection, file)
+            file = open(self._fileName, 'rb')
+            header = pickle.load(file)
+            return header if type(header) is int else None
+        except FileNotFoundError:
+            return 0
         finally:
             if file is not None:
                 file.close()
@@ -1,37 +1,322 @@
+import os
+from contextlib import contextmanager
+from threading import Lock, RLock
+
+from repository.FlushPolicy import FlushPolicy
 from repository.Repository import Repository
 
 
 class FileRepository(Repository):
+    """
+    Repository persisted in a file.
+    Without a flush policy the file is read before and written after every operation.
+    With a flush policy the file is read once and kept in memory; it is read again only if its
+    modification time or size changes and there are no pending changes, and the pending changes
+    are written back when the policy decides so.
+    Inside a batch the file is read once and written once, when the batch ends.
+    Files which support it only get the new items appended when the pending changes are all additions.
+    Otherwise the whole collection is written to a temporary file, which then replaces the file.
+    A policy writing in the background only holds the repository while copying the collection, and skips
+    a copy if a later one was written first.
+    """
 
-    def __init__(self, itemType: type, fileName: str):
+    def __init__(self, itemType: type, fileName: str, flushPolicy: FlushPolicy = None):
         Repository.__init__(self, itemType)
         self._fileName = fileName
+        self.__flushPolicy = flushPolicy
+        self.__loaded = False
+        self.__fileSignature = None
+        self.__pendingOperations = 0
+        self.__pendingAdditions = []
+        self.__lock = RLock()
+        self.__writeLock = Lock()
+        self.__batchDepth = 0
+        self.__snapshotCount = 0
+        self.__writtenSnapshot = 0
 
     def addItem(self, item):
-        self._loadList()
-        Repository.addItem(self, item)
-        self._saveList()
+        with self.__lock:
+            self.__load()
+            Repository.addItem(self, item)
+            self.__save([item])
 
     def updateItem(self, item):
-        self._loadList()
-        Repository.updateItem(self, item)
-        self._saveList()
+        with self.__lock:
+            self.__load()
+            Repository.updateItem(self, item)
+            self.__save()
+
+    def addItems(self, items):
+        with self.__lock:
+            self.__load()
+            items = list(items)
+            Repository.addItems(self, items)
+            self.__save(items)
+
+    def updateItems(self, items):
+        with self.__lock:
+            self.__load()
+            Repository.updateItems(self, items)
+            self.__save()
+
+    def deleteItems(self, items):
+        with self.__lock:
+            self.__load()
+            Repository.deleteItems(self, items)
+            self.__save()
 
     def getItems(self):
-        self._loadList()
-        return Repository.getItems(self)
+        with self.__lock:
+            self.__load()
+            return Repository.getItems(self)
+
+    def getItemsIter(self):
+        """
+        Iterates over the items. Unless the cached collection is current, they are read straight from the file
+        when the repository supports it, without keeping them in memory.
+        """
+        with self.__lock:
+            if not self.__isCacheCurrent():
+                items = self._iterateFile()
+                if items is not None:
+                    return items
+            self.__load()
+            return Repository.getItemsIter(self)
 
     def getItem(self, item):
-        self._loadList()
-        return Repository.getItem(self, item)
+        with self.__lock:
+            self.__load()
+            return Repository.getItem(self, item)
+
+    def getPage(self, offset: int, limit: int, sortField: str = None, reverse: bool = False) -> list:
+        """
+        Returns a page of items. Unless the cached collection is current, the page is picked while the items are
+        read from the file, when the repository supports it.
+        """
+        with self.__lock:
+            if not self.__isCacheCurrent():
+                items = self._iterateFile()
+                if items is not None:
+                    return self._selectPage(items, offset, limit, sortField, reverse)
+            self.__load()
+            return Repository.getPage(self, offset, limit, sortField, reverse)
 
     def deleteItem(self, item):
+        with self.__lock:
+            self.__load()
+            Repository.deleteItem(self, item)
+            self.__save()
+
+    def findBy(self, **criteria):
+        with self.__lock:
+            self.__load()
+            return Repository.findBy(self, **criteria)
+
+    def view(self):
+        with self.__lock:
+            self.__load()
+            return Repository.view(self)
+
+    def viewItem(self, item):
+        with self.__lock:
+            self.__load()
+            return Repository.viewItem(self, item)
+
+    def count(self) -> int:
+        with self.__lock:
+            if not self.__isCacheCurrent():
+                fileCount = self._countFile()
+                if fileCount is not None:
+                    return fileCount
+                self.__load()
+            return Repository.count(self)
+
+    def isEmpty(self) -> bool:
+        with self.__lock:
+            if not self.__isCacheCurrent():
+                fileEmpty = self._isFileEmpty()
+                if fileEmpty is not None:
+                    return fileEmpty
+                self.__load()
+            return Repository.isEmpty(self)
+
+    @contextmanager
+    def batch(self):
+        """
+        Applies the changes made inside the with block to the collection right away, but writes them
+        to the file only when the block ends
+        """
+        with self.__lock:
+            self.__batchDepth += 1
+            try:
+                yield
+            finally:
+                self.__batchDepth -= 1
+                if self.__batchDepth == 0:
+                    self.__endBatch()
+
+    def __endBatch(self):
+        if self.__flushPolicy is None:
+            if self.__pendingOperations > 0:
+                self.__write()
+            self.__pendingOperations = 0
+            self.__loaded = False
+        elif self.__pendingOperations > 0 and self.__flushPolicy.shouldFlush(self, self.__pendingOperations):
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the pending changes to the file. Returns once the file holds every change made before the call,
+        including the changes a background write is busy with.
+        """
+        snapshot = None
+        with self.__lock:
+            if self.__pendingOperations > 0 and self.__flushPolicy is not None and self.__flushPolicy.writesInBackground():
+                snapshot = self._collection[:]
+                self.__snapshotCount += 1
+                snapshotNumber = self.__snapshotCount
+                self.__pendingAdditions = []
+                self.__pendingOperations = 0
+            elif self.__pendingOperations > 0:
+                self.__write()
+                self.__fileSignature = self.__readFileSignature()
+                self.__pendingOperations = 0
+        try:
+            fileSignature = None
+            with self.__writeLock:
+                if snapshot is not None and snapshotNumber > self.__writtenSnapshot:
+                    self._saveList(snapshot)
+                    self.__writtenSnapshot = snapshotNumber
+                    fileSignature = self.__readFileSignature()
+            # The signature is shared with the readers, which hold __lock; it is taken after __writeLock is
+            # released, as __write takes them the other way around, and kept only if no later snapshot was written
+            if fileSignature is not None:
+                with self.__lock:
+                    if self.__writtenSnapshot == snapshotNumber:
+                        self.__fileSignature = fileSignature
+        except BaseException:
+            # The collection is written again by the next flush
+            with self.__lock:
+                self.__pendingAdditions = None
+                self.__pendingOperations += 1
+            raise
+
+    def close(self):
+        """
+        Writes the pending changes to the file and stops the flush policy
+        """
+        try:
+            if self.__flushPolicy is not None:
+                self.__flushPolicy.close()
+        finally:
+            self.flush()
+
+    def __load(self):
+        if self.__flushPolicy is None:
+            if self.__batchDepth > 0 and self.__loaded:
+                return
+            self._loadList()
+            self.__loaded = self.__batchDepth > 0
+            return
+        fileSignature = self.__readFileSignature()
+        if self.__isCacheCurrent(fileSignature):
+            return
         self._loadList()
-        Repository.deleteItem(self, item)
-        self._saveList()
+        self.__fileSignature = fileSignature
+        self.__loaded = True
+
+    def __isCacheCurrent(self, fileSignature=None) -> bool:
+        if not self.__loaded:
+            return False
+        if self.__flushPolicy is None:
+            return self.__batchDepth > 0
+        if self.__pendingOperations > 0:
+            return True
+        if fileSignature is None:
+            fileSignature = self.__readFileSignature()
+        return fileSignature == self.__fileSignature
+
+    def __save(self, addedItems: list = None):
+        """
+        :param addedItems: The items added by the change, None if the change is not an addition
+        """
+        if addedItems is None:
+            self.__pendingAdditions = None
+        elif self.__pendingAdditions is not None:
+            self.__pendingAdditions.extend(addedItems)
+        if self.__flushPolicy is None and self.__batchDepth == 0:
+            self.__write()
+            return
+        self.__pendingOperations += 1
+        if self.__batchDepth == 0 and self.__flushPolicy.shouldFlush(self, self.__pendingOperations):
+            self.flush()
+
+    def __write(self):
+        with self.__writeLock:
+            if self.__pendingAdditions is None or not self._appendList(self.__pendingAdditions):
+                self._saveList(self._collection)
+        self.__pendingAdditions = []
+
+    def __readFileSignature(self):
+        try:
+            fileStatus = os.stat(self._fileName)
+            return fileStatus.st_mtime_ns, fileStatus.st_size
+        except FileNotFoundError:
+            return None
+
+    def _appendList(self, items: list) -> bool:
+        """
+        Appends the given items to the end of the file, without writing the others again
+        :return: False if the file can only be written as a whole
+        """
+        return False
+
+    def _iterateFile(self):
+        """
+        Reads the items from the file one at a time
+        :return: An iterator over the items, or None if the file can only be read at once
+        """
+        return None
+
+    def _countFile(self):
+        """
+        Counts the items stored in the file without loading them
+        :return: The number of items, or None if it cannot be found out without loading the file
+        """
+        return None
+
+    def _isFileEmpty(self):
+        """
+        Checks if there are any items stored in the file without loading them
+        :return: True or False, or None if it cannot be found out without loading the file
+        """
+        count = self._countFile()
+        return None if count is None else count == 0
 
     def _loadList(self):
         raise NotImplementedError
 
-    def _saveList(self):
+    def _saveList(self, items):
+        """
+        Writes the given items to the file, replacing its contents
+        """
         raise NotImplementedError
+
+    @contextmanager
+    def _openReplacement(self, mode: str, **openArguments):
+        """
+        Opens a temporary file to write the whole collection to. When the with block ends, the temporary file
+        is synced to the disk and moved over the file, so the file never holds a partly written collection.
+        """
+        temporaryFileName = self._fileName + '.tmp'
+        file = open(temporaryFileName, mode, **openArguments)
+        try:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        except BaseException:
+            file.close()
+            os.remove(temporaryFileName)
+            raise
+        file.close()
+        os.replace(temporaryFileName, self._fileName)
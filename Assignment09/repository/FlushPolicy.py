@@ -0,0 +1,160 @@
+from threading import Condition, Lock, Thread, Timer
+
+
+class FlushPolicy:
+    """
+    Decides when a cached file repository writes its pending changes back to the file
+    """
+
+    def shouldFlush(self, repository, pendingOperations: int) -> bool:
+        """
+        Called after every change made to the cached collection
+        :param repository: The repository which holds the pending changes
+        :param pendingOperations: The number of changes not yet written to the file
+        :return: True if the repository should be flushed right away
+        """
+        raise NotImplementedError
+
+    def writesInBackground(self) -> bool:
+        """
+        Checks if the repository is flushed by another thread, in which case it copies its collection
+        before writing it, instead of blocking the changes made in the meantime
+        """
+        return False
+
+    def close(self):
+        """
+        Releases any resource held by the policy
+        """
+        pass
+
+    @staticmethod
+    def fromSettings(policyName: str, interval: str):
+        """
+        Creates a new flush policy from the values found in the settings file
+        :param policyName: none, immediate, operations, close, timer or background
+        :param interval: The number of operations for 'operations', the number of seconds for 'timer'
+        :return: The created policy, or None if the repository should not be cached
+        """
+        if policyName == 'immediate':
+            return ImmediateFlush()
+        if policyName == 'operations':
+            return OperationCountFlush(int(interval))
+        if policyName == 'close':
+            return CloseFlush()
+        if policyName == 'timer':
+            return TimerFlush(float(interval))
+        if policyName == 'background':
+            return BackgroundFlush()
+        return None
+
+
+class ImmediateFlush(FlushPolicy):
+    """
+    Writes the file after every change
+    """
+
+    def shouldFlush(self, repository, pendingOperations: int) -> bool:
+        return True
+
+
+class OperationCountFlush(FlushPolicy):
+    """
+    Writes the file once every given number of changes
+    """
+
+    def __init__(self, operations: int):
+        self.__operations = max(operations, 1)
+
+    def shouldFlush(self, repository, pendingOperations: int) -> bool:
+        return pendingOperations >= self.__operations
+
+
+class CloseFlush(FlushPolicy):
+    """
+    Writes the file only when the repository is closed
+    """
+
+    def shouldFlush(self, repository, pendingOperations: int) -> bool:
+        return False
+
+
+class TimerFlush(FlushPolicy):
+    """
+    Writes the file a given number of seconds after the first unsaved change
+    """
+
+    def __init__(self, seconds: float):
+        self.__seconds = seconds
+        self.__timer = None
+        self.__lock = Lock()
+
+    def shouldFlush(self, repository, pendingOperations: int) -> bool:
+        with self.__lock:
+            if self.__timer is None or not self.__timer.is_alive():
+                self.__timer = Timer(self.__seconds, repository.flush)
+                self.__timer.daemon = True
+                self.__timer.start()
+        return False
+
+    def close(self):
+        with self.__lock:
+            if self.__timer is not None:
+                self.__timer.cancel()
+                self.__timer = None
+
+
+class BackgroundFlush(FlushPolicy):
+    """
+    Writes the file on a background thread, so changes do not wait for the file to be written.
+    The changes made while the thread is writing are written together by its next write.
+    An error raised by a background write is raised again when the policy is closed.
+    """
+
+    def __init__(self):
+        self.__condition = Condition()
+        self.__thread = None
+        self.__requested = False
+        self.__closed = False
+        self.__error = None
+
+    def shouldFlush(self, repository, pendingOperations: int) -> bool:
+        with self.__condition:
+            if self.__closed:
+                return True
+            if self.__thread is None:
+                self.__thread = Thread(target=self.__run, args=(repository,), daemon=True)
+                self.__thread.start()
+            self.__requested = True
+            self.__condition.notify()
+        return False
+
+    def writesInBackground(self) -> bool:
+        return True
+
+    def close(self):
+        """
+        Waits for the requested writes to finish and stops the thread
+        """
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify()
+            thread = self.__thread
+        if thread is not None:
+            thread.join()
+        if self.__error is not None:
+            error = self.__error
+            self.__error = None
+            raise error
+
+    def __run(self, repository):
+        while True:
+            with self.__condition:
+                self.__condition.wait_for(lambda: self.__requested or self.__closed)
+                if not self.__requested:
+                    return
+                self.__requested = False
+            try:
+                repository.flush()
+            except Exception as error:
+                self.__error = error
@@ -0,0 +1,308 @@
+import os
+import pickle
+import struct
+import zlib
+from contextlib import contextmanager
+
+from lib.CustomComponents import Vector
+from repository.Repository import Repository
+
+
+class JournalRepository(Repository):
+    """
+    Repository persisted as a snapshot file and a journal of the changes made since the snapshot.
+    Every change is appended to the journal, so writing does not depend on the number of items.
+    When the repository is first used the snapshot is read and the journal replayed on top of it.
+    Once the journal grows past the compaction size, the collection is written to a new snapshot
+    and the journal is started over.
+
+    The snapshot and the journal both hold a generation number. A journal whose generation differs
+    from the snapshot's was already compacted into it, which happens if the program stops between
+    replacing the snapshot and clearing the journal. Every journal record holds its length and
+    checksum, so a record cut short by a crash is detected and dropped together with anything after it.
+    Changes made together, by the bulk operations or inside a batch, are synced to the disk once.
+    The snapshot also holds its number of items, so the items can be counted before the repository is loaded
+    by reading the journal only, whose size is bounded by the compaction size.
+    """
+
+    ADD = 'a'
+    UPDATE = 'u'
+    DELETE = 'd'
+
+    __generationFormat = struct.Struct('<Q')
+    __recordHeaderFormat = struct.Struct('<II')
+
+    def __init__(self, itemType: type, fileName: str, compactionSize: int = 1 << 20):
+        """
+        :param fileName: The snapshot file. The journal is kept next to it, in fileName + '.log'
+        :param compactionSize: The size in bytes the journal can reach before it is compacted
+        """
+        Repository.__init__(self, itemType)
+        self._fileName = fileName
+        self._journalFileName = fileName + '.log'
+        self.__compactionSize = compactionSize
+        self.__generation = 0
+        self.__journal = None
+        self.__journalSize = 0
+        self.__batchDepth = 0
+
+    def addItem(self, item):
+        self.__load()
+        Repository.addItem(self, item)
+        self.__append([(JournalRepository.ADD, item)])
+
+    def updateItem(self, item):
+        self.__load()
+        Repository.updateItem(self, item)
+        self.__append([(JournalRepository.UPDATE, item)])
+
+    def deleteItem(self, item):
+        self.__load()
+        Repository.deleteItem(self, item)
+        self.__append([(JournalRepository.DELETE, item)])
+
+    def addItems(self, items):
+        self.__load()
+        items = list(items)
+        Repository.addItems(self, items)
+        self.__append([(JournalRepository.ADD, item) for item in items])
+
+    def updateItems(self, items):
+        self.__load()
+        items = list(items)
+        Repository.updateItems(self, items)
+        self.__append([(JournalRepository.UPDATE, item) for item in items])
+
+    def deleteItems(self, items):
+        self.__load()
+        items = list(items)
+        Repository.deleteItems(self, items)
+        self.__append([(JournalRepository.DELETE, item) for item in items])
+
+    def getItems(self):
+        self.__load()
+        return Repository.getItems(self)
+
+    def getItemsIter(self):
+        self.__load()
+        return Repository.getItemsIter(self)
+
+    def getItem(self, item):
+        self.__load()
+        return Repository.getItem(self, item)
+
+    def findBy(self, **criteria):
+        self.__load()
+        return Repository.findBy(self, **criteria)
+
+    def getPage(self, offset: int, limit: int, sortField: str = None, reverse: bool = False) -> list:
+        self.__load()
+        return Repository.getPage(self, offset, limit, sortField, reverse)
+
+    def view(self):
+        self.__load()
+        return Repository.view(self)
+
+    def viewItem(self, item):
+        self.__load()
+        return Repository.viewItem(self, item)
+
+    def count(self) -> int:
+        """
+        Returns the number of items. Before the repository is loaded, it is the number held by the snapshot
+        corrected by the additions and deletions in the journal, without building the collection.
+        """
+        if self.__journal is None:
+            fileCount = self.__countFiles()
+            if fileCount is not None:
+                return fileCount
+        self.__load()
+        return Repository.count(self)
+
+    @contextmanager
+    def batch(self):
+        """
+        Appends the changes made inside the with block to the journal, but syncs it to the disk
+        only when the block ends
+        """
+        self.__load()
+        self.__batchDepth += 1
+        try:
+            yield
+        finally:
+            self.__batchDepth -= 1
+            if self.__batchDepth == 0:
+                self.__sync()
+
+    def compact(self):
+        """
+        Writes the collection to a new snapshot and clears the journal
+        """
+        self.__load()
+        generation = self.__generation + 1
+        temporaryFileName = self._fileName + '.tmp'
+        file = None
+        try:
+            file = open(temporaryFileName, 'wb')
+            pickle.dump(generation, file)
+            pickle.dump(len(self._collection), file)
+            pickle.dump(self._collection, file)
+            file.flush()
+            os.fsync(file.fileno())
+        finally:
+            if file is not None:
+                file.close()
+        os.replace(temporaryFileName, self._fileName)
+        self.__generation = generation
+        self.__journal.close()
+        self.__startJournal()
+
+    def close(self):
+        """
+        Closes the journal. Every change is already written to it.
+        """
+        if self.__journal is not None:
+            self.__journal.close()
+            self.__journal = None
+
+    def __load(self):
+        if self.__journal is not None:
+            return
+        items = self.__readSnapshot()
+        validSize = self.__replayJournal(items)
+        self._collection = Vector.fromList(list(items.values()), self._itemType)
+        if validSize is None:
+            self.__startJournal()
+            return
+        # Drop whatever follows the last complete record
+        self.__journal = open(self._journalFileName, 'r+b')
+        self.__journal.truncate(validSize)
+        self.__journal.seek(validSize)
+        self.__journalSize = validSize
+        if self.__journalSize > self.__compactionSize:
+            self.compact()
+
+    def __readSnapshot(self) -> dict:
+        """
+        Reads the snapshot and its generation
+        :return: The items in the snapshot, by key
+        """
+        file = None
+        try:
+            file = open(self._fileName, 'rb')
+            self.__generation = pickle.load(file)
+            items = pickle.load(file)
+            # Snapshots written before the number of items was stored hold the collection right away
+            if type(items) is int:
+                items = pickle.load(file)
+            return {self.getKey(item): item for item in items}
+        except FileNotFoundError:
+            self.__generation = 0
+            return {}
+        finally:
+            if file is not None:
+                file.close()
+
+    def __replayJournal(self, items: dict):
+        """
+        Applies the changes in the journal to the items read from the snapshot
+        :return: The size of the journal up to its last complete record, None if it has to be started over
+        """
+        file = None
+        try:
+            file = open(self._journalFileName, 'rb')
+            header = file.read(JournalRepository.__generationFormat.size)
+            if len(header) < JournalRepository.__generationFormat.size or \
+                    JournalRepository.__generationFormat.unpack(header)[0] != self.__generation:
+                return None
+            validSize = len(header)
+            while True:
+                record = self.__readRecord(file)
+                if record is None:
+                    return validSize
+                operation, item = record
+                if operation == JournalRepository.DELETE:
+                    items.pop(self.getKey(item), None)
+                else:
+                    items[self.getKey(item)] = item
+                validSize = file.tell()
+        except FileNotFoundError:
+            return None
+        finally:
+            if file is not None:
+                file.close()
+
+    def __countFiles(self):
+        """
+        Counts the items stored without loading the snapshot's collection
+        :return: The number of items, or None if the snapshot does not hold it
+        """
+        file = None
+        try:
+            file = open(self._fileName, 'rb')
+            generation = pickle.load(file)
+            count = pickle.load(file)
+            if type(count) is not int:
+                return None
+        except FileNotFoundError:
+            generation, count = 0, 0
+        finally:
+            if file is not None:
+                file.close()
+
+        file = None
+        try:
+            file = open(self._journalFileName, 'rb')
+            header = file.read(JournalRepository.__generationFormat.size)
+            if len(header) < JournalRepository.__generationFormat.size or \
+                    JournalRepository.__generationFormat.unpack(header)[0] != generation:
+                return count
+            while True:
+                record = self.__readRecord(file)
+                if record is None:
+                    return count
+                if record[0] == JournalRepository.ADD:
+                    count += 1
+                elif record[0] == JournalRepository.DELETE:
+                    count -= 1
+        except FileNotFoundError:
+            return count
+        finally:
+            if file is not None:
+                file.close()
+
+    @staticmethod
+    def __readRecord(file):
+        header = file.read(JournalRepository.__recordHeaderFormat.size)
+        if len(header) < JournalRepository.__recordHeaderFormat.size:
+            return None
+        length, checksum = JournalRepository.__recordHeaderFormat.unpack(header)
+        payload = file.read(length)
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            return None
+        try:
+            return pickle.loads(payload)
+        except (pickle.UnpicklingError, EOFError, ValueError):
+            return None
+
+    def __startJournal(self):
+        self.__journal = open(self._journalFileName, 'wb')
+        self.__journal.write(JournalRepository.__generationFormat.pack(self.__generation))
+        self.__journal.flush()
+        os.fsync(self.__journal.fileno())
+        self.__journalSize = JournalRepository.__generationFormat.size
+
+    def __append(self, changes: list):
+        for change in changes:
+            payload = pickle.dumps(change)
+            self.__journal.write(JournalRepository.__recordHeaderFormat.pack(len(payload), zlib.crc32(payload)))
+            self.__journal.write(payload)
+            self.__journalSize += JournalRepository.__recordHeaderFormat.size + len(payload)
+        if self.__batchDepth == 0:
+            self.__sync()
+
+    def __sync(self):
+        self.__journal.flush()
+        os.fsync(self.__journal.fileno())
+        if self.__journalSize > self.__compactionSize:
+            self.compact()
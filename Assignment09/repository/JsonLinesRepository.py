@@ -0,0 +1,82 @@
+import os
+
+from lib.CustomComponents import Vector
+from repository.FileRepository import FileRepository
+from utils.JSONConverter import JSONConverter
+
+
+class JsonLinesRepository(FileRepository):
+    """
+    Repository stored in a JSON Lines file, which holds one compact JSON object per line.
+    The file is read one line at a time, and added items are appended to it.
+    """
+
+    def _loadList(self):
+        file = None
+        try:
+            file = open(self._fileName, 'rb')
+            self._collection = Vector(self._itemType, self.__readItems(file))
+        except FileNotFoundError:
+            self._collection = Vector(self._itemType)
+        finally:
+            if file is not None:
+                file.close()
+
+    def _saveList(self, items):
+        with self._openReplacement('wb') as file:
+            file.writelines(map(JSONConverter.convertItemToLine, items))
+
+    def _appendList(self, items: list) -> bool:
+        file = None
+        try:
+            file = open(self._fileName, 'a+b')
+            if file.seek(0, os.SEEK_END) > 0:
+                # A file edited by hand may lack the final line break
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b'\n':
+                    file.write(b'\n')
+            file.writelines(map(JSONConverter.convertItemToLine, items))
+        finally:
+            if file is not None:
+                file.close()
+        return True
+
+    def _iterateFile(self):
+        file = None
+        try:
+            file = open(self._fileName, 'rb')
+            yield from self.__readItems(file)
+        except FileNotFoundError:
+            return
+        finally:
+            if file is not None:
+                file.close()
+
+    def _countFile(self):
+        file = None
+        try:
+            file = open(self._fileName, 'rb')
+            return sum(1 for line in file if line.strip())
+        except FileNotFoundError:
+            return 0
+        finally:
+            if file is not None:
+                file.close()
+
+    def _isFileEmpty(self):
+        file = None
+        try:
+            file = open(self._fileName, 'rb')
+            for line in file:
+                if line.strip():
+                    return False
+            return True
+        except FileNotFoundError:
+            return True
+        finally:
+            if file is not None:
+                file.close()
+
+    def __readItems(self, file):
+        toItem = JSONConverter.convertLineToItem
+        return (toItem(self._itemType, line) for line in file if line.strip())
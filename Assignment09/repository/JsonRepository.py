@@ -8,21 +8,36 @@ class JsonRepository(FileRepository):
         file = None
         try:
             file = open(self._fileName, 'r')
-            self._collection = Vector.fromList(JSONConverter.convertJSONToList(
-                self._itemType,
-                file.read()
-            ), self._itemType)
+            content = file.read()
+            # A blank file holds no items, like a missing one
+            if content.strip() == '':
+                self._collection = Vector(self._itemType)
+            else:
+                self._collection = Vector.fromList(JSONConverter.convertJSONToList(
+                    self._itemType,
+                    content
+                ), self._itemType)
         except FileNotFoundError:
             self._collection = Vector(self._itemType)
         finally:
             if file is not None:
                 file.close()
 
-    def _saveList(self):
+    def _saveList(self, items):
+        with self._openReplacement('w') as file:
+            file.write(JSONConverter.convertListToJSON(self._itemType, Vector.toList(items)))
+
+    def _isFileEmpty(self):
         file = None
         try:
-            file = open(self._fileName, 'w')
-            file.write(JSONConverter.convertListToJSON(self._itemType, Vector.toList(self._collection)))
+            file = open(self._fileName, 'r')
+            # An empty list is written as "[]", any other list has an item right after the bracket
+            beginning = file.read(64).lstrip()
+            if beginning == '':
+                return True
+            return beginning[:1] == '[' and beginning[1:].lstrip()[:1] == ']'
+        except FileNotFoundError:
+            return True
         finally:
             if file is not None:
                 file.close()
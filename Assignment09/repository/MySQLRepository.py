@@ -1,57 +1,184 @@
-from mysql.connector import MySQLConnection
+from contextlib import contextmanager
+
 from repository.Repository import Repository
-from repository.RepositoryError import DuplicateItemError, ItemNotFoundError
+from repository.RepositoryError import DuplicateItemError, ItemNotFoundError, RepositoryError
 from utils.MySQLConnector import MySQLConnector
 
 
 class MySQLRepository(Repository):
     """
-    Repository backed up by a database table
+    Repository backed up by a database table.
+    Every statement is built once and prepared on the server by each connection of the pool.
+    Duplicate items are rejected by the primary key of the table, and missing items are found by the number
+    of rows an update or delete matched, so no change reads the table first.
+    The bulk operations run in one transaction.
     """
 
-    def __init__(self, itemType: type, tableName: str, connection: MySQLConnection):
+    def __init__(self, itemType: type, tableName: str, connector: MySQLConnector):
         Repository.__init__(self, itemType)
-        self.__tableName = tableName
-        self.__connection = connection
-        self.__cursor = connection.cursor(buffered=True)
+        self.__connector = connector
+        self.__integrityError = connector.getIntegrityError()
+        connector.addRollbackListener(self._notifyReloaded)
+
+        table = MySQLConnector.quote(tableName)
+        self.__columns = MySQLConnector.getColumns(itemType)
+        keyCondition = MySQLConnector.keyCondition(itemType)
+
+        self.__selectStatement = "SELECT * FROM " + table
+        self.__selectItemStatement = self.__selectStatement + " WHERE " + keyCondition
+        self.__insertStatement = "INSERT INTO " + table + " VALUES (" + ", ".join(["%s"] * len(self.__columns)) + ")"
+        self.__updateStatement = "UPDATE " + table + " SET " + MySQLConnector.updateAssignments(itemType) + \
+                                 " WHERE " + keyCondition
+        self.__deleteAllStatement = "DELETE FROM " + table
+        self.__deleteStatement = self.__deleteAllStatement + " WHERE " + keyCondition
+        self.__countStatement = "SELECT COUNT(*) FROM " + table
+        self.__existsStatement = "SELECT 1 FROM " + table + " LIMIT 1"
+        self.__conditionStatements = {}
+        self.__pageStatements = {}
+        self.__keyColumns = self.__columns[:MySQLConnector.getKeyColumnCount(itemType)]
 
     def addItem(self, item):
         self.checkType(item)
-        self.__connection.commit()
-        self.__cursor.execute("SELECT * FROM " + self.__tableName + " WHERE " + MySQLConnector.idCheckString(item))
-        if self.__cursor.rowcount > 0:
+        try:
+            with self.__connector.connection() as connection:
+                connection.execute(self.__insertStatement, MySQLRepository.__row(item))
+        except self.__integrityError:
             raise DuplicateItemError(self._itemType)
-        self.__cursor.execute("INSERT INTO " + self.__tableName + " VALUES (" + MySQLConnector.valuesString(item) + ")")
-        self.__connection.commit()
+        self._notifyAdded(item)
+
+    def addItems(self, items):
+        items = list(items)
+        for item in items:
+            self.checkType(item)
+        if len(items) == 0:
+            return
+        try:
+            with self.__connector.transaction(), self.__connector.connection() as connection:
+                connection.insertMany(self.__insertStatement, list(map(MySQLRepository.__row, items)))
+        except self.__integrityError:
+            raise DuplicateItemError(self._itemType)
+        for item in items:
+            self._notifyAdded(item)
+
+    def updateItems(self, items):
+        items = list(items)
+        with self.__connector.transaction(), self.__connector.connection() as connection:
+            matched = connection.executeMany(self.__updateStatement, list(map(MySQLRepository.__updateRow, items)))
+            if matched < len(items):
+                raise ItemNotFoundError
+        for item in items:
+            self._notifyUpdated(item)
+
+    def deleteItems(self, items):
+        items = list({self.getKey(item): item for item in items}.values())
+        with self.__connector.transaction(), self.__connector.connection() as connection:
+            matched = connection.executeMany(self.__deleteStatement, list(map(MySQLConnector.keyParameters, items)))
+            if matched < len(items):
+                raise ItemNotFoundError
+        for item in items:
+            self._notifyRemoved(item)
 
     def getItems(self):
-        self.__connection.commit()
-        self.__cursor.execute("SELECT * FROM " + self.__tableName)
-        return MySQLConnector.convertTuples(self.__cursor.fetchall(), self._itemType)
+        return MySQLConnector.convertTuples(self.__query(self.__selectStatement), self._itemType)
+
+    def getItemsIter(self):
+        return iter(self.getItems())
+
+    def view(self):
+        return iter(MySQLConnector.convertTuplesToRecords(self.__query(self.__selectStatement), self._itemType))
+
+    def viewItem(self, item):
+        self.checkType(item)
+        rows = self.__query(self.__selectItemStatement, MySQLConnector.keyParameters(item))
+        return MySQLConnector.convertTuplesToRecords(rows, self._itemType)[0] if len(rows) > 0 else None
 
     def getItem(self, item):
         self.checkType(item)
-        self.__connection.commit()
-        self.__cursor.execute("SELECT * FROM " + self.__tableName + " WHERE " + MySQLConnector.idCheckString(item))
-        if self.__cursor.rowcount > 0:
-            return MySQLConnector.convertTuples([self.__cursor.fetchone()], self._itemType)[0]
-        return None
+        rows = self.__query(self.__selectItemStatement, MySQLConnector.keyParameters(item))
+        return MySQLConnector.convertTuples(rows, self._itemType)[0] if len(rows) > 0 else None
+
+    def count(self) -> int:
+        return self.__query(self.__countStatement)[0][0]
+
+    def isEmpty(self) -> bool:
+        return len(self.__query(self.__existsStatement)) == 0
+
+    def findBy(self, **criteria):
+        rows = self.__query(self.__selectStatement + " WHERE " + self.__conditions(criteria),
+                            tuple(criteria.values()))
+        return MySQLConnector.convertTuples(rows, self._itemType)
+
+    def deleteBy(self, **criteria) -> list:
+        """
+        Reads and deletes the matching items with one statement each, in one transaction
+        """
+        conditions = self.__conditions(criteria)
+        with self.__connector.transaction(), self.__connector.connection() as connection:
+            rows = connection.query(self.__selectStatement + " WHERE " + conditions, tuple(criteria.values()))
+            connection.execute(self.__deleteAllStatement + " WHERE " + conditions, tuple(criteria.values()))
+        items = MySQLConnector.convertTuples(rows, self._itemType)
+        for item in items:
+            self._notifyRemoved(item)
+        return items
+
+    def getPage(self, offset: int, limit: int, sortField: str = None, reverse: bool = False) -> list:
+        """
+        Returns a page of items, read with LIMIT and OFFSET
+        """
+        Repository._checkPage(offset, limit)
+        if (sortField, reverse) not in self.__pageStatements:
+            if sortField is not None and sortField not in self.__columns:
+                raise RepositoryError("Unknown field: " + sortField)
+            # MySQL orders NULL values first, as the other repositories do
+            orderColumns = ((sortField,) if sortField is not None else ()) + self.__keyColumns
+            direction = " DESC" if reverse else ""
+            self.__pageStatements[(sortField, reverse)] = \
+                self.__selectStatement + " ORDER BY " + \
+                ", ".join(MySQLConnector.quote(column) + direction for column in orderColumns) + " LIMIT %s OFFSET %s"
+        rows = self.__query(self.__pageStatements[(sortField, reverse)], (limit, offset))
+        return MySQLConnector.convertTuples(rows, self._itemType)
 
     def updateItem(self, item):
-        self.__connection.commit()
-        self.__cursor.execute("SELECT * FROM " + self.__tableName + " WHERE " + MySQLConnector.idCheckString(item))
-        if self.__cursor.rowcount > 0:
-            self.__cursor.execute("UPDATE " + self.__tableName + " SET " +
-                                  MySQLConnector.updateString(item) + " WHERE " + MySQLConnector.idCheckString(item))
-            self.__connection.commit()
-            return
-        raise ItemNotFoundError
+        self.checkType(item)
+        with self.__connector.connection() as connection:
+            matched = connection.execute(self.__updateStatement, MySQLRepository.__updateRow(item))
+        if matched == 0:
+            raise ItemNotFoundError
+        self._notifyUpdated(item)
 
     def deleteItem(self, item):
-        self.__connection.commit()
-        self.__cursor.execute("SELECT * FROM " + self.__tableName + " WHERE " + MySQLConnector.idCheckString(item))
-        if self.__cursor.rowcount > 0:
-            self.__cursor.execute("DELETE FROM " + self.__tableName + " WHERE " + MySQLConnector.idCheckString(item))
-            self.__connection.commit()
-            return
-        raise ItemNotFoundError
+        self.checkType(item)
+        with self.__connector.connection() as connection:
+            matched = connection.execute(self.__deleteStatement, MySQLConnector.keyParameters(item))
+        if matched == 0:
+            raise ItemNotFoundError
+        self._notifyRemoved(item)
+
+    @contextmanager
+    def batch(self):
+        """
+        Runs the changes made inside the with block in a single transaction
+        """
+        with self.__connector.transaction():
+            yield
+
+    def __conditions(self, criteria: dict) -> str:
+        fields = tuple(criteria)
+        if fields not in self.__conditionStatements:
+            for field in fields:
+                if field not in self.__columns:
+                    raise RepositoryError("Unknown field: " + field)
+            self.__conditionStatements[fields] = " AND ".join(MySQLConnector.quote(field) + " = %s" for field in fields)
+        return self.__conditionStatements[fields]
+
+    def __query(self, statement: str, parameters: tuple = ()) -> list:
+        with self.__connector.connection() as connection:
+            return connection.query(statement, parameters)
+
+    @staticmethod
+    def __row(item) -> tuple:
+        return MySQLConnector.keyParameters(item) + MySQLConnector.valueParameters(item)
+
+    @staticmethod
+    def __updateRow(item) -> tuple:
+        return MySQLConnector.valueParameters(item) + MySQLConnector.keyParameters(item)
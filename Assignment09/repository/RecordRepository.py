@@ -0,0 +1,327 @@
+import mmap
+import os
+import struct
+
+from repository.Repository import Repository
+from repository.RepositoryError import DuplicateItemError, ItemNotFoundError, RepositoryError
+from utils.RecordConverter import RecordConverter
+
+
+class RecordRepository(Repository):
+    """
+    Repository stored in a file of packed binary records, accessed through a memory map.
+    Opening the repository only reads the keys of the records, to find the offset of every record.
+    Items are built from the mapped file when they are requested, and changes are written in place.
+
+    Grades are fixed-width records kept next to each other: deleting one moves the last record in its
+    place. Students and assignments are stored in slots which hold the length of the record; a record
+    which outgrows its slot is moved to the end of the file, and deleted slots are reclaimed once they
+    take up half of the file.
+    """
+
+    __headerFormat = struct.Struct('<4sBxxxQQ')
+    __slotFormat = struct.Struct('<IIB')
+    __magic = b'IREC'
+    __initialSize = 4096
+
+    def __init__(self, itemType: type, fileName: str):
+        Repository.__init__(self, itemType)
+        self._fileName = fileName
+        self.__typeCode = RecordConverter.getTypeCode(itemType)
+        self.__fixedWidth = RecordConverter.isFixedWidth(itemType)
+        self.__recordSize = RecordConverter.getFixedSize(itemType)
+        self.__file = None
+        self.__map = None
+        self.__end = 0
+        self.__deadBytes = 0
+        self.__offsets = {}
+        self.__secondaryKeyFunctions = Repository._secondaryKeyFunctions.get(itemType, {})
+        self.__secondaryIndexes = None
+
+    def addItem(self, item):
+        self.addItems([item])
+
+    def addItems(self, items):
+        self.__load()
+        items = list(items)
+        keys = set()
+        for item in items:
+            self.checkType(item)
+            key = self.getKey(item)
+            if key in self.__offsets or key in keys:
+                raise DuplicateItemError(self._itemType)
+            keys.add(key)
+        records = [RecordConverter.packItem(item) for item in items]
+        self.__reserve(sum(map(self.__storedSize, records)))
+        if self.__fixedWidth:
+            offset = self.__end
+            self.__map[offset:offset + len(records) * self.__recordSize] = b''.join(records)
+            self.__end += len(records) * self.__recordSize
+            offsets = range(offset, self.__end, self.__recordSize)
+        else:
+            offsets = [self.__append(record) for record in records]
+        for item, offset in zip(items, offsets):
+            self.__index(item, offset)
+        self.__writeHeader()
+        for item in items:
+            self._notifyAdded(item)
+
+    def updateItem(self, item):
+        self.updateItems([item])
+
+    def updateItems(self, items):
+        self.__load()
+        items = list(items)
+        for item in items:
+            if self.getKey(item) not in self.__offsets:
+                raise ItemNotFoundError
+        for item in items:
+            offset = self.__offsets[self.getKey(item)]
+            self.__unindex(offset)
+            record = RecordConverter.packItem(item)
+            if self.__fixedWidth:
+                self.__map[offset:offset + len(record)] = record
+            elif len(record) <= RecordRepository.__slotFormat.unpack_from(self.__map, offset)[0]:
+                self.__writeSlot(offset, record)
+            else:
+                self.__kill(offset)
+                self.__reserve(self.__storedSize(record))
+                offset = self.__append(record)
+            self.__index(item, offset)
+        self.__writeHeader()
+        for item in items:
+            self._notifyUpdated(item)
+        self.__compactIfNeeded()
+
+    def deleteItem(self, item):
+        self.deleteItems([item])
+
+    def deleteItems(self, items):
+        self.__load()
+        items = list({self.getKey(item): item for item in items}.values())
+        for item in items:
+            if self.getKey(item) not in self.__offsets:
+                raise ItemNotFoundError
+        for item in items:
+            offset = self.__offsets[self.getKey(item)]
+            self.__unindex(offset)
+            del self.__offsets[self.getKey(item)]
+            if self.__fixedWidth:
+                self.__moveLastRecord(offset)
+            else:
+                self.__kill(offset)
+        self.__writeHeader()
+        for item in items:
+            self._notifyRemoved(item)
+        self.__compactIfNeeded()
+
+    def getItems(self):
+        return list(self.getItemsIter())
+
+    def getItemsIter(self):
+        return map(self._itemType.fromRecord, self.__iterateRecords())
+
+    def getItem(self, item):
+        record = self.viewItem(item)
+        return self._itemType.fromRecord(record) if record is not None else None
+
+    def getPage(self, offset: int, limit: int, sortField: str = None, reverse: bool = False) -> list:
+        """
+        Returns a page of items, picked while the records are read, so only the items of the page are built
+        """
+        records = self._selectPage(self.__iterateRecords(), offset, limit, sortField, reverse)
+        return [self._itemType.fromRecord(record) for record in records]
+
+    def view(self):
+        return iter(list(self.__iterateRecords()))
+
+    def viewItem(self, item):
+        self.__load()
+        self.checkType(item)
+        offset = self.__offsets.get(self.getKey(item))
+        return self.__readRecord(offset) if offset is not None else None
+
+    def count(self) -> int:
+        self.__load()
+        return len(self.__offsets)
+
+    def findBy(self, **criteria):
+        self.__load()
+        if self.__secondaryIndexes is None:
+            self.__secondaryIndexes = {field: {} for field in self.__secondaryKeyFunctions}
+            for offset in self.__iterateOffsets():
+                self.__addToSecondaryIndexes(self.__readRecord(offset))
+        candidateKeys = None
+        for field, value in criteria.items():
+            if field in self.__secondaryIndexes:
+                fieldKeys = self.__secondaryIndexes[field].get(value, {})
+                if candidateKeys is None or len(fieldKeys) < len(candidateKeys):
+                    candidateKeys = fieldKeys
+        if candidateKeys is None:
+            records = self.__iterateRecords()
+        else:
+            records = [self.__readRecord(self.__offsets[key]) for key in candidateKeys]
+        return [self._itemType.fromRecord(record) for record in records
+                if all(getattr(record, field) == value for field, value in criteria.items())]
+
+    def flush(self):
+        """
+        Writes the changed pages of the memory map to the disk
+        """
+        if self.__map is not None:
+            self.__map.flush()
+
+    def close(self):
+        if self.__map is not None:
+            self.__map.flush()
+            self.__map.close()
+            self.__file.close()
+            self.__map = None
+            self.__file = None
+
+    def __load(self):
+        if self.__map is not None:
+            return
+        if not os.path.exists(self._fileName):
+            file = open(self._fileName, 'wb')
+            try:
+                file.write(RecordRepository.__headerFormat.pack(RecordRepository.__magic, self.__typeCode,
+                                                                RecordRepository.__headerFormat.size, 0))
+                file.truncate(RecordRepository.__initialSize)
+            finally:
+                file.close()
+        self.__file = open(self._fileName, 'r+b')
+        self.__map = mmap.mmap(self.__file.fileno(), 0)
+        magic, typeCode, self.__end, self.__deadBytes = RecordRepository.__headerFormat.unpack_from(self.__map, 0)
+        if magic != RecordRepository.__magic or typeCode != self.__typeCode:
+            self.close()
+            raise RepositoryError("Not a record file of " + self._itemType.__name__ + ": " + self._fileName)
+
+        # The other indexes are built by the first findBy
+        self.__secondaryIndexes = None
+        if self.__fixedWidth:
+            records = memoryview(self.__map)[RecordRepository.__headerFormat.size:self.__end]
+            try:
+                self.__offsets = dict(zip(RecordConverter.unpackKeys(self._itemType, records),
+                                          self.__iterateOffsets()))
+            finally:
+                records.release()
+        else:
+            self.__offsets = {RecordConverter.unpackKey(self._itemType, self.__map, self.__payloadOffset(offset)):
+                              offset for offset in self.__iterateOffsets()}
+        self._notifyReloaded()
+
+    def __iterateOffsets(self):
+        offset = RecordRepository.__headerFormat.size
+        if self.__fixedWidth:
+            while offset < self.__end:
+                yield offset
+                offset += self.__recordSize
+            return
+        while offset < self.__end:
+            slotSize, length, live = RecordRepository.__slotFormat.unpack_from(self.__map, offset)
+            if live:
+                yield offset
+            offset += RecordRepository.__slotFormat.size + slotSize
+
+    def __iterateRecords(self):
+        self.__load()
+        for offset in self.__iterateOffsets():
+            yield self.__readRecord(offset)
+
+    def __payloadOffset(self, offset: int) -> int:
+        return offset if self.__fixedWidth else offset + RecordRepository.__slotFormat.size
+
+    def __readRecord(self, offset: int):
+        if self.__fixedWidth:
+            return RecordConverter.unpackRecord(self._itemType, self.__map, offset)
+        length = RecordRepository.__slotFormat.unpack_from(self.__map, offset)[1]
+        return RecordConverter.unpackRecord(self._itemType, self.__map, self.__payloadOffset(offset), length)
+
+    def __storedSize(self, record: bytes) -> int:
+        return len(record) if self.__fixedWidth else RecordRepository.__slotFormat.size + len(record)
+
+    def __reserve(self, size: int):
+        """
+        Grows the file, doubling its size, until it can hold the given number of bytes after its last record
+        """
+        if self.__end + size <= len(self.__map):
+            return
+        newSize = len(self.__map)
+        while self.__end + size > newSize:
+            newSize *= 2
+        self.__map.close()
+        self.__file.truncate(newSize)
+        self.__map = mmap.mmap(self.__file.fileno(), 0)
+
+    def __append(self, record: bytes) -> int:
+        offset = self.__end
+        if self.__fixedWidth:
+            self.__map[offset:offset + len(record)] = record
+        else:
+            RecordRepository.__slotFormat.pack_into(self.__map, offset, len(record), len(record), 1)
+            self.__map[offset + RecordRepository.__slotFormat.size:offset + self.__storedSize(record)] = record
+        self.__end = offset + self.__storedSize(record)
+        return offset
+
+    def __writeSlot(self, offset: int, record: bytes):
+        slotSize = RecordRepository.__slotFormat.unpack_from(self.__map, offset)[0]
+        RecordRepository.__slotFormat.pack_into(self.__map, offset, slotSize, len(record), 1)
+        payloadOffset = self.__payloadOffset(offset)
+        self.__map[payloadOffset:payloadOffset + len(record)] = record
+
+    def __kill(self, offset: int):
+        slotSize, length, live = RecordRepository.__slotFormat.unpack_from(self.__map, offset)
+        RecordRepository.__slotFormat.pack_into(self.__map, offset, slotSize, length, 0)
+        self.__deadBytes += RecordRepository.__slotFormat.size + slotSize
+
+    def __moveLastRecord(self, offset: int):
+        lastOffset = self.__end - self.__recordSize
+        if offset != lastOffset:
+            self.__map[offset:offset + self.__recordSize] = self.__map[lastOffset:self.__end]
+            self.__offsets[RecordConverter.unpackKey(self._itemType, self.__map, offset)] = offset
+        self.__end = lastOffset
+
+    def __compactIfNeeded(self):
+        """
+        Moves the live slots next to each other once the deleted ones take up half of the records
+        """
+        recordBytes = self.__end - RecordRepository.__headerFormat.size
+        if self.__fixedWidth or self.__deadBytes == 0 or self.__deadBytes * 2 < recordBytes:
+            return
+        offsets = list(self.__iterateOffsets())
+        records = [bytes(self.__map[self.__payloadOffset(offset):self.__payloadOffset(offset) +
+                                    RecordRepository.__slotFormat.unpack_from(self.__map, offset)[1]])
+                   for offset in offsets]
+        self.__end = RecordRepository.__headerFormat.size
+        self.__deadBytes = 0
+        for record in records:
+            offset = self.__append(record)
+            self.__offsets[RecordConverter.unpackKey(self._itemType, self.__map, self.__payloadOffset(offset))] = offset
+        self.__writeHeader()
+
+    def __writeHeader(self):
+        RecordRepository.__headerFormat.pack_into(self.__map, 0, RecordRepository.__magic, self.__typeCode,
+                                                  self.__end, self.__deadBytes)
+
+    def __index(self, item, offset: int):
+        self.__offsets[self.getKey(item)] = offset
+        if self.__secondaryIndexes is not None:
+            self.__addToSecondaryIndexes(item)
+
+    def __unindex(self, offset: int):
+        if self.__secondaryIndexes is None:
+            return
+        record = self.__readRecord(offset)
+        key = self.getKey(record)
+        for field, keyFunction in self.__secondaryKeyFunctions.items():
+            fieldIndex = self.__secondaryIndexes[field]
+            value = keyFunction(record)
+            del fieldIndex[value][key]
+            if len(fieldIndex[value]) == 0:
+                del fieldIndex[value]
+
+    def __addToSecondaryIndexes(self, record):
+        key = self.getKey(record)
+        for field, keyFunction in self.__secondaryKeyFunctions.items():
+            self.__secondaryIndexes[field].setdefault(keyFunction(record), {})[key] = None
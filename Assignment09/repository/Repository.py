@@ -1,17 +1,64 @@
+import heapq
+from contextlib import contextmanager
 from copy import copy
 
 from lib.CustomComponents import Vector
+from model.Assignment import Assignment
+from model.Grade import Grade
+from model.Student import Student
 from repository.RepositoryError import *
+from repository.RepositoryObserver import RepositoryObserver
 
 
 class Repository:
     """
-    Holds and provides access to a collection of identifiable objects
+    Holds and provides access to a collection of identifiable objects.
+    Every item is indexed by its primary key, so lookups, updates and deletions do not scan the collection.
+    Items can also be indexed by other fields, which lets findBy return them without a full scan.
+    Deleting an item moves the last item of the collection in its place.
     """
 
+    _keyFunctions = {
+        Student: lambda student: student.getStudentId(),
+        Grade: lambda grade: (grade.getStudentId(), grade.getAssignmentId()),
+        Assignment: lambda assignment: assignment.getAssignmentId()
+    }
+
+    _secondaryKeyFunctions = {
+        Grade: {
+            "studentId": lambda grade: grade.getStudentId(),
+            "assignmentId": lambda grade: grade.getAssignmentId()
+        }
+    }
+
     def __init__(self, itemType: type):
-        self._collection = Vector(itemType)
         self._itemType = itemType
+        self.__keyFunction = Repository._keyFunctions.get(itemType, lambda item: item)
+        self.__secondaryKeyFunctions = Repository._secondaryKeyFunctions.get(itemType, {})
+        self.__observers = []
+        self.__pageOrders = {}
+        self._collection = Vector(itemType)
+
+    @property
+    def _collection(self) -> Vector:
+        return self.__collection
+
+    @_collection.setter
+    def _collection(self, collection: Vector):
+        self.__collection = collection
+        self.__index = {}
+        self.__secondaryIndexes = {field: {} for field in self.__secondaryKeyFunctions}
+        for position in range(len(collection)):
+            item = collection[position]
+            self.__index[self.getKey(item)] = position
+            self.__addToSecondaryIndexes(item)
+        self._notifyReloaded()
+
+    def getKey(self, item):
+        """
+        Returns the primary key of the item
+        """
+        return self.__keyFunction(item)
 
     def checkType(self, item):
         if type(item) is not self._itemType:
@@ -19,32 +66,271 @@ class Repository:
 
     def addItem(self, item):
         self.checkType(item)
-        if item in self._collection:
+        key = self.getKey(item)
+        if key in self.__index:
             raise DuplicateItemError(self._itemType)
-        self._collection.addItem(item)
+        self.__collection.addItem(item)
+        self.__index[key] = len(self.__collection) - 1
+        self.__addToSecondaryIndexes(item)
+        self._notifyAdded(item)
 
     def getItems(self):
-        if len(self._collection) == 0:
+        if len(self.__collection) == 0:
             return []
-        return [copy(item) for item in self._collection]
+        return [copy(item) for item in self.__collection]
+
+    def getItemsIter(self):
+        """
+        Iterates over copies of the items, making each copy only when it is reached.
+        Meant for callers which filter or aggregate the items instead of keeping all of them.
+        The collection is iterated in place, so the repository must not be changed until the iteration ends:
+        a deletion moves the last item into the deleted one's position.
+        """
+        return map(copy, self.__collection)
 
     def getItem(self, item):
         self.checkType(item)
-        for collectionItem in self._collection:
-            if collectionItem == item:
-                return copy(collectionItem)
-        return None
+        position = self.__index.get(self.getKey(item))
+        if position is None:
+            return None
+        return copy(self.__collection[position])
 
     def updateItem(self, item):
-        for i in range(len(self._collection)):
-            if self._collection[i] == item:
-                self._collection[i] = item
-                return
-        raise ItemNotFoundError
+        position = self.__index.get(self.getKey(item))
+        if position is None:
+            raise ItemNotFoundError
+        self.__removeFromSecondaryIndexes(self.__collection[position])
+        self.__collection[position] = item
+        self.__addToSecondaryIndexes(item)
+        self._notifyUpdated(item)
 
     def deleteItem(self, item):
-        for i in range(len(self._collection)):
-            if self._collection[i] == item:
-                del self._collection[i]
-                return
-        raise ItemNotFoundError
+        key = self.getKey(item)
+        position = self.__index.get(key)
+        if position is None:
+            raise ItemNotFoundError
+        removedItem = self.__collection[position]
+        self.__removeFromSecondaryIndexes(removedItem)
+        lastPosition = len(self.__collection) - 1
+        if position != lastPosition:
+            lastItem = self.__collection[lastPosition]
+            self.__collection[position] = lastItem
+            self.__index[self.getKey(lastItem)] = position
+        del self.__collection[lastPosition]
+        del self.__index[key]
+        self._notifyRemoved(removedItem)
+
+    def addItems(self, items):
+        """
+        Adds several items at once. Either all of them are added, or none if one of them is invalid.
+        Raises DuplicateItemError if an item is already stored or appears twice.
+        """
+        items = list(items)
+        keys = set()
+        for item in items:
+            self.checkType(item)
+            key = self.getKey(item)
+            if key in self.__index or key in keys:
+                raise DuplicateItemError(self._itemType)
+            keys.add(key)
+        for item in items:
+            self.__collection.addItem(item)
+            self.__index[self.getKey(item)] = len(self.__collection) - 1
+            self.__addToSecondaryIndexes(item)
+            self._notifyAdded(item)
+
+    def updateItems(self, items):
+        """
+        Updates several items at once. Either all of them are updated, or none if one of them is not stored.
+        """
+        items = list(items)
+        self.__checkStored(items)
+        for item in items:
+            Repository.updateItem(self, item)
+
+    def deleteItems(self, items):
+        """
+        Deletes several items at once. Either all of them are deleted, or none if one of them is not stored.
+        """
+        items = list(items)
+        self.__checkStored(items)
+        for item in {self.getKey(item): item for item in items}.values():
+            Repository.deleteItem(self, item)
+
+    def __checkStored(self, items: list):
+        for item in items:
+            if self.getKey(item) not in self.__index:
+                raise ItemNotFoundError
+
+    def count(self) -> int:
+        """
+        Returns the number of items in the repository
+        """
+        return len(self.__collection)
+
+    def isEmpty(self) -> bool:
+        return self.count() == 0
+
+    def findBy(self, **criteria) -> list:
+        """
+        Returns the items whose fields have the given values, e.g. findBy(studentId=3).
+        Indexed fields are looked up directly, the other ones are checked through the item's getters.
+        """
+        candidateKeys = None
+        for field, value in criteria.items():
+            if field in self.__secondaryIndexes:
+                fieldKeys = self.__secondaryIndexes[field].get(value, {})
+                if candidateKeys is None or len(fieldKeys) < len(candidateKeys):
+                    candidateKeys = fieldKeys
+        if candidateKeys is None:
+            candidates = self.__collection
+        else:
+            candidates = [self.__collection[self.__index[key]] for key in candidateKeys]
+
+        getters = {field: "get" + field[0].upper() + field[1:] for field in criteria}
+        return [copy(item) for item in candidates
+                if all(getattr(item, getters[field])() == value for field, value in criteria.items())]
+
+    def deleteBy(self, **criteria) -> list:
+        """
+        Deletes the items whose fields have the given values, found as findBy does, with a single bulk deletion
+        :return: The deleted items
+        """
+        items = self.findBy(**criteria)
+        if len(items) > 0:
+            self.deleteItems(items)
+        return items
+
+    def view(self):
+        """
+        Iterates over immutable records of the items, without copying them into new model objects.
+        Items without a record representation are yielded as they are.
+        The records are made from a plain list of the stored items, taken without checking their types again,
+        so the repository can be changed during the iteration.
+        """
+        toRecord = getattr(self._itemType, "toRecord", None)
+        snapshot = list(self.__collection)
+        if toRecord is None:
+            return iter(snapshot)
+        return map(toRecord, snapshot)
+
+    def viewItem(self, item):
+        """
+        Returns an immutable record of the stored item with the same key, None if there is no such item
+        """
+        self.checkType(item)
+        position = self.__index.get(self.getKey(item))
+        if position is None:
+            return None
+        storedItem = self.__collection[position]
+        toRecord = getattr(self._itemType, "toRecord", None)
+        return storedItem if toRecord is None else toRecord(storedItem)
+
+    def getPage(self, offset: int, limit: int, sortField: str = None, reverse: bool = False) -> list:
+        """
+        Returns copies of at most limit items, starting at the offset in the order of the sort field.
+        Items with equal values are ordered by their keys, and missing values come first.
+        The order of the items is kept until the repository changes, so turning pages does not sort them again.
+        :param sortField: The field the items are ordered by, their key if None
+        :param reverse: If True, the items are taken in descending order
+        """
+        Repository._checkPage(offset, limit)
+        order = self.__pageOrders.get(sortField)
+        if order is None:
+            order = sorted(self.__collection, key=self._getSortKeyFunction(sortField))
+            self.__pageOrders[sortField] = order
+        if reverse:
+            end = max(0, len(order) - offset)
+            page = order[max(0, end - limit):end][::-1]
+        else:
+            page = order[offset:offset + limit]
+        return [copy(item) for item in page]
+
+    def _selectPage(self, items, offset: int, limit: int, sortField: str = None, reverse: bool = False) -> list:
+        """
+        Picks the page getPage returns out of unsorted items, holding only offset + limit of them at once
+        """
+        Repository._checkPage(offset, limit)
+        select = heapq.nlargest if reverse else heapq.nsmallest
+        return select(offset + limit, items, key=self._getSortKeyFunction(sortField))[offset:]
+
+    def _getSortKeyFunction(self, sortField: str = None) -> callable:
+        """
+        Returns the function giving the value an item or a record is ordered by in a page
+        """
+        if sortField is None:
+            return self.getKey
+        getterName = "get" + sortField[0].upper() + sortField[1:] if sortField else ""
+        if getattr(self._itemType, getterName, None) is None:
+            raise RepositoryError("Unknown field: " + sortField)
+
+        def sortKey(item):
+            value = getattr(item, getterName)()
+            return value is not None, value, self.getKey(item)
+
+        return sortKey
+
+    @staticmethod
+    def _checkPage(offset: int, limit: int):
+        if offset < 0 or limit < 0:
+            raise RepositoryError("Invalid page: offset " + str(offset) + ", limit " + str(limit))
+
+    def __addToSecondaryIndexes(self, item):
+        key = self.getKey(item)
+        for field, keyFunction in self.__secondaryKeyFunctions.items():
+            self.__secondaryIndexes[field].setdefault(keyFunction(item), {})[key] = None
+
+    def __removeFromSecondaryIndexes(self, item):
+        key = self.getKey(item)
+        for field, keyFunction in self.__secondaryKeyFunctions.items():
+            fieldIndex = self.__secondaryIndexes[field]
+            value = keyFunction(item)
+            del fieldIndex[value][key]
+            if len(fieldIndex[value]) == 0:
+                del fieldIndex[value]
+
+    @contextmanager
+    def batch(self):
+        """
+        Groups the changes made inside the with block, so repositories which can store several changes
+        at once do so, e.g. in a single database transaction. In memory every change is applied right away.
+        """
+        yield
+
+    def addObserver(self, observer: RepositoryObserver):
+        """
+        Registers an observer which gets notified about every change made to the repository
+        """
+        self.__observers.append(observer)
+
+    def _notifyAdded(self, item):
+        self.__pageOrders = {}
+        for observer in self.__observers:
+            observer.itemAdded(item)
+
+    def _notifyUpdated(self, item):
+        self.__pageOrders = {}
+        for observer in self.__observers:
+            observer.itemUpdated(item)
+
+    def _notifyRemoved(self, item):
+        self.__pageOrders = {}
+        for observer in self.__observers:
+            observer.itemRemoved(item)
+
+    def _notifyReloaded(self):
+        self.__pageOrders = {}
+        for observer in self.__observers:
+            observer.collectionReloaded()
+
+    def flush(self):
+        """
+        Writes any pending change to the storage. In memory there is nothing to write.
+        """
+        pass
+
+    def close(self):
+        """
+        Releases the resources held by the repository
+        """
+        pass
@@ -0,0 +1,23 @@
+class RepositoryObserver:
+    """
+    Gets notified about the changes made to a repository
+    """
+
+    # @abstractmethod
+    def itemAdded(self, item):
+        pass
+
+    # @abstractmethod
+    def itemUpdated(self, item):
+        pass
+
+    # @abstractmethod
+    def itemRemoved(self, item):
+        pass
+
+    # @abstractmethod
+    def collectionReloaded(self):
+        """
+        Called when the whole collection was replaced, e.g. after reading it again from a file
+        """
+        pass
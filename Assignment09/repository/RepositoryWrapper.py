@@ -1,14 +1,21 @@
+import ntpath
 from typing import Type, Union
 
 from model.Student import Student
 from model.Grade import Grade
 from model.Assignment import Assignment
 from repository.BinaryRepository import BinaryRepository
+from repository.FlushPolicy import FlushPolicy
 from repository.MySQLRepository import MySQLRepository
+from repository.RecordRepository import RecordRepository
 from repository.Repository import Repository
+from repository.SQLiteRepository import SQLiteRepository
 from repository.TextFileRepository import TextFileRepository
 from repository.JsonRepository import JsonRepository
+from repository.JsonLinesRepository import JsonLinesRepository
+from repository.JournalRepository import JournalRepository
 from utils.MySQLConnector import MySQLConnector
+from utils.SQLiteConnector import SQLiteConnector
 
 
 class RepositoryWrapper:
@@ -20,30 +27,81 @@ class RepositoryWrapper:
             self, storageType: str,
             studentRepositoryLocation: str,
             gradeRepositoryLocation: str,
-            assignmentRepositoryLocation: str
+            assignmentRepositoryLocation: str,
+            flushPolicy: str = 'none',
+            flushInterval: str = '0',
+            journalCompactionSize: str = '1048576',
+            databaseLocation: str = ':memory:',
+            connectionPoolSize: str = '4'
     ):
+        """
+        :param flushPolicy: none, immediate, operations, close, timer or background. Any value other than 'none'
+        keeps the file repositories cached in memory
+        :param flushInterval: The number of operations for 'operations', the number of seconds for 'timer'
+        :param journalCompactionSize: The size in bytes a journal can reach before it is compacted into its snapshot
+        :param databaseLocation: The SQLite database file, for 'sqlite'. The tables of the databases are named after
+        the file names of the repository locations, without their extensions, e.g. data\\students.csv for students
+        :param connectionPoolSize: The largest number of connections open to the MySQL database, for 'sql'
+        """
+        self.__connector = None
+        # Memory repositories are never written, and cached files are only written by their flush policy
+        if storageType == 'memory':
+            self.__writesEveryChange = False
+        elif storageType in ['text', 'binary', 'json', 'jsonl']:
+            self.__writesEveryChange = flushPolicy in ['none', 'immediate']
+        else:
+            self.__writesEveryChange = True
+
+        def policy():
+            return FlushPolicy.fromSettings(flushPolicy, flushInterval)
+
         if storageType == 'memory':
             self.__studentRepository = Repository(Student)
             self.__gradeRepository = Repository(Grade)
             self.__assignmentRepository = Repository(Assignment)
         elif storageType == 'text':
-            self.__studentRepository = TextFileRepository(Student, studentRepositoryLocation)
-            self.__gradeRepository = TextFileRepository(Grade, gradeRepositoryLocation)
-            self.__assignmentRepository = TextFileRepository(Assignment, assignmentRepositoryLocation)
+            self.__studentRepository = TextFileRepository(Student, studentRepositoryLocation, policy())
+            self.__gradeRepository = TextFileRepository(Grade, gradeRepositoryLocation, policy())
+            self.__assignmentRepository = TextFileRepository(Assignment, assignmentRepositoryLocation, policy())
         elif storageType == 'binary':
-            self.__studentRepository = BinaryRepository(Student, studentRepositoryLocation)
-            self.__gradeRepository = BinaryRepository(Grade, gradeRepositoryLocation)
-            self.__assignmentRepository = BinaryRepository(Assignment, assignmentRepositoryLocation)
+            self.__studentRepository = BinaryRepository(Student, studentRepositoryLocation, policy())
+            self.__gradeRepository = BinaryRepository(Grade, gradeRepositoryLocation, policy())
+            self.__assignmentRepository = BinaryRepository(Assignment, assignmentRepositoryLocation, policy())
         elif storageType == 'json':
-            self.__studentRepository = JsonRepository(Student, studentRepositoryLocation)
-            self.__gradeRepository = JsonRepository(Grade, gradeRepositoryLocation)
-            self.__assignmentRepository = JsonRepository(Assignment, assignmentRepositoryLocation)
+            self.__studentRepository = JsonRepository(Student, studentRepositoryLocation, policy())
+            self.__gradeRepository = JsonRepository(Grade, gradeRepositoryLocation, policy())
+            self.__assignmentRepository = JsonRepository(Assignment, assignmentRepositoryLocation, policy())
+        elif storageType == 'jsonl':
+            self.__studentRepository = JsonLinesRepository(Student, studentRepositoryLocation, policy())
+            self.__gradeRepository = JsonLinesRepository(Grade, gradeRepositoryLocation, policy())
+            self.__assignmentRepository = JsonLinesRepository(Assignment, assignmentRepositoryLocation, policy())
+        elif storageType == 'record':
+            self.__studentRepository = RecordRepository(Student, studentRepositoryLocation)
+            self.__gradeRepository = RecordRepository(Grade, gradeRepositoryLocation)
+            self.__assignmentRepository = RecordRepository(Assignment, assignmentRepositoryLocation)
+        elif storageType == 'journal':
+            compactionSize = int(journalCompactionSize)
+            self.__studentRepository = JournalRepository(Student, studentRepositoryLocation, compactionSize)
+            self.__gradeRepository = JournalRepository(Grade, gradeRepositoryLocation, compactionSize)
+            self.__assignmentRepository = JournalRepository(Assignment, assignmentRepositoryLocation, compactionSize)
+        elif storageType == 'sqlite':
+            self.__connector = SQLiteConnector(databaseLocation)
+            studentTable, gradeTable, assignmentTable = map(RepositoryWrapper.__tableName, [
+                studentRepositoryLocation, gradeRepositoryLocation, assignmentRepositoryLocation
+            ])
+
+            self.__studentRepository = SQLiteRepository(Student, studentTable, self.__connector)
+            self.__gradeRepository = SQLiteRepository(Grade, gradeTable, self.__connector)
+            self.__assignmentRepository = SQLiteRepository(Assignment, assignmentTable, self.__connector)
         elif storageType == 'sql':
-            connection = MySQLConnector().getConnection()
+            self.__connector = MySQLConnector(int(connectionPoolSize))
+            studentTable, gradeTable, assignmentTable = map(RepositoryWrapper.__tableName, [
+                studentRepositoryLocation, gradeRepositoryLocation, assignmentRepositoryLocation
+            ])
 
-            self.__studentRepository = MySQLRepository(Student, studentRepositoryLocation, connection)
-            self.__gradeRepository = MySQLRepository(Grade, gradeRepositoryLocation, connection)
-            self.__assignmentRepository = MySQLRepository(Assignment, assignmentRepositoryLocation, connection)
+            self.__studentRepository = MySQLRepository(Student, studentTable, self.__connector)
+            self.__gradeRepository = MySQLRepository(Grade, gradeTable, self.__connector)
+            self.__assignmentRepository = MySQLRepository(Assignment, assignmentTable, self.__connector)
 
         self.__repositories = {
             Student: self.__studentRepository,
@@ -51,18 +109,49 @@ class RepositoryWrapper:
             Assignment: self.__assignmentRepository
         }
 
+    @staticmethod
+    def __tableName(location: str) -> str:
+        # Both separators are accepted, as the settings are written with Windows paths
+        return ntpath.splitext(ntpath.basename(location))[0]
+
     def getRepository(self, repositoryType: Type[Union[Student, Grade, Assignment]]) -> Repository:
         """
         Returns the Repository for the given item type
         """
         return self.__repositories[repositoryType]
 
+    def writesEveryChange(self) -> bool:
+        """
+        Returns True if every change is written to the storage as it is made
+        """
+        return self.__writesEveryChange
+
     def isEmpty(self) -> bool:
-        if len(self.__studentRepository.getItems()) != 0:
-            return False
-        if len(self.__gradeRepository.getItems()) != 0:
-            return False
-        if len(self.__assignmentRepository.getItems()) != 0:
-            return False
+        for repository in self.__repositories.values():
+            if not repository.isEmpty():
+                return False
 
         return True
+
+    def flush(self):
+        """
+        Writes any pending change of the repositories, waiting for the writes made in the background
+        """
+        for repository in self.__repositories.values():
+            repository.flush()
+
+    def close(self):
+        """
+        Writes any pending change and releases the resources held by the repositories
+        """
+        errors = []
+        for repository in self.__repositories.values():
+            # A repository which fails to write must not keep the others from being written
+            try:
+                repository.close()
+            except Exception as error:
+                errors.append(error)
+        if self.__connector is not None:
+            self.__connector.close()
+        if len(errors) > 0:
+            raise errors[0]
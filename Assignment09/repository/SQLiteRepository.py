@@ -0,0 +1,179 @@
+import sqlite3
+from contextlib import contextmanager
+
+from repository.Repository import Repository
+from repository.RepositoryError import DuplicateItemError, ItemNotFoundError, RepositoryError
+from utils.SQLiteConnector import SQLiteConnector
+
+
+class SQLiteRepository(Repository):
+    """
+    Repository backed up by a table of an SQLite database.
+    Every statement is built once and takes its values as parameters, so SQLite prepares it only once.
+    Duplicate items are rejected by the primary key of the table.
+    The bulk operations run a single statement over all the items, in one transaction.
+    """
+
+    def __init__(self, itemType: type, tableName: str, connector: SQLiteConnector):
+        Repository.__init__(self, itemType)
+        self.__connector = connector
+        self.__connection = connector.getConnection()
+        connector.createTable(itemType, tableName)
+        connector.addRollbackListener(self._notifyReloaded)
+
+        table = SQLiteConnector.quote(tableName)
+        self.__columns = SQLiteConnector.getColumns(itemType)
+        self.__keyColumnCount = SQLiteConnector.getKeyColumnCount(itemType)
+        keyColumns = self.__columns[:self.__keyColumnCount]
+        valueColumns = self.__columns[self.__keyColumnCount:]
+        keyCondition = " AND ".join(SQLiteConnector.quote(column) + " = ?" for column in keyColumns)
+
+        self.__selectStatement = "SELECT * FROM " + table
+        self.__selectItemStatement = self.__selectStatement + " WHERE " + keyCondition
+        self.__insertStatement = "INSERT INTO " + table + " VALUES (" + ", ".join("?" * len(self.__columns)) + ")"
+        self.__updateStatement = "UPDATE " + table + " SET " + \
+                                 ", ".join(SQLiteConnector.quote(column) + " = ?" for column in valueColumns) + \
+                                 " WHERE " + keyCondition
+        self.__deleteAllStatement = "DELETE FROM " + table
+        self.__deleteStatement = self.__deleteAllStatement + " WHERE " + keyCondition
+        self.__countStatement = "SELECT COUNT(*) FROM " + table
+        self.__existsStatement = "SELECT EXISTS(SELECT 1 FROM " + table + ")"
+        self.__pageStatements = {}
+
+    def addItem(self, item):
+        self.checkType(item)
+        try:
+            self.__connection.execute(self.__insertStatement, SQLiteConnector.convertItemToRow(item))
+        except sqlite3.IntegrityError:
+            raise DuplicateItemError(self._itemType)
+        self._notifyAdded(item)
+
+    def addItems(self, items):
+        items = list(items)
+        for item in items:
+            self.checkType(item)
+        try:
+            with self.__connector.transaction():
+                self.__connection.executemany(self.__insertStatement, map(SQLiteConnector.convertItemToRow, items))
+        except sqlite3.IntegrityError:
+            raise DuplicateItemError(self._itemType)
+        for item in items:
+            self._notifyAdded(item)
+
+    def updateItems(self, items):
+        items = list(items)
+        rows = [SQLiteConnector.convertItemToRow(item) for item in items]
+        with self.__connector.transaction():
+            cursor = self.__connection.executemany(
+                self.__updateStatement,
+                [row[self.__keyColumnCount:] + row[:self.__keyColumnCount] for row in rows]
+            )
+            if cursor.rowcount < len(items):
+                raise ItemNotFoundError
+        for item in items:
+            self._notifyUpdated(item)
+
+    def deleteItems(self, items):
+        items = list({self.getKey(item): item for item in items}.values())
+        with self.__connector.transaction():
+            cursor = self.__connection.executemany(self.__deleteStatement, map(self.__keyParameters, items))
+            if cursor.rowcount < len(items):
+                raise ItemNotFoundError
+        for item in items:
+            self._notifyRemoved(item)
+
+    def getItems(self):
+        return [SQLiteConnector.convertRowToItem(self._itemType, row)
+                for row in self.__connection.execute(self.__selectStatement)]
+
+    def getItemsIter(self):
+        toItem = SQLiteConnector.convertRowToItem
+        return (toItem(self._itemType, row) for row in self.__connection.execute(self.__selectStatement))
+
+    def getItem(self, item):
+        self.checkType(item)
+        row = self.__connection.execute(self.__selectItemStatement, self.__keyParameters(item)).fetchone()
+        return SQLiteConnector.convertRowToItem(self._itemType, row) if row is not None else None
+
+    def view(self):
+        return iter([SQLiteConnector.convertRowToRecord(self._itemType, row)
+                     for row in self.__connection.execute(self.__selectStatement)])
+
+    def viewItem(self, item):
+        self.checkType(item)
+        row = self.__connection.execute(self.__selectItemStatement, self.__keyParameters(item)).fetchone()
+        return SQLiteConnector.convertRowToRecord(self._itemType, row) if row is not None else None
+
+    def count(self) -> int:
+        return self.__connection.execute(self.__countStatement).fetchone()[0]
+
+    def isEmpty(self) -> bool:
+        return self.__connection.execute(self.__existsStatement).fetchone()[0] == 0
+
+    def findBy(self, **criteria):
+        rows = self.__connection.execute(self.__selectStatement + " WHERE " + self.__conditions(criteria),
+                                         tuple(criteria.values()))
+        return [SQLiteConnector.convertRowToItem(self._itemType, row) for row in rows]
+
+    def deleteBy(self, **criteria) -> list:
+        """
+        Reads and deletes the matching items with one statement each, in one transaction
+        """
+        conditions = self.__conditions(criteria)
+        with self.__connector.transaction():
+            items = [SQLiteConnector.convertRowToItem(self._itemType, row)
+                     for row in self.__connection.execute(self.__selectStatement + " WHERE " + conditions,
+                                                          tuple(criteria.values()))]
+            self.__connection.execute(self.__deleteAllStatement + " WHERE " + conditions, tuple(criteria.values()))
+        for item in items:
+            self._notifyRemoved(item)
+        return items
+
+    def getPage(self, offset: int, limit: int, sortField: str = None, reverse: bool = False) -> list:
+        """
+        Returns a page of items, read with LIMIT and OFFSET
+        """
+        Repository._checkPage(offset, limit)
+        if (sortField, reverse) not in self.__pageStatements:
+            if sortField is not None and sortField not in self.__columns:
+                raise RepositoryError("Unknown field: " + sortField)
+            # SQLite orders NULL values first, as the other repositories do
+            orderColumns = ((sortField,) if sortField is not None else ()) + self.__columns[:self.__keyColumnCount]
+            direction = " DESC" if reverse else ""
+            self.__pageStatements[(sortField, reverse)] = \
+                self.__selectStatement + " ORDER BY " + \
+                ", ".join(SQLiteConnector.quote(column) + direction for column in orderColumns) + " LIMIT ? OFFSET ?"
+        rows = self.__connection.execute(self.__pageStatements[(sortField, reverse)], (limit, offset))
+        return [SQLiteConnector.convertRowToItem(self._itemType, row) for row in rows]
+
+    def updateItem(self, item):
+        row = SQLiteConnector.convertItemToRow(item)
+        cursor = self.__connection.execute(self.__updateStatement,
+                                           row[self.__keyColumnCount:] + row[:self.__keyColumnCount])
+        if cursor.rowcount == 0:
+            raise ItemNotFoundError
+        self._notifyUpdated(item)
+
+    def deleteItem(self, item):
+        cursor = self.__connection.execute(self.__deleteStatement, self.__keyParameters(item))
+        if cursor.rowcount == 0:
+            raise ItemNotFoundError
+        self._notifyRemoved(item)
+
+    @contextmanager
+    def batch(self):
+        """
+        Runs the changes made inside the with block in a single transaction
+        """
+        with self.__connector.transaction():
+            yield
+
+    def __conditions(self, criteria: dict) -> str:
+        for field in criteria:
+            if field not in self.__columns:
+                raise RepositoryError("Unknown field: " + field)
+        return " AND ".join(SQLiteConnector.quote(field) + " = ?" for field in criteria)
+
+    def __keyParameters(self, item) -> tuple:
+        key = self.getKey(item)
+        return key if type(key) is tuple else (key,)
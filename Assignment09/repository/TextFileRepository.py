@@ -1,29 +1,62 @@
+import csv
+
 from lib.CustomComponents import Vector
 from utils.CSVConverter import CSVConverter
 from repository.FileRepository import FileRepository
 
 
 class TextFileRepository(FileRepository):
+    """
+    Repository stored in a CSV file, which is read and written one row at a time
+    """
 
     def _loadList(self):
         file = None
         try:
-            file = open(self._fileName, 'r')
-            self._collection = Vector.fromList(
-                [CSVConverter.convertCSVToItem(self._itemType, csvString.replace('\n', ''))
-                 for csvString in file.readlines()], self._itemType)
+            file = open(self._fileName, 'r', newline='')
+            self._collection = Vector(self._itemType, CSVConverter.readItems(self._itemType, file))
         except FileNotFoundError:
             self._collection = Vector(self._itemType)
         finally:
             if file is not None:
                 file.close()
 
-    def _saveList(self):
+    def _saveList(self, items):
+        with self._openReplacement('w', newline='') as file:
+            CSVConverter.writeItems(file, items)
+
+    def _iterateFile(self):
+        file = None
+        try:
+            file = open(self._fileName, 'r', newline='')
+            yield from CSVConverter.readItems(self._itemType, file)
+        except FileNotFoundError:
+            return
+        finally:
+            if file is not None:
+                file.close()
+
+    def _countFile(self):
         file = None
         try:
-            file = open(self._fileName, 'w')
-            file.writelines([CSVConverter.convertItemToCSV(item) + "\n"
-                             for item in self._collection])
+            file = open(self._fileName, 'r', newline='')
+            return sum(1 for row in csv.reader(file, CSVConverter.Dialect) if row)
+        except FileNotFoundError:
+            return 0
+        finally:
+            if file is not None:
+                file.close()
+
+    def _isFileEmpty(self):
+        file = None
+        try:
+            file = open(self._fileName, 'r', newline='')
+            for row in csv.reader(file, CSVConverter.Dialect):
+                if row:
+                    return False
+            return True
+        except FileNotFoundError:
+            return True
         finally:
             if file is not None:
                 file.close()
@@ -1,27 +1,249 @@
-from unittest import TestCase
+import os
+import tempfile
+from unittest import TestCase, mock
 
+from logic.ChangesStack import ChangesStack, ChangesHandler
 from logic.ControllerWrapper import ControllerWrapper
+from logic.HistoryStore import HistoryStore
+from logic.GradeStatistics import GradeStatistics
 from model.Validators import *
 from repository import Repository
+from repository.RepositoryError import RepositoryError
 from repository.RepositoryWrapper import RepositoryWrapper
+from repository.TextFileRepository import TextFileRepository
 
 
 class TestControllers(TestCase):
 
     def setUp(self):
-        self.repositoryWrapper: Repository = RepositoryWrapper("inmemory", '', '', '')
+        self.repositoryWrapper: Repository = self.createRepositoryWrapper()
         self.controllerWrapper: ControllerWrapper = ControllerWrapper(self.repositoryWrapper, date(2018, 11, 18))
         self.studentController = self.controllerWrapper.getStudentController()
         self.gradeController = self.controllerWrapper.getGradeController()
         self.assignmentController = self.controllerWrapper.getAssignmentController()
 
     def tearDown(self):
+        self.repositoryWrapper.close()
         self.repositoryWrapper = None
         self.controllerWrapper: None
         self.studentController = None
         self.gradeController = None
         self.assignmentController = None
 
+    def createRepositoryWrapper(self) -> RepositoryWrapper:
+        return RepositoryWrapper("memory", '', '', '')
+
+    def addSampleData(self):
+        for studentId in range(3):
+            self.studentController.addStudent(studentId, 'Student', 911)
+        for assignmentId in range(3):
+            self.assignmentController.addAssignment(assignmentId, 'Project', date(2018, 10, 2 + assignmentId))
+        for studentId in range(3):
+            for assignmentId in range(studentId + 1):
+                self.gradeController.assignToStudent(studentId, assignmentId)
+
+    def testListGrades(self):
+        self.addSampleData()
+        self.assertEqual(len(self.gradeController.listStudentGrades(2)), 3)
+        self.assertEqual(len(self.gradeController.listAssignmentGrades(0)), 3)
+        self.assertEqual(len(self.gradeController.listAssignmentGrades(2)), 1)
+
+    def testPages(self):
+        self.addSampleData()
+        self.studentController.addStudent(3, 'Another student', 912)
+        self.gradeController.grade(2, 0, 6)
+        self.gradeController.grade(1, 0, 9)
+
+        self.assertEqual([student.getStudentId() for student in self.studentController.getStudentPage(1, 2)], [1, 2])
+        self.assertEqual([student.getStudentId() for student in self.studentController.getStudentPage(0, 2, 'name')],
+                         [3, 0])
+        self.assertEqual([student.getStudentId() for student in self.studentController.getStudentPage(3, 2)], [3])
+        self.assertEqual(self.studentController.getStudentPage(4, 2), [])
+        self.assertEqual(self.studentController.countStudents(), 4)
+
+        grades = [(grade.getStudentId(), grade.getAssignmentId(), grade.getGrade())
+                  for grade in self.gradeController.getGradePage(0, 4, 'grade', reverse=True)]
+        self.assertEqual(grades, [(1, 0, 9), (2, 0, 6), (2, 2, None), (2, 1, None)])
+        grades = [(grade.getStudentId(), grade.getAssignmentId())
+                  for grade in self.gradeController.getGradePage(1, 3, 'grade')]
+        self.assertEqual(grades, [(1, 1), (2, 1), (2, 2)])
+        self.assertEqual(self.gradeController.countGrades(), 6)
+
+        self.assignmentController.updateAssignment(0, 'Project', date(2018, 12, 1))
+        assignments = self.assignmentController.getAssignmentPage(0, 3, 'deadline', reverse=True)
+        self.assertEqual([assignment.getAssignmentId() for assignment in assignments], [0, 2, 1])
+        with self.assertRaises(RepositoryError):
+            self.assignmentController.getAssignmentPage(0, 3, 'unknown')
+
+    def testStatistics(self):
+        self.addSampleData()
+        self.gradeController.grade(1, 0, 8)
+        self.gradeController.grade(2, 0, 6)
+        self.gradeController.grade(2, 1, 10)
+
+        averages = [(dto.getStudent().getStudentId(), dto.getAverage())
+                    for dto in self.gradeController.getStudentsSortedByAverage()]
+        self.assertEqual(averages, [(1, 8), (2, 8), (0, 0)])
+        averages = [(dto.getAssignment().getAssignmentId(), dto.getAverage())
+                    for dto in self.gradeController.getAssignmentsSortedByAverage()]
+        self.assertEqual(averages, [(1, 10), (0, 7)])
+        self.assertEqual([student.getStudentId() for student in self.gradeController.lateStudents()], [0, 1, 2])
+        self.assertTrue(all(type(student) is Student for student in self.gradeController.lateStudents()))
+        self.assertIs(type(self.gradeController.getStudentsSortedByAverage()[0].getStudent()), Student)
+        self.assertIs(type(self.gradeController.getAssignmentsSortedByAverage()[0].getAssignment()), Assignment)
+
+        self.gradeController.grade(0, 0, 4)
+        self.assertEqual([student.getStudentId() for student in self.gradeController.lateStudents()], [1, 2])
+        averages = [(dto.getAssignment().getAssignmentId(), dto.getAverage())
+                    for dto in self.gradeController.getAssignmentsSortedByAverage()]
+        self.assertEqual(averages, [(1, 10), (0, 6)])
+
+        self.controllerWrapper.undo()
+        self.assertEqual([student.getStudentId() for student in self.gradeController.lateStudents()], [0, 1, 2])
+        self.assignmentController.updateAssignment(0, 'Project', date(2019, 1, 1))
+        self.assertEqual([student.getStudentId() for student in self.gradeController.lateStudents()], [1, 2])
+
+    def testCascadeDelete(self):
+        self.addSampleData()
+        self.studentController.removeStudent(2)
+        self.assertEqual(len(self.gradeController.listGrades()), 3)
+        self.assignmentController.removeAssignment(0)
+        self.assertEqual(len(self.gradeController.listGrades()), 1)
+        self.controllerWrapper.undo()
+        self.assertEqual(len(self.gradeController.listGrades()), 3)
+        self.controllerWrapper.undo()
+        self.assertEqual(len(self.gradeController.listGrades()), 6)
+        self.assertEqual(len(self.gradeController.listStudentGrades(2)), 3)
+        self.controllerWrapper.cascadeDelete(Grade(2, 0))
+        self.assertEqual(len(self.gradeController.listGrades()), 6)
+
+    def testFailedCascadeDelete(self):
+        self.addSampleData()
+        gradeRepository = self.repositoryWrapper.getRepository(Grade)
+        with mock.patch.object(gradeRepository, 'deleteBy', side_effect=RepositoryError("Failed")):
+            self.assertRaises(RepositoryError, self.studentController.removeStudent, 2)
+        self.assertEqual(self.studentController.countStudents(), 3)
+        self.assertEqual(len(self.gradeController.listStudentGrades(2)), 3)
+        self.controllerWrapper.undo()
+        self.assertEqual(len(self.gradeController.listStudentGrades(2)), 2)
+
+    def testUnitOfWork(self):
+        self.addSampleData()
+        with self.controllerWrapper.unitOfWork():
+            self.studentController.addStudent(3, 'Student', 912)
+            self.studentController.updateStudent(0, 'Name', 912)
+            self.studentController.removeStudent(1)
+        self.assertEqual(len(self.studentController.listStudents()), 3)
+        self.controllerWrapper.undo()
+        self.assertEqual([student.getGroup() for student in self.studentController.listStudents()], [911, 911, 911])
+        self.assertEqual(len(self.gradeController.listGrades()), 6)
+        self.controllerWrapper.redo()
+        self.assertEqual([student.getStudentId() for student in self.studentController.listStudents()], [0, 2, 3])
+
+    def testFailedUnitOfWork(self):
+        self.addSampleData()
+        with mock.patch.object(ChangesStack, 'abortGroup', autospec=True,
+                               side_effect=ChangesStack.abortGroup) as abortGroup:
+            with self.assertRaises(ValueError):
+                with self.controllerWrapper.unitOfWork():
+                    self.studentController.addStudent(3, 'Student', 912)
+                    self.studentController.removeStudent(1)
+                    raise ValueError("Failed")
+            self.assertEqual(abortGroup.call_count, 1)
+        self.assertEqual([student.getStudentId() for student in self.studentController.listStudents()], [0, 1, 2])
+        self.assertEqual(len(self.gradeController.listGrades()), 6)
+        self.controllerWrapper.undo()
+        self.assertEqual(len(self.gradeController.listGrades()), 5)
+
+        with mock.patch.object(ControllerWrapper, 'handleChanges', side_effect=RepositoryError("Failed")):
+            with self.assertRaises(ValueError) as context:
+                with self.controllerWrapper.unitOfWork():
+                    self.studentController.addStudent(3, 'Student', 912)
+                    raise ValueError("Failed")
+        self.assertIsInstance(context.exception.__cause__, RepositoryError)
+        count = self.studentController.countStudents()
+        self.studentController.addStudent(4, 'Student', 912)
+        self.controllerWrapper.undo()
+        self.assertEqual(self.studentController.countStudents(), count)
+
+    def testAssignToGroup(self):
+        self.addSampleData()
+        self.studentController.addStudent(3, 'Student', 912)
+        self.gradeController.assignToGroup(911, 2)
+        self.assertEqual(len(self.gradeController.listAssignmentGrades(2)), 3)
+        self.assertEqual(len(self.gradeController.listStudentGrades(3)), 0)
+        self.controllerWrapper.undo()
+        self.assertEqual(len(self.gradeController.listAssignmentGrades(2)), 1)
+
+    def testUndoUpdates(self):
+        self.addSampleData()
+        self.studentController.updateStudent(1, 'Name', 912)
+        self.assignmentController.updateAssignment(0, 'Essay', date(2019, 1, 1))
+        self.gradeController.grade(1, 0, 7)
+        self.controllerWrapper.undo()
+        self.assertIsNone(self.gradeController.getGrade(1, 0).getGrade())
+        self.controllerWrapper.undo()
+        self.assertEqual(self.assignmentController.findAssignment(0).getDeadline(), date(2018, 10, 2))
+        self.controllerWrapper.undo()
+        student = self.studentController.findStudent(1)
+        self.assertEqual((student.getName(), student.getGroup()), ('Student', 911))
+        self.controllerWrapper.redo()
+        self.controllerWrapper.redo()
+        self.controllerWrapper.redo()
+        self.assertEqual(self.studentController.findStudent(1).getGroup(), 912)
+        self.assertEqual(self.assignmentController.findAssignment(0).getDescription(), 'Essay')
+        self.assertEqual(self.gradeController.getGrade(1, 0).getGrade(), 7)
+
+    def testReplayMergesChanges(self):
+        self.addSampleData()
+        changesStack = ChangesStack(self.controllerWrapper)
+        changesStack.beginCommit()
+        changesStack.addChange(ChangesStack.ItemRemoved(Student(0, 'Student', 911)))
+        changesStack.addChange(ChangesStack.ItemAdded(Student(0, 'Name', 912)))
+        changesStack.addChange(ChangesStack.ItemAdded(Student(5, 'Student', 911)))
+        changesStack.addChange(ChangesStack.ItemRemoved(Student(5, 'Student', 911)))
+        changesStack.endCommit()
+        changesStack.undo()
+        changesStack.redo()
+        self.assertEqual(self.studentController.findStudent(0).getName(), 'Name')
+        self.assertEqual(self.studentController.countStudents(), 3)
+        changesStack.undo()
+        self.assertEqual(self.studentController.findStudent(0).getGroup(), 911)
+
+    def testPopulate(self):
+        self.controllerWrapper.populateRepository()
+        self.assertFalse(self.repositoryWrapper.isEmpty())
+        self.assertEqual(len(self.gradeController.listGrades()), 50)
+
+    def testGradeTable(self):
+        self.controllerWrapper.populateRepository()
+        self.gradeController.getStudentsSortedByAverage()
+        for grade in [grade for grade in self.gradeController.listGrades() if grade.getGrade() is None][:10]:
+            self.gradeController.grade(grade.getStudentId(), grade.getAssignmentId(), 1)
+        self.studentController.removeStudent(3)
+        self.assignmentController.removeAssignment(4)
+        self.controllerWrapper.undo()
+        self.gradeController.assignToGroup(911, 45)
+
+        statistics = GradeStatistics(self.repositoryWrapper.getRepository(Grade),
+                                     self.repositoryWrapper.getRepository(Assignment), date(2018, 11, 18))
+        studentAverages = {dto.getStudent().getStudentId(): dto.getAverage()
+                           for dto in self.gradeController.getStudentsSortedByAverage()}
+        for student in self.studentController.listStudents():
+            self.assertAlmostEqual(studentAverages[student.getStudentId()],
+                                   statistics.getStudentAverage(student.getStudentId()))
+        assignmentAverages = {dto.getAssignment().getAssignmentId(): dto.getAverage()
+                              for dto in self.gradeController.getAssignmentsSortedByAverage()}
+        for assignment in self.assignmentController.listAssignments():
+            average = statistics.getAssignmentAverage(assignment.getAssignmentId())
+            if average is None:
+                self.assertNotIn(assignment.getAssignmentId(), assignmentAverages)
+            else:
+                self.assertAlmostEqual(assignmentAverages[assignment.getAssignmentId()], average)
+        self.assertEqual([student.getStudentId() for student in self.gradeController.lateStudents()],
+                         [student.getStudentId() for student in self.studentController.listStudents()
+                          if statistics.isStudentLate(student.getStudentId())])
+
     # def testPopulateRepository(self):
     #     self.controllerWrapper.populateRepository()
     #     self.assertTrue(len(self.studentController.listStudents()) != 0)
@@ -323,3 +545,272 @@ class TestControllers(TestCase):
     #
     # def testChangesHandlerAbstract(self):
     #     ChangesHandler().handleChanges([], True)
+
+
+class TestFileControllers(TestControllers):
+    """
+    Runs the controller tests against text files which are written after every change
+    """
+
+    def createRepositoryWrapper(self) -> RepositoryWrapper:
+        self.directory = tempfile.TemporaryDirectory()
+        return RepositoryWrapper("text", *[os.path.join(self.directory.name, name)
+                                           for name in ['students', 'grades', 'assignments']])
+
+    def tearDown(self):
+        TestControllers.tearDown(self)
+        self.directory.cleanup()
+
+    def testUndoWritesOnce(self):
+        self.addSampleData()
+        for studentId in range(3, 100):
+            self.studentController.addStudent(studentId, 'Student', 911)
+        self.gradeController.assignToGroup(911, 2)
+        self.studentController.removeStudent(2)
+        with mock.patch.object(TextFileRepository, '_saveList', autospec=True,
+                               side_effect=TextFileRepository._saveList) as saveList:
+            self.controllerWrapper.undo()
+            self.assertEqual(saveList.call_count, 2)
+            saveList.reset_mock()
+            self.controllerWrapper.undo()
+            self.assertEqual(saveList.call_count, 1)
+        self.assertEqual(len(self.gradeController.listAssignmentGrades(2)), 1)
+
+    def testStoredHistory(self):
+        historyLocation = os.path.join(self.directory.name, 'history')
+        self.controllerWrapper = ControllerWrapper(self.repositoryWrapper, date(2018, 11, 18),
+                                                   historyLocation=historyLocation)
+        self.controllerWrapper.getStudentController().addStudent(0, 'Student', 911)
+        self.controllerWrapper.getStudentController().updateStudent(0, 'Name', 912)
+
+        repositoryWrapper = RepositoryWrapper("text", *[os.path.join(self.directory.name, name)
+                                                        for name in ['students', 'grades', 'assignments']])
+        controllerWrapper = ControllerWrapper(repositoryWrapper, date(2018, 11, 18), historyLocation=historyLocation)
+        controllerWrapper.undo()
+        self.assertEqual(controllerWrapper.getStudentController().findStudent(0).getName(), 'Student')
+        controllerWrapper.undo()
+        self.assertEqual(controllerWrapper.getStudentController().countStudents(), 0)
+        self.assertFalse(controllerWrapper.undo())
+        controllerWrapper.redo()
+        controllerWrapper.clearHistory()
+        self.assertFalse(ControllerWrapper(repositoryWrapper, date(2018, 11, 18),
+                                           historyLocation=historyLocation).undo())
+        repositoryWrapper.close()
+
+    def testStoredHistoryCachedFiles(self):
+        repositoryWrapper = RepositoryWrapper("text", *[os.path.join(self.directory.name, name)
+                                                        for name in ['cachedStudents', 'cachedGrades',
+                                                                     'cachedAssignments']], 'close')
+        with self.assertRaises(RepositoryError):
+            ControllerWrapper(repositoryWrapper, date(2018, 11, 18),
+                              historyLocation=os.path.join(self.directory.name, 'history'))
+        repositoryWrapper.close()
+
+    def testStoredHistoryMemory(self):
+        repositoryWrapper = RepositoryWrapper("memory", '', '', '')
+        with self.assertRaises(RepositoryError):
+            ControllerWrapper(repositoryWrapper, date(2018, 11, 18),
+                              historyLocation=os.path.join(self.directory.name, 'history'))
+        repositoryWrapper.close()
+
+
+class TestChangesStack(TestCase):
+
+    class RecordingHandler(ChangesHandler):
+
+        def __init__(self):
+            self.handled = []
+
+        def handleChanges(self, changesList, reverse):
+            self.handled.append(([change.getItem().getStudentId() for change in changesList], reverse))
+
+    def setUp(self):
+        self.handler = TestChangesStack.RecordingHandler()
+
+    def testDepth(self):
+        changesStack = ChangesStack(self.handler, maxDepth=3)
+        for studentId in range(5):
+            changesStack.addChange(ChangesStack.ItemAdded(Student(studentId, 'Student', 911)), newCommit=True)
+        self.assertEqual(changesStack.getDepth(), 3)
+        while changesStack.undo():
+            pass
+        self.assertEqual(self.handler.handled, [([4], True), ([3], True), ([2], True)])
+
+    def testRedoDropped(self):
+        changesStack = ChangesStack(self.handler, maxDepth=3)
+        for studentId in range(3):
+            changesStack.addChange(ChangesStack.ItemAdded(Student(studentId, 'Student', 911)), newCommit=True)
+        changesStack.undo()
+        changesStack.undo()
+        changesStack.addChange(ChangesStack.ItemAdded(Student(3, 'Student', 911)), newCommit=True)
+        self.assertFalse(changesStack.redo())
+        changesStack.addChange(ChangesStack.ItemAdded(Student(4, 'Student', 911)), newCommit=True)
+        changesStack.addChange(ChangesStack.ItemAdded(Student(5, 'Student', 911)), newCommit=True)
+        self.handler.handled = []
+        while changesStack.undo():
+            pass
+        self.assertEqual(self.handler.handled, [([5], True), ([4], True), ([3], True)])
+        self.assertTrue(changesStack.redo())
+        self.assertEqual(self.handler.handled[-1], ([3], False))
+
+    def testByteBudget(self):
+        change = ChangesStack.ItemAdded(Student(0, 'Student', 911))
+        changesStack = ChangesStack(self.handler, maxDepth=100, maxBytes=3 * change.getSize())
+        for studentId in range(10):
+            changesStack.addChange(ChangesStack.ItemAdded(Student(studentId, 'Student', 911)), newCommit=True)
+        self.assertEqual(changesStack.getDepth(), 3)
+        self.assertLessEqual(changesStack.getSize(), 3 * change.getSize())
+        changesStack.beginCommit()
+        for studentId in range(10):
+            changesStack.addChange(ChangesStack.ItemRemoved(Student(studentId, 'Student', 911)))
+        changesStack.endCommit()
+        self.assertEqual(changesStack.getDepth(), 1)
+
+    def testStoredHistory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            historyLocation = os.path.join(directory, 'history')
+            changesStack = ChangesStack(self.handler, maxDepth=2, historyStore=HistoryStore(historyLocation))
+            for studentId in range(5):
+                changesStack.addChange(ChangesStack.ItemAdded(Student(studentId, 'Student', 911)), newCommit=True)
+            changesStack.undo()
+
+            changesStack = ChangesStack(self.handler, maxDepth=2, historyStore=HistoryStore(historyLocation))
+            self.assertEqual(changesStack.getDepth(), 4)
+            self.handler.handled = []
+            while changesStack.undo():
+                pass
+            changesStack.redo()
+            changesStack.redo()
+            self.assertEqual(self.handler.handled, [([3], True), ([2], True), ([1], True), ([0], True),
+                                                    ([0], False), ([1], False)])
+
+            changesStack = ChangesStack(self.handler, maxDepth=2, historyStore=HistoryStore(historyLocation))
+            self.assertEqual(changesStack.getDepth(), 2)
+            self.assertTrue(changesStack.redo())
+            changesStack.addChange(ChangesStack.ItemAdded(Student(5, 'Student', 911)), newCommit=True)
+            self.assertFalse(changesStack.redo())
+            self.assertEqual(HistoryStore(historyLocation).getCount(), 4)
+
+            with open(historyLocation + '.idx', 'ab') as file:
+                file.write(b'\xff' * 16)
+            historyStore = HistoryStore(historyLocation)
+            self.assertEqual(historyStore.getCount(), 4)
+            self.handler.handled = []
+            ChangesStack(self.handler, maxDepth=2, historyStore=historyStore).undo()
+            self.assertEqual(self.handler.handled, [([5], True)])
+
+    def testStoredHistoryLimit(self):
+        with tempfile.TemporaryDirectory() as directory:
+            historyLocation = os.path.join(directory, 'history')
+            changesStack = ChangesStack(self.handler, maxDepth=2, historyStore=HistoryStore(historyLocation, 3))
+            for studentId in range(10):
+                changesStack.addChange(ChangesStack.ItemAdded(Student(studentId, 'Student', 911)), newCommit=True)
+            historyStore = HistoryStore(historyLocation, 3)
+            self.assertEqual((historyStore.getFirst(), historyStore.getCount()), (4, 10))
+            self.assertFalse(os.path.exists(historyLocation + '.log.tmp'))
+
+            changesStack = ChangesStack(self.handler, maxDepth=2, historyStore=historyStore)
+            self.assertEqual(changesStack.getDepth(), 6)
+            self.handler.handled = []
+            while changesStack.undo():
+                pass
+            self.assertEqual(self.handler.handled, [([studentId], True) for studentId in range(9, 3, -1)])
+
+    def testInterruptedCompaction(self):
+        with tempfile.TemporaryDirectory() as directory:
+            historyLocation = os.path.join(directory, 'history')
+            changesStack = ChangesStack(self.handler, maxDepth=2, historyStore=HistoryStore(historyLocation, 3))
+            for studentId in range(5):
+                changesStack.addChange(ChangesStack.ItemAdded(Student(studentId, 'Student', 911)), newCommit=True)
+            # Stopped while writing the new log, before the index was written
+            with open(historyLocation + '.log.tmp', 'wb') as file:
+                file.write(b'[{"change"')
+            historyStore = HistoryStore(historyLocation, 3)
+            self.assertEqual((historyStore.getFirst(), historyStore.getCount()), (0, 5))
+            self.assertFalse(os.path.exists(historyLocation + '.log.tmp'))
+            self.handler.handled = []
+            ChangesStack(self.handler, maxDepth=2, historyStore=historyStore).undo()
+            self.assertEqual(self.handler.handled, [([4], True)])
+
+            for studentId in range(5, 7):
+                changesStack.addChange(ChangesStack.ItemAdded(Student(studentId, 'Student', 911)), newCommit=True)
+            # Stopped after replacing the index, before replacing the log
+            os.replace(historyLocation + '.log', historyLocation + '.log.tmp')
+            with open(historyLocation + '.log', 'wb') as file:
+                file.write(b'[]' * 100)
+            historyStore = HistoryStore(historyLocation, 3)
+            self.assertEqual((historyStore.getFirst(), historyStore.getCount()), (4, 7))
+            self.handler.handled = []
+            changesStack = ChangesStack(self.handler, maxDepth=2, historyStore=historyStore)
+            while changesStack.undo():
+                pass
+            self.assertEqual(self.handler.handled, [([6], True), ([5], True), ([4], True)])
+
+    def testStoredUpdate(self):
+        with tempfile.TemporaryDirectory() as directory:
+            historyLocation = os.path.join(directory, 'history')
+            changesStack = ChangesStack(self.handler, maxDepth=1, historyStore=HistoryStore(historyLocation))
+            changesStack.addChange(ChangesStack.ItemUpdated(Student(1, 'Student', 911), Student(1, 'Name', 912)),
+                                   newCommit=True)
+            changesStack.addChange(ChangesStack.ItemRemoved(Student(1, 'Name', 912)), newCommit=True)
+            with open(historyLocation + '.log', 'rb') as file:
+                self.assertNotIn(b'\x80', file.read())
+
+            changes = []
+            changesStack = ChangesStack(mock.Mock(handleChanges=lambda commit, reverse: changes.extend(commit)),
+                                        maxDepth=1, historyStore=HistoryStore(historyLocation))
+            changesStack.undo()
+            changesStack.undo()
+            self.assertIsInstance(changes[0], ChangesStack.ItemRemoved)
+            self.assertIsInstance(changes[1], ChangesStack.ItemUpdated)
+            self.assertEqual(changes[1].getOldItem().getName(), 'Student')
+            self.assertEqual(changes[1].getItem().getGroup(), 912)
+
+    def testUpdateDelta(self):
+        oldStudent = Student(1, 'Student', 911)
+        newStudent = Student(1, 'Student', 912)
+        change = ChangesStack.ItemUpdated(oldStudent, newStudent)
+        newStudent.setName('Changed')
+        self.assertEqual(change.getItem(), Student(1, 'Student', 912))
+        self.assertEqual(change.getItem().getName(), 'Student')
+        self.assertEqual(change.getOldItem().getGroup(), 911)
+        self.assertLess(change.getSize(), 2 * ChangesStack.ItemAdded(oldStudent).getSize())
+
+
+class TestSQLiteControllers(TestControllers):
+    """
+    Runs the controller tests against an in-memory SQLite database
+    """
+
+    def createRepositoryWrapper(self) -> RepositoryWrapper:
+        return RepositoryWrapper("sqlite", 'students', 'grades', 'assignments')
+
+
+class TestRecordControllers(TestControllers):
+    """
+    Runs the controller tests against record files
+    """
+
+    def createRepositoryWrapper(self) -> RepositoryWrapper:
+        self.directory = tempfile.TemporaryDirectory()
+        return RepositoryWrapper("record", *[os.path.join(self.directory.name, name)
+                                             for name in ['students', 'grades', 'assignments']])
+
+    def tearDown(self):
+        TestControllers.tearDown(self)
+        self.directory.cleanup()
+
+
+class TestControllersWithoutNumPy(TestControllers):
+    """
+    Runs the controller tests with the statistics computed in Python
+    """
+
+    def setUp(self):
+        self.numpyPatch = mock.patch('logic.GradeTable.numpy', None)
+        self.numpyPatch.start()
+        TestControllers.setUp(self)
+
+    def tearDown(self):
+        TestControllers.tearDown(self)
+        self.numpyPatch.stop()
@@ -44,6 +44,17 @@ class TestStudent(TestCase):
         self.assertTrue(student == Student(1, 'Alex', 6))
         self.assertTrue(student == Student(1, 'Other Name', 7))
         self.assertTrue(student != Student(2, 'Other Name', 7))
+        self.assertEqual(len({student, Student(1, 'Other Name', 7), Student(2, 'Alex', 6)}), 2)
+
+    def testRecord(self):
+        record = self.student.toRecord()
+        self.assertEqual(record.getStudentId(), 1)
+        self.assertEqual(record.getName(), 'Alex')
+        self.assertEqual(record.getGroup(), 6)
+        self.assertEqual(str(record), str(self.student))
+        with self.assertRaises(AttributeError):
+            record.name = 'Other Name'
+        self.assertEqual(Student.fromRecord(record), self.student)
 
     def testValidation(self):
         StudentValidator.validateStudent(self.student)
@@ -88,6 +99,14 @@ class TestGrade(TestCase):
         self.assertTrue(grade == Grade(1, 2, 7))
         self.assertTrue(grade != Grade(1, 3, 7))
         self.assertTrue(grade != Grade(3, 2, 7))
+        self.assertEqual(len({grade, Grade(1, 2, 7), Grade(2, 1, 10)}), 2)
+
+    def testRecord(self):
+        record = self.grade.toRecord()
+        self.assertEqual((record.getStudentId(), record.getAssignmentId(), record.getGrade()), (1, 2, 10))
+        self.assertEqual(str(record), str(self.grade))
+        self.assertEqual(str(Grade(3, 4).toRecord()), "3 - 4 - No grade")
+        self.assertEqual(Grade.fromRecord(record), self.grade)
 
 
 class TestAssignment(TestCase):
@@ -118,6 +137,15 @@ class TestAssignment(TestCase):
         self.assertTrue(assignment == Assignment(1, 'Project', date(2018, 7, 11)))
         self.assertTrue(assignment == Assignment(1, 'Other Project', date(2020, 5, 9)))
         self.assertTrue(assignment != Assignment(3, 'Other Project', date(2020, 5, 9)))
+        self.assertEqual(len({assignment, Assignment(1, 'Other Project', date(2020, 5, 9))}), 1)
+
+    def testRecord(self):
+        record = self.assignment.toRecord()
+        self.assertEqual(record.getAssignmentId(), 1)
+        self.assertEqual(record.getDescription(), 'Project')
+        self.assertEqual(record.getDeadline(), date(2018, 7, 11))
+        self.assertEqual(str(record), str(self.assignment))
+        self.assertEqual(Assignment.fromRecord(record), self.assignment)
 
     def testValidation(self):
         AssignmentValidator.validateAssignment(self.assignment)
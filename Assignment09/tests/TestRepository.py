@@ -1,7 +1,29 @@
-from unittest import TestCase
+import os
+import sqlite3
+import tempfile
+import threading
+from datetime import date
+from unittest import TestCase, mock
 
+from lib.CustomComponents import Vector
+from model.Assignment import Assignment
+from model.Grade import Grade, GradeRecord
+from model.Student import Student
+from repository.BinaryRepository import BinaryRepository
+from repository.FlushPolicy import BackgroundFlush, CloseFlush, ImmediateFlush, OperationCountFlush
+from repository.JournalRepository import JournalRepository
+from repository.JsonLinesRepository import JsonLinesRepository
+from repository.JsonRepository import JsonRepository
+from repository.MySQLRepository import MySQLRepository
+from repository.RecordRepository import RecordRepository
 from repository.Repository import Repository
+from repository.SQLiteRepository import SQLiteRepository
 from repository.RepositoryError import *
+from repository.RepositoryWrapper import RepositoryWrapper
+from repository.TextFileRepository import TextFileRepository
+from utils.MySQLConnector import MySQLConnector
+from utils.SQLiteConnector import SQLiteConnector
+from utils.Settings import Settings
 
 
 class TestRepository(TestCase):
@@ -39,3 +61,698 @@ class TestRepository(TestCase):
         self.repository.addItem(6)
         self.repository.updateItem(6)
         self.assertEqual(len(self.repository.getItems()), 1)
+        with self.assertRaises(ItemNotFoundError):
+            self.repository.updateItem(7)
+
+    def testPrimaryKeyIndex(self):
+        repository = Repository(Student)
+        for studentId in range(5):
+            repository.addItem(Student(studentId, 'Name', 911))
+        repository.deleteItem(Student(1))
+        repository.deleteItem(Student(4))
+        self.assertIsNone(repository.getItem(Student(1)))
+        for studentId in [0, 2, 3]:
+            self.assertEqual(repository.getItem(Student(studentId)).getStudentId(), studentId)
+        repository.updateItem(Student(3, 'Other Name', 912))
+        self.assertEqual(repository.getItem(Student(3)).getName(), 'Other Name')
+        with self.assertRaises(DuplicateItemError):
+            repository.addItem(Student(2, 'Name', 911))
+
+    def testFindBy(self):
+        repository = Repository(Grade)
+        for studentId in range(3):
+            for assignmentId in range(4):
+                repository.addItem(Grade(studentId, assignmentId, assignmentId + 1))
+        self.assertEqual(len(repository.findBy(studentId=1)), 4)
+        self.assertEqual(len(repository.findBy(assignmentId=2)), 3)
+        self.assertEqual(len(repository.findBy(studentId=1, assignmentId=2)), 1)
+        self.assertEqual(len(repository.findBy(grade=4)), 3)
+        self.assertEqual(repository.findBy(studentId=7), [])
+        repository.deleteItem(Grade(1, 2))
+        self.assertEqual(len(repository.findBy(studentId=1)), 3)
+        self.assertEqual(len(repository.findBy(assignmentId=2)), 2)
+        self.assertTrue(all(grade.getStudentId() == 1 for grade in repository.findBy(studentId=1)))
+        self.assertEqual(sorted(grade.getAssignmentId() for grade in repository.deleteBy(studentId=1)), [0, 1, 3])
+        self.assertEqual(repository.findBy(studentId=1), [])
+        self.assertEqual(repository.deleteBy(studentId=1), [])
+        self.assertEqual(repository.count(), 8)
+
+    def testBulkOperations(self):
+        repository = Repository(Student)
+        repository.addItems([Student(studentId, 'Name', 911) for studentId in range(5)])
+        with self.assertRaises(DuplicateItemError):
+            repository.addItems([Student(5), Student(6), Student(5)])
+        with self.assertRaises(DuplicateItemError):
+            repository.addItems([Student(6), Student(4)])
+        self.assertEqual(repository.count(), 5)
+
+        repository.updateItems([Student(1, 'Other', 912), Student(2, 'Other', 912)])
+        with self.assertRaises(ItemNotFoundError):
+            repository.updateItems([Student(3, 'Other', 912), Student(7, 'Other', 912)])
+        self.assertEqual(len(repository.findBy(name='Other')), 2)
+
+        with self.assertRaises(ItemNotFoundError):
+            repository.deleteItems([Student(0), Student(7)])
+        repository.deleteItems([Student(0), Student(3), Student(0)])
+        self.assertEqual(sorted(student.getStudentId() for student in repository.getItems()), [1, 2, 4])
+
+    def testCount(self):
+        self.assertTrue(self.repository.isEmpty())
+        self.repository.addItem(3)
+        self.repository.addItem(4)
+        self.assertEqual(self.repository.count(), 2)
+        self.assertFalse(self.repository.isEmpty())
+
+    def testView(self):
+        repository = Repository(Grade)
+        repository.addItem(Grade(1, 1, 7))
+        repository.addItem(Grade(1, 2))
+        records = repository.view()
+        repository.deleteItem(Grade(1, 1))
+        self.assertEqual([(record.getStudentId(), record.getAssignmentId(), record.getGrade()) for record in records],
+                         [(1, 1, 7), (1, 2, None)])
+        self.assertEqual(repository.viewItem(Grade(1, 2)), GradeRecord(1, 2, None))
+        self.assertIsNone(repository.viewItem(Grade(1, 1)))
+        self.assertEqual(list(self.repository.view()), [])
+
+    def testPages(self):
+        repository = Repository(Grade)
+        repository.addItems([Grade(studentId, assignmentId, (studentId + assignmentId) % 3 or None)
+                             for studentId in range(4) for assignmentId in range(3)])
+        self.assertEqual(repository.getPage(0, 3), [Grade(0, 0), Grade(0, 1), Grade(0, 2)])
+        self.assertEqual(repository.getPage(10, 3), [Grade(3, 1), Grade(3, 2)])
+        self.assertEqual(repository.getPage(1, 2, reverse=True), [Grade(3, 1), Grade(3, 0)])
+        self.assertEqual(repository.getPage(0, 5, 'grade'),
+                         [Grade(0, 0), Grade(1, 2), Grade(2, 1), Grade(3, 0), Grade(0, 1)])
+
+        page = repository.getPage(0, 1, 'grade', reverse=True)
+        self.assertEqual([(grade.getStudentId(), grade.getAssignmentId(), grade.getGrade()) for grade in page],
+                         [(3, 2, 2)])
+        page[0].setGrade(None)
+        repository.deleteItem(Grade(3, 2))
+        self.assertEqual(repository.getPage(0, 1, 'grade', reverse=True), [Grade(2, 0)])
+        self.assertEqual(repository.getPage(0, 3, 'grade'),
+                         repository._selectPage(repository.getItemsIter(), 0, 3, 'grade'))
+
+        with self.assertRaises(RepositoryError):
+            repository.getPage(0, 3, 'name')
+        with self.assertRaises(RepositoryError):
+            repository.getPage(-1, 3)
+
+
+class TestCachedFileRepository(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.fileName = os.path.join(self.directory.name, 'students.csv')
+
+    def tearDown(self):
+        self.directory.cleanup()
+        self.directory = None
+
+    def testCloseFlush(self):
+        repository = TextFileRepository(Student, self.fileName, CloseFlush())
+        repository.addItem(Student(1, 'Alex', 911))
+        repository.addItem(Student(2, 'Andrew', 912))
+        self.assertFalse(os.path.exists(self.fileName))
+        self.assertEqual(len(repository.getItems()), 2)
+        repository.close()
+        self.assertEqual(len(TextFileRepository(Student, self.fileName).getItems()), 2)
+
+    def testOperationCountFlush(self):
+        repository = JsonRepository(Student, self.fileName, OperationCountFlush(2))
+        repository.addItem(Student(1, 'Alex', 911))
+        self.assertFalse(os.path.exists(self.fileName))
+        repository.addItem(Student(2, 'Andrew', 912))
+        self.assertEqual(len(JsonRepository(Student, self.fileName).getItems()), 2)
+
+    def testBulkWrite(self):
+        saves = []
+
+        class CountingRepository(TextFileRepository):
+            def _saveList(self, items):
+                saves.append(len(items))
+                TextFileRepository._saveList(self, items)
+
+        repository = CountingRepository(Student, self.fileName)
+        repository.addItems([Student(studentId, 'Name', 911) for studentId in range(10)])
+        repository.deleteItems([Student(3), Student(4)])
+        self.assertEqual(saves, [10, 8])
+        with repository.batch():
+            repository.addItem(Student(10, 'Name', 911))
+            repository.updateItem(Student(10, 'Other', 912))
+            with repository.batch():
+                repository.deleteItem(Student(0))
+            self.assertEqual(repository.count(), 8)
+            self.assertIsNone(TextFileRepository(Student, self.fileName).getItem(Student(10)))
+        self.assertEqual(saves, [10, 8, 8])
+        self.assertEqual(TextFileRepository(Student, self.fileName).getItem(Student(10)).getGroup(), 912)
+
+    def testBackgroundFlush(self):
+        saves = []
+        firstSave = threading.Event()
+        saveStarted = threading.Event()
+
+        class SlowRepository(JsonRepository):
+            def _saveList(self, items):
+                saveStarted.set()
+                firstSave.wait()
+                saves.append(len(items))
+                JsonRepository._saveList(self, items)
+
+        repository = SlowRepository(Student, self.fileName, BackgroundFlush())
+        repository.addItem(Student(0, 'Name', 911))
+        self.assertTrue(saveStarted.wait(5))
+        for studentId in range(1, 20):
+            repository.addItem(Student(studentId, 'Name', 911))
+        self.assertEqual(saves, [])
+        firstSave.set()
+        repository.flush()
+        self.assertLessEqual(len(saves), 3)
+        self.assertEqual(JsonRepository(Student, self.fileName).count(), 20)
+
+        repository.deleteItem(Student(0))
+        repository.close()
+        self.assertEqual(JsonRepository(Student, self.fileName).count(), 19)
+        self.assertFalse(os.path.exists(self.fileName + '.tmp'))
+
+    def testBackgroundFlushSignature(self):
+        repository = JsonRepository(Student, self.fileName, BackgroundFlush())
+        repository.addItem(Student(1, 'Alex', 911))
+        repository.flush()
+        with mock.patch.object(JsonRepository, '_loadList', side_effect=AssertionError("Reloaded")):
+            self.assertEqual(repository.count(), 1)
+        JsonRepository(Student, self.fileName).addItem(Student(2, 'Andrew', 912))
+        self.assertEqual(repository.count(), 2)
+        repository.close()
+
+    def testAtomicWrite(self):
+        class FailingRepository(TextFileRepository):
+            def _saveList(self, items):
+                with self._openReplacement('w', newline='') as file:
+                    file.write('1,Partial')
+                    raise OSError
+
+        TextFileRepository(Student, self.fileName).addItem(Student(1, 'Alex', 911))
+        repository = FailingRepository(Student, self.fileName)
+        with self.assertRaises(OSError):
+            repository.updateItem(Student(1, 'Andrew', 911))
+        self.assertEqual(TextFileRepository(Student, self.fileName).getItem(Student(1)).getName(), 'Alex')
+        self.assertFalse(os.path.exists(self.fileName + '.tmp'))
+
+        repository = FailingRepository(Student, self.fileName, BackgroundFlush())
+        repository.updateItem(Student(1, 'Andrew', 911))
+        with self.assertRaises(OSError):
+            repository.close()
+        self.assertEqual(TextFileRepository(Student, self.fileName).getItem(Student(1)).getName(), 'Alex')
+
+    def testCSVQuoting(self):
+        repository = TextFileRepository(Student, self.fileName)
+        repository.addItem(Student(1, 'Holmes, Sherlock', 911))
+        repository.addItem(Student(2, 'John "Doc" Watson', 912))
+        repository.addItem(Student(3, 'Multi\nline', 913))
+        self.assertEqual(TextFileRepository(Student, self.fileName).count(), 3)
+        names = [student.getName() for student in TextFileRepository(Student, self.fileName).getItemsIter()]
+        self.assertEqual(names, ['Holmes, Sherlock', 'John "Doc" Watson', 'Multi\nline'])
+
+    def testLegacyCSV(self):
+        with open(self.fileName, 'w') as file:
+            file.write("1,Alex,911\n2,Andrew,912\n\n")
+        repository = TextFileRepository(Student, self.fileName)
+        self.assertEqual(repository.getItem(Student(2)).getName(), 'Andrew')
+        self.assertEqual(repository.count(), 2)
+
+    def testItemsIter(self):
+        repository = TextFileRepository(Student, self.fileName)
+        repository.addItems([Student(studentId, 'Name', 911 + studentId % 2) for studentId in range(10)])
+        items = repository.getItemsIter()
+        self.assertEqual(next(items), Student(0))
+        self.assertEqual(sum(1 for student in items if student.getGroup() == 912), 5)
+        cachedRepository = TextFileRepository(Student, self.fileName, CloseFlush())
+        cachedRepository.deleteItem(Student(0))
+        self.assertEqual(len(list(cachedRepository.getItemsIter())), 9)
+        self.assertEqual(len(list(repository.getItemsIter())), 10)
+
+    def testJsonLines(self):
+        repository = JsonLinesRepository(Student, self.fileName)
+        repository.addItem(Student(1, 'Alex', 911))
+        repository.addItems([Student(2, 'Andrew', 912), Student(3, 'John', 913)])
+        with open(self.fileName, 'rb') as file:
+            lines = file.readlines()
+        self.assertEqual(len(lines), 3)
+        with open(self.fileName, 'ab') as file:
+            file.write(lines[0].replace(b'1', b'4').rstrip(b'\n'))
+        repository.addItem(Student(5, 'Ray', 914))
+        repository.updateItem(Student(1, 'Alexandra', 911))
+        items = JsonLinesRepository(Student, self.fileName).getItemsIter()
+        self.assertEqual(sorted(student.getStudentId() for student in items), [1, 2, 3, 4, 5])
+        self.assertEqual(JsonLinesRepository(Student, self.fileName).count(), 5)
+
+    def testJsonLinesCodec(self):
+        repository = JsonLinesRepository(Student, self.fileName)
+        repository.addItem(Student(1, 'Ana "A", Maria', 911))
+        with mock.patch('utils.JSONConverter.orjson', None):
+            repository.addItem(Student(2, 'Șerban', 912))
+            student = JsonLinesRepository(Student, self.fileName).getItem(Student(1))
+            self.assertEqual(student.getName(), 'Ana "A", Maria')
+        self.assertEqual(JsonLinesRepository(Student, self.fileName).getItem(Student(2)).getName(), 'Șerban')
+
+    def testFileCount(self):
+        for repositoryType in [TextFileRepository, JsonRepository, JsonLinesRepository, BinaryRepository]:
+            fileName = os.path.join(self.directory.name, repositoryType.__name__)
+            self.assertTrue(repositoryType(Student, fileName).isEmpty())
+            self.assertEqual(repositoryType(Student, fileName).count(), 0)
+            repository = repositoryType(Student, fileName)
+            repository.addItem(Student(1, 'Alex', 911))
+            repository.addItem(Student(2, 'Andrew', 912))
+            repository.deleteItem(Student(1))
+            repository.deleteItem(Student(2))
+            self.assertTrue(repositoryType(Student, fileName).isEmpty())
+            repository.addItem(Student(3, 'John', 913))
+            repository.addItem(Student(4, 'Ray', 914))
+            self.assertFalse(repositoryType(Student, fileName).isEmpty())
+            self.assertEqual(repositoryType(Student, fileName).count(), 2)
+            self.assertEqual(repositoryType(Student, fileName, CloseFlush()).count(), 2)
+
+    def testBlankJsonFile(self):
+        open(self.fileName, 'w').close()
+        self.assertTrue(JsonRepository(Student, self.fileName).isEmpty())
+        self.assertEqual(JsonRepository(Student, self.fileName).count(), 0)
+        repository = JsonRepository(Student, self.fileName)
+        repository.addItem(Student(1, 'Alex', 911))
+        self.assertEqual(JsonRepository(Student, self.fileName).count(), 1)
+
+    def testFilePages(self):
+        repository = TextFileRepository(Student, self.fileName)
+        repository.addItems([Student(studentId, 'Student ' + str(9 - studentId), 911) for studentId in range(10)])
+        self.assertEqual(repository.getPage(2, 3), [Student(2), Student(3), Student(4)])
+        self.assertEqual(repository.getPage(0, 2, 'name'), [Student(9), Student(8)])
+
+        cachedRepository = TextFileRepository(Student, self.fileName, CloseFlush())
+        self.assertEqual(cachedRepository.getPage(0, 2, 'name', reverse=True), [Student(0), Student(1)])
+        cachedRepository.addItem(Student(10, 'Student 99', 912))
+        self.assertEqual(cachedRepository.getPage(0, 2, 'name', reverse=True), [Student(10), Student(0)])
+        cachedRepository.close()
+
+    def testExternalChange(self):
+        repository = BinaryRepository(Student, self.fileName, ImmediateFlush())
+        repository.addItem(Student(1, 'Alex', 911))
+        otherRepository = BinaryRepository(Student, self.fileName)
+        otherRepository.addItem(Student(2, 'Andrew', 912))
+        otherRepository.addItem(Student(3, 'John', 913))
+        self.assertEqual(len(repository.getItems()), 3)
+
+
+class TestJournalRepository(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.fileName = os.path.join(self.directory.name, 'students.bin')
+
+    def tearDown(self):
+        self.directory.cleanup()
+        self.directory = None
+
+    def reopen(self, compactionSize: int = 1 << 20):
+        repository = JournalRepository(Student, self.fileName, compactionSize)
+        try:
+            return sorted(repository.getItems(), key=lambda student: student.getStudentId())
+        finally:
+            repository.close()
+
+    def testReplay(self):
+        repository = JournalRepository(Student, self.fileName)
+        repository.addItem(Student(1, 'Alex', 911))
+        repository.addItem(Student(2, 'Andrew', 912))
+        repository.addItem(Student(3, 'John', 913))
+        repository.updateItem(Student(2, 'Andrew', 915))
+        repository.deleteItem(Student(1))
+        with self.assertRaises(DuplicateItemError):
+            repository.addItem(Student(3, 'John', 913))
+        repository.close()
+        self.assertFalse(os.path.exists(self.fileName))
+        self.assertEqual(self.reopen(), [Student(2), Student(3)])
+        self.assertEqual(self.reopen()[0].getGroup(), 915)
+
+    def testCompaction(self):
+        repository = JournalRepository(Student, self.fileName, 256)
+        for studentId in range(20):
+            repository.addItem(Student(studentId, 'Name', 911))
+        repository.close()
+        self.assertTrue(os.path.exists(self.fileName))
+        self.assertLessEqual(os.path.getsize(self.fileName + '.log'), 256)
+        self.assertEqual(len(self.reopen(256)), 20)
+
+    def testCount(self):
+        repository = JournalRepository(Student, self.fileName, 256)
+        self.assertTrue(repository.isEmpty())
+        for studentId in range(20):
+            repository.addItem(Student(studentId, 'Name', 911))
+        repository.deleteItems([Student(0), Student(1)])
+        repository.updateItem(Student(2, 'Other', 912))
+        repository.close()
+        repository = JournalRepository(Student, self.fileName, 256)
+        try:
+            with mock.patch.object(Vector, 'fromList', side_effect=AssertionError("Loaded")):
+                self.assertEqual(repository.count(), 18)
+                self.assertFalse(repository.isEmpty())
+            self.assertEqual(len(repository.getItems()), 18)
+            self.assertEqual(repository.count(), 18)
+        finally:
+            repository.close()
+
+    def testTornRecord(self):
+        repository = JournalRepository(Student, self.fileName)
+        repository.addItem(Student(1, 'Alex', 911))
+        repository.addItem(Student(2, 'Andrew', 912))
+        repository.close()
+        size = os.path.getsize(self.fileName + '.log')
+        with open(self.fileName + '.log', 'r+b') as journal:
+            journal.truncate(size - 3)
+        self.assertEqual(self.reopen(), [Student(1)])
+        repository = JournalRepository(Student, self.fileName)
+        repository.addItem(Student(3, 'John', 913))
+        repository.close()
+        self.assertEqual(self.reopen(), [Student(1), Student(3)])
+
+    def testBulkOperations(self):
+        repository = JournalRepository(Student, self.fileName)
+        repository.addItems([Student(studentId, 'Name', 911) for studentId in range(5)])
+        repository.updateItems([Student(1, 'Other', 912)])
+        with repository.batch():
+            repository.deleteItems([Student(0), Student(2)])
+            repository.addItem(Student(5, 'Name', 911))
+        repository.close()
+        self.assertEqual(self.reopen(), [Student(1), Student(3), Student(4), Student(5)])
+        self.assertEqual(self.reopen()[0].getName(), 'Other')
+
+    def testStaleJournal(self):
+        repository = JournalRepository(Student, self.fileName)
+        repository.addItem(Student(1, 'Alex', 911))
+        repository.close()
+        with open(self.fileName + '.log', 'rb') as journal:
+            oldJournal = journal.read()
+        repository = JournalRepository(Student, self.fileName)
+        repository.compact()
+        repository.close()
+        # The program stopped after writing the snapshot, before clearing the journal
+        with open(self.fileName + '.log', 'wb') as journal:
+            journal.write(oldJournal)
+        self.assertEqual(self.reopen(), [Student(1)])
+
+
+class TestSQLiteRepository(TestCase):
+
+    def setUp(self):
+        self.connector = SQLiteConnector(':memory:')
+        self.repository = SQLiteRepository(Grade, 'grades', self.connector)
+
+    def tearDown(self):
+        self.connector.close()
+
+    def testOperations(self):
+        self.assertTrue(self.repository.isEmpty())
+        self.repository.addItem(Grade(1, 1, 10))
+        self.repository.addItem(Grade(1, 2))
+        self.repository.addItem(Grade(2, 1, 5))
+        with self.assertRaises(DuplicateItemError):
+            self.repository.addItem(Grade(1, 1, 4))
+        self.assertEqual(self.repository.count(), 3)
+        self.assertIsNone(self.repository.getItem(Grade(1, 2)).getGrade())
+
+        self.repository.updateItem(Grade(1, 2, 7))
+        self.assertEqual(self.repository.getItem(Grade(1, 2)).getGrade(), 7)
+        self.assertEqual(self.repository.viewItem(Grade(1, 2)), GradeRecord(1, 2, 7))
+        with self.assertRaises(ItemNotFoundError):
+            self.repository.updateItem(Grade(3, 3, 7))
+
+        self.assertEqual(len(self.repository.findBy(studentId=1)), 2)
+        self.assertEqual(self.repository.findBy(studentId=1, assignmentId=2), [Grade(1, 2)])
+        with self.assertRaises(RepositoryError):
+            self.repository.findBy(**{"studentId\" = 1 OR \"grade": 1})
+        self.repository.addItem(Grade(3, 1))
+        self.assertEqual(self.repository.deleteBy(studentId=3), [Grade(3, 1)])
+        self.assertEqual(self.repository.count(), 3)
+
+        self.repository.deleteItem(Grade(1, 1))
+        with self.assertRaises(ItemNotFoundError):
+            self.repository.deleteItem(Grade(1, 1))
+        self.assertEqual(sorted(record.getStudentId() for record in self.repository.view()), [1, 2])
+
+    def testBatch(self):
+        with self.repository.batch():
+            self.repository.addItem(Grade(1, 1, 10))
+            with self.assertRaises(DuplicateItemError):
+                self.repository.addItem(Grade(1, 1, 10))
+            self.repository.addItem(Grade(1, 2, 10))
+        self.assertEqual(self.repository.count(), 2)
+
+        with self.assertRaises(ValueError):
+            with self.repository.batch():
+                self.repository.addItem(Grade(2, 1, 10))
+                self.repository.deleteItem(Grade(1, 1))
+                raise ValueError
+        self.assertEqual(self.repository.count(), 2)
+        self.assertIsNone(self.repository.getItem(Grade(2, 1)))
+
+    def testBulkOperations(self):
+        self.repository.addItems([Grade(1, assignmentId, 10) for assignmentId in range(4)])
+        with self.assertRaises(DuplicateItemError):
+            self.repository.addItems([Grade(2, 1, 10), Grade(1, 1, 10)])
+        self.assertEqual(self.repository.count(), 4)
+
+        self.repository.updateItems([Grade(1, 0, 5), Grade(1, 1, 5)])
+        with self.assertRaises(ItemNotFoundError):
+            self.repository.updateItems([Grade(1, 2, 5), Grade(2, 2, 5)])
+        self.assertEqual(len(self.repository.findBy(grade=5)), 2)
+
+        with self.assertRaises(ItemNotFoundError):
+            self.repository.deleteItems([Grade(1, 0), Grade(2, 2)])
+        with self.repository.batch():
+            self.repository.deleteItems([Grade(1, 0), Grade(1, 1)])
+        self.assertEqual(self.repository.count(), 2)
+
+
+class TestRepositoryWrapper(TestCase):
+
+    def testDefaultSqliteSettings(self):
+        # The settings file is read from the working directory
+        workingDirectory = os.getcwd()
+        os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        try:
+            settings = Settings()
+        finally:
+            os.chdir(workingDirectory)
+        repositoryWrapper = RepositoryWrapper("sqlite", settings["studentRepositoryLocation"],
+                                              settings["gradeRepositoryLocation"],
+                                              settings["assignmentRepositoryLocation"])
+        try:
+            repositoryWrapper.getRepository(Student).addItem(Student(1, 'Name', 911))
+            self.assertFalse(repositoryWrapper.isEmpty())
+        finally:
+            repositoryWrapper.close()
+
+
+class FakeMySQLDriver:
+    """
+    Stand-in for mysql.connector, running the statements on an SQLite database file
+    """
+    IntegrityError = sqlite3.IntegrityError
+
+    class Cursor:
+
+        def __init__(self, cursor):
+            self.__cursor = cursor
+
+        def execute(self, statement, parameters=()):
+            self.__cursor.execute(statement.replace("%s", "?"), parameters)
+
+        def executemany(self, statement, rows):
+            self.__cursor.executemany(statement.replace("%s", "?"), rows)
+
+        def fetchall(self):
+            return self.__cursor.fetchall()
+
+        @property
+        def rowcount(self):
+            return self.__cursor.rowcount
+
+    class Connection:
+
+        def __init__(self, driver, database):
+            self.__driver = driver
+            self.__connection = sqlite3.connect(database, isolation_level=None, check_same_thread=False)
+
+        def cursor(self, prepared=False):
+            if prepared:
+                self.__driver.preparedCursors += 1
+            return FakeMySQLDriver.Cursor(self.__connection.cursor())
+
+        def close(self):
+            self.__connection.close()
+
+    def __init__(self, database):
+        self.__database = database
+        self.connections = 0
+        self.preparedCursors = 0
+
+    def connect(self, autocommit):
+        self.connections += 1
+        return FakeMySQLDriver.Connection(self, self.__database)
+
+
+class TestMySQLRepository(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        database = os.path.join(self.directory.name, 'database.db')
+        connection = sqlite3.connect(database)
+        connection.execute("CREATE TABLE grades (studentId INTEGER, assignmentId INTEGER, grade INTEGER, "
+                           "PRIMARY KEY (studentId, assignmentId))")
+        connection.close()
+        self.driver = FakeMySQLDriver(database)
+        self.connector = MySQLConnector(2, self.driver)
+        self.repository = MySQLRepository(Grade, 'grades', self.connector)
+
+    def tearDown(self):
+        self.connector.close()
+        self.directory.cleanup()
+
+    def testOperations(self):
+        self.assertTrue(self.repository.isEmpty())
+        self.repository.addItem(Grade(1, 1, 10))
+        self.repository.addItem(Grade(1, 2))
+        self.repository.addItem(Grade(2, 1, 5))
+        with self.assertRaises(DuplicateItemError):
+            self.repository.addItem(Grade(1, 1, 4))
+        self.assertFalse(self.repository.isEmpty())
+        self.assertEqual(self.repository.count(), 3)
+        self.assertIsNone(self.repository.getItem(Grade(1, 2)).getGrade())
+
+        self.repository.updateItem(Grade(1, 2, 7))
+        self.assertEqual(self.repository.viewItem(Grade(1, 2)), GradeRecord(1, 2, 7))
+        with self.assertRaises(ItemNotFoundError):
+            self.repository.updateItem(Grade(3, 3, 7))
+
+        self.assertEqual(self.repository.findBy(studentId=1, assignmentId=2), [Grade(1, 2)])
+        with self.assertRaises(RepositoryError):
+            self.repository.findBy(**{"studentId` = 1 OR `grade": 1})
+        self.repository.addItem(Grade(3, 1))
+        self.assertEqual(self.repository.deleteBy(studentId=3), [Grade(3, 1)])
+        self.assertEqual(self.repository.count(), 3)
+
+        self.repository.deleteItem(Grade(1, 1))
+        with self.assertRaises(ItemNotFoundError):
+            self.repository.deleteItem(Grade(1, 1))
+        self.assertEqual(sorted(record.getStudentId() for record in self.repository.view()), [1, 2])
+
+    def testPreparedStatements(self):
+        self.repository.addItems([Grade(1, assignmentId, 10) for assignmentId in range(10)])
+        preparedCursors = self.driver.preparedCursors
+        for assignmentId in range(10):
+            self.repository.getItem(Grade(1, assignmentId))
+            self.repository.updateItem(Grade(1, assignmentId, 5))
+        self.assertEqual(self.driver.preparedCursors, preparedCursors + 2)
+        self.assertEqual(self.driver.connections, 1)
+
+    def testBulkOperations(self):
+        self.repository.addItems([Grade(1, assignmentId, 10) for assignmentId in range(4)])
+        with self.assertRaises(DuplicateItemError):
+            self.repository.addItems([Grade(2, 1, 10), Grade(1, 1, 10)])
+        self.assertEqual(self.repository.count(), 4)
+
+        self.repository.updateItems([Grade(1, 0, 5), Grade(1, 1, 5)])
+        with self.assertRaises(ItemNotFoundError):
+            self.repository.updateItems([Grade(1, 2, 5), Grade(2, 2, 5)])
+        self.assertEqual(len(self.repository.findBy(grade=5)), 2)
+
+        with self.assertRaises(ItemNotFoundError):
+            self.repository.deleteItems([Grade(1, 0), Grade(2, 0)])
+        self.repository.deleteItems([Grade(1, 0), Grade(1, 1)])
+        self.assertEqual(self.repository.count(), 2)
+
+    def testPages(self):
+        self.repository.addItems([Grade(1, assignmentId, assignmentId % 2 or None) for assignmentId in range(5)])
+        self.assertEqual(self.repository.getPage(1, 2), [Grade(1, 1), Grade(1, 2)])
+        self.assertEqual(self.repository.getPage(0, 3, 'grade', reverse=True), [Grade(1, 3), Grade(1, 1), Grade(1, 4)])
+        with self.assertRaises(RepositoryError):
+            self.repository.getPage(0, 3, 'grade` DESC, `studentId')
+
+    def testTransactionPool(self):
+        with self.repository.batch():
+            self.repository.addItem(Grade(1, 1, 10))
+            with self.assertRaises(DuplicateItemError):
+                self.repository.addItems([Grade(1, 2, 10), Grade(1, 1, 10)])
+            self.assertEqual(self.repository.count(), 1)
+            with self.connector.connection() as connection:
+                self.assertEqual(connection.query("SELECT COUNT(*) FROM grades"), [(1,)])
+        self.assertEqual(self.driver.connections, 1)
+
+        with self.assertRaises(ValueError):
+            with self.repository.batch():
+                self.repository.addItem(Grade(2, 1, 10))
+                with self.connector.connection() as first, self.connector.connection() as second:
+                    self.assertIs(first, second)
+                raise ValueError
+        self.assertIsNone(self.repository.getItem(Grade(2, 1)))
+
+        with self.connector.connection() as first, self.connector.connection() as second:
+            self.assertIsNot(first, second)
+        self.assertEqual(self.driver.connections, 2)
+
+
+class TestRecordRepository(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.fileName = os.path.join(self.directory.name, 'records.bin')
+
+    def tearDown(self):
+        self.directory.cleanup()
+        self.directory = None
+
+    def testGrades(self):
+        repository = RecordRepository(Grade, self.fileName)
+        repository.addItems([Grade(studentId, assignmentId, None if assignmentId == 0 else 5)
+                             for studentId in range(100) for assignmentId in range(10)])
+        with self.assertRaises(DuplicateItemError):
+            repository.addItem(Grade(3, 3, 7))
+        repository.updateItem(Grade(3, 3, 7))
+        repository.deleteItems([Grade(0, 0), Grade(99, 9), Grade(50, 5)])
+        with self.assertRaises(ItemNotFoundError):
+            repository.deleteItem(Grade(0, 0))
+        repository.close()
+
+        repository = RecordRepository(Grade, self.fileName)
+        self.assertEqual(repository.count(), 997)
+        self.assertEqual(repository.viewItem(Grade(3, 3)), GradeRecord(3, 3, 7))
+        self.assertIsNone(repository.getItem(Grade(1, 0)).getGrade())
+        self.assertIsNone(repository.getItem(Grade(50, 5)))
+        self.assertEqual(len(repository.findBy(studentId=50)), 9)
+        self.assertEqual(len(repository.findBy(assignmentId=0, grade=None)), 99)
+        self.assertEqual(len(list(repository.view())), 997)
+        repository.close()
+        self.assertEqual(os.path.getsize(self.fileName) % 4096, 0)
+
+    def testVariableRecords(self):
+        repository = RecordRepository(Student, self.fileName)
+        repository.addItems([Student(studentId, 'Name', 911) for studentId in range(10)])
+        repository.updateItem(Student(1, 'A much longer name', 912))
+        repository.updateItem(Student(2, 'Ana', 913))
+        repository.deleteItems([Student(studentId) for studentId in range(3, 9)])
+        repository.close()
+
+        repository = RecordRepository(Student, self.fileName)
+        students = {student.getStudentId(): student for student in repository.getItems()}
+        self.assertEqual(sorted(students), [0, 1, 2, 9])
+        self.assertEqual(students[1].getName(), 'A much longer name')
+        self.assertEqual(students[2].getName(), 'Ana')
+        self.assertEqual(students[2].getGroup(), 913)
+        repository.close()
+
+        repository = RecordRepository(Assignment, os.path.join(self.directory.name, 'assignments.bin'))
+        repository.addItem(Assignment(1, 'Project, part 1', date(2018, 10, 2)))
+        self.assertEqual(repository.getItem(Assignment(1)).getDeadline(), date(2018, 10, 2))
+        repository.close()
+        with self.assertRaises(RepositoryError):
+            RecordRepository(Grade, self.fileName).count()
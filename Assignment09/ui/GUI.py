@@ -14,6 +14,7 @@ from utils.TypeParser import TypeParser
 
 
 class GUI(UI):
+    pageSize = 50
 
     def __init__(self, controllerWrapper: ControllerWrapper):
         UI.__init__(self, controllerWrapper)
@@ -159,12 +160,45 @@ class GUI(UI):
         else:
             raise error
 
+    def showPages(self, title: str, header: str, itemCount: int, getPage: callable, itemToStr: callable):
+        """
+        Shows a list in a window which holds one page of items at a time, read when the page is turned
+        :param getPage: Returns the items of a page, given its offset and size
+        """
+        window = Toplevel(self.__window)
+        window.title(title)
+        text = Text(window, width=80, height=GUI.pageSize + 2)
+        text.pack(padx=10, pady=10)
+        frame = Frame(window)
+        frame.pack(pady=5)
+        pageLabel = Label(frame)
+        pageCount = max(1, (itemCount + GUI.pageSize - 1) // GUI.pageSize)
+        page = 0
+
+        def showPage():
+            output = [header + '\n']
+            for item in getPage(page * GUI.pageSize, GUI.pageSize):
+                output.append(itemToStr(item) + '\n')
+            text.config(state=NORMAL)
+            text.delete('1.0', END)
+            text.insert(END, ''.join(output))
+            text.config(state=DISABLED)
+            pageLabel.config(text="Page " + str(page + 1) + " of " + str(pageCount))
+
+        def turnPage(step: int):
+            nonlocal page
+            if 0 <= page + step < pageCount:
+                page += step
+                showPage()
+
+        Button(frame, text="Previous", command=lambda: turnPage(-1), width=10).pack(side=LEFT)
+        pageLabel.pack(side=LEFT, padx=10)
+        Button(frame, text="Next", command=lambda: turnPage(1), width=10).pack(side=LEFT)
+        showPage()
+
     def listStudents(self):
-        studentList = self.studentController.listStudents()
-        output = ["\nID - Name - Group\n"]
-        for student in studentList:
-            output.append(self.studentToStr(student) + '\n')
-        messagebox.showinfo("Student list", ''.join(output))
+        self.showPages("Student list", "ID - Name - Group", self.studentController.countStudents(),
+                       self.studentController.getStudentPage, self.studentToStr)
 
     @staticmethod
     def studentToStr(student: Student):
@@ -220,11 +254,8 @@ class GUI(UI):
         return gradeString + " - " + str(grade.getAssignmentId())
 
     def listAssignments(self):
-        assignmentList = self.assignmentController.listAssignments()
-        output = ["\nID - Description - Deadline\n"]
-        for assignment in assignmentList:
-            output.append(self.assignmentToStr(assignment) + '\n')
-        messagebox.showinfo("Info", ''.join(output))
+        self.showPages("Assignment list", "ID - Description - Deadline", self.assignmentController.countAssignments(),
+                       self.assignmentController.getAssignmentPage, self.assignmentToStr)
 
     def addAssignment(self):
         assignmentId = self.assignmentId.get()
@@ -329,10 +360,8 @@ class GUI(UI):
 
     def listRepository(self):
         self.listStudents()
-        output = ["\nStudentId - AssignmentId - Grade\n"]
-        for grade in self.controllerWrapper.getGradeController().listGrades():
-            output.append(str(grade) + '\n')
-        messagebox.showinfo("Grade list", ''.join(output))
+        self.showPages("Grade list", "StudentId - AssignmentId - Grade", self.gradeController.countGrades(),
+                       self.gradeController.getGradePage, str)
         self.listAssignments()
 
     def assignToStudent(self):
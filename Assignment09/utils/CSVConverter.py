@@ -1,4 +1,6 @@
-from typing import Union, Type
+import csv
+import io
+from typing import Union, Type, Iterable, Iterator
 
 from model.Validators import *
 from utils.TypeParser import TypeParser
@@ -6,53 +8,88 @@ from utils.TypeParser import TypeParser
 
 class CSVConverter:
     """
-    A utility class to convert to an from CSV format
+    A utility class to convert to an from CSV format.
+    Values are written with the csv module, which quotes the ones containing commas, quotes or line breaks.
+    Files should be opened with newline=''.
     """
+
+    class Dialect(csv.Dialect):
+        delimiter = ','
+        quotechar = '"'
+        doublequote = True
+        skipinitialspace = False
+        lineterminator = '\n'
+        quoting = csv.QUOTE_MINIMAL
+
     @staticmethod
     def convertItemToCSV(item: Union[Student, Grade, Assignment]):
-        toCSV = {
-            Student: CSVConverter.__studentToCSV,
-            Grade: CSVConverter.__gradeToCSV,
-            Assignment: CSVConverter.__assignmentToCSV
-        }
-        return toCSV[type(item)](item)
+        line = io.StringIO()
+        csv.writer(line, CSVConverter.Dialect).writerow(CSVConverter.convertItemToRow(item))
+        return line.getvalue()[:-1]
 
     @staticmethod
     def convertCSVToItem(itemType: Type[Union[Student, Grade, Assignment]], csvString: str):
+        return CSVConverter.convertRowToItem(itemType, next(csv.reader([csvString], CSVConverter.Dialect)))
+
+    @staticmethod
+    def convertItemToRow(item: Union[Student, Grade, Assignment]) -> list:
+        toRow = {
+            Student: CSVConverter.__studentToRow,
+            Grade: CSVConverter.__gradeToRow,
+            Assignment: CSVConverter.__assignmentToRow
+        }
+        return toRow[type(item)](item)
+
+    @staticmethod
+    def convertRowToItem(itemType: Type[Union[Student, Grade, Assignment]], row: list):
         toItem = {
-            Student: CSVConverter.__CSVToStudent,
-            Grade: CSVConverter.__CSVToGrade,
-            Assignment: CSVConverter.__CSVToAssignment
+            Student: CSVConverter.__rowToStudent,
+            Grade: CSVConverter.__rowToGrade,
+            Assignment: CSVConverter.__rowToAssignment
         }
-        return toItem[itemType](csvString)
+        return toItem[itemType](row)
 
     @staticmethod
-    def __studentToCSV(student: Student):
-        return "{:d},{},{}".format(
-            student.getStudentId(),
+    def writeItems(file, items: Iterable):
+        """
+        Writes the items to a text file, one row at a time
+        """
+        csv.writer(file, CSVConverter.Dialect).writerows(map(CSVConverter.convertItemToRow, items))
+
+    @staticmethod
+    def readItems(itemType: Type[Union[Student, Grade, Assignment]], file) -> Iterator:
+        """
+        Reads the items from a text file one row at a time, skipping the empty rows
+        """
+        toItem = CSVConverter.convertRowToItem
+        return (toItem(itemType, row) for row in csv.reader(file, CSVConverter.Dialect) if row)
+
+    @staticmethod
+    def __studentToRow(student: Student):
+        return [
+            "{:d}".format(student.getStudentId()),
             student.getName(),
             student.getGroup()
-        )
+        ]
 
     @staticmethod
-    def __gradeToCSV(grade: Grade):
-        return "{:d},{:d},{}".format(
-            grade.getStudentId(),
-            grade.getAssignmentId(),
-            grade.getGrade()
-        )
+    def __gradeToRow(grade: Grade):
+        return [
+            "{:d}".format(grade.getStudentId()),
+            "{:d}".format(grade.getAssignmentId()),
+            "{}".format(grade.getGrade())
+        ]
 
     @staticmethod
-    def __assignmentToCSV(assignment: Assignment):
-        return "{:d},{},{:%d.%m.%Y}".format(
-            assignment.getAssignmentId(),
+    def __assignmentToRow(assignment: Assignment):
+        return [
+            "{:d}".format(assignment.getAssignmentId()),
             assignment.getDescription(),
-            assignment.getDeadline()
-        )
+            "{:%d.%m.%Y}".format(assignment.getDeadline())
+        ]
 
     @staticmethod
-    def __CSVToStudent(csvString: str):
-        values = csvString.split(',')
+    def __rowToStudent(values: list):
         student = Student(
             TypeParser.parseInt(values[0], InvalidStudentId),
             values[1],
@@ -62,8 +99,7 @@ class CSVConverter:
         return student
 
     @staticmethod
-    def __CSVToGrade(csvString: str):
-        values = csvString.split(',')
+    def __rowToGrade(values: list):
         if values[2] == 'None':
             gradeValue = None
         else:
@@ -77,8 +113,7 @@ class CSVConverter:
         return grade
 
     @staticmethod
-    def __CSVToAssignment(csvString: str):
-        values = csvString.split(',')
+    def __rowToAssignment(values: list):
         assignment = Assignment(
             TypeParser.parseInt(values[0], InvalidAssignmentId),
             values[1],
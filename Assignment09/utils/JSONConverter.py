@@ -7,62 +7,84 @@ from model.ValidationError import InvalidAssignmentDeadline, InvalidAssignmentId
 from model.Validators import StudentValidator, GradeValidator, AssignmentValidator
 from utils.TypeParser import TypeParser
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class JSONConverter:
     """
-    A utility class for converting to and from JSON format
+    A utility class for converting to and from JSON format.
+    Single lines are encoded and decoded with orjson when it is installed, with the json module otherwise.
     """
     @staticmethod
     def convertListToJSON(itemType: type, list) -> str:
-        newList = []
-        for item in list:
-            if itemType is Student:
-                newList.append({
-                    "studentId": item.getStudentId(),
-                    "name": item.getName(),
-                    "group": item.getGroup()
-                })
-            elif itemType is Grade:
-                newList.append({
-                    "studentId": item.getStudentId(),
-                    "assignmentId": item.getAssignmentId(),
-                    "grade": item.getGrade()
-                })
-            elif itemType is Assignment:
-                newList.append({
-                    "assignmentId": item.getAssignmentId(),
-                    "description": item.getDescription(),
-                    "deadline": "{:%d.%m.%Y}".format(item.getDeadline())
-                })
-        return json.dumps(newList, indent=4)
+        return json.dumps([JSONConverter.convertItemToDict(item) for item in list], indent=4)
 
     @staticmethod
     def convertJSONToList(itemType: type, jsonObject):
-        list = json.loads(jsonObject)
-        newList = []
-        newItem = None
-        for item in list:
-            if itemType is Student:
-                newItem = Student(
-                    TypeParser.parseInt(item["studentId"], InvalidStudentId),
-                    item["name"],
-                    TypeParser.parseInt(item["group"], InvalidStudentGroup)
-                )
-                StudentValidator.validateStudent(newItem)
-            elif itemType is Grade:
-                newItem = Grade(
-                    TypeParser.parseInt(item["studentId"], InvalidStudentId),
-                    TypeParser.parseInt(item["assignmentId"], InvalidAssignmentId),
-                    item["grade"]
-                )
-                GradeValidator.validateGrade(newItem)
-            elif itemType is Assignment:
-                newItem = Assignment(
-                    TypeParser.parseInt(item["assignmentId"], InvalidAssignmentId),
-                    item["description"],
-                    TypeParser.parseDate(item["deadline"], InvalidAssignmentDeadline)
-                )
-                AssignmentValidator.validateAssignment(newItem)
-            newList.append(newItem)
+        return [JSONConverter.convertDictToItem(itemType, item) for item in json.loads(jsonObject)]
+
+    @staticmethod
+    def convertItemToLine(item) -> bytes:
+        """
+        Encodes the item as a compact JSON object followed by a line break
+        """
+        if orjson is not None:
+            return orjson.dumps(JSONConverter.convertItemToDict(item), option=orjson.OPT_APPEND_NEWLINE)
+        return (json.dumps(JSONConverter.convertItemToDict(item), separators=(',', ':')) + '\n').encode()
+
+    @staticmethod
+    def convertLineToItem(itemType: type, line: bytes):
+        if orjson is not None:
+            return JSONConverter.convertDictToItem(itemType, orjson.loads(line))
+        return JSONConverter.convertDictToItem(itemType, json.loads(line))
+
+    @staticmethod
+    def convertItemToDict(item) -> dict:
+        itemType = type(item)
+        if itemType is Student:
+            return {
+                "studentId": item.getStudentId(),
+                "name": item.getName(),
+                "group": item.getGroup()
+            }
+        elif itemType is Grade:
+            return {
+                "studentId": item.getStudentId(),
+                "assignmentId": item.getAssignmentId(),
+                "grade": item.getGrade()
+            }
+        elif itemType is Assignment:
+            return {
+                "assignmentId": item.getAssignmentId(),
+                "description": item.getDescription(),
+                "deadline": "{:%d.%m.%Y}".format(item.getDeadline())
+            }
 
-        return newList
+    @staticmethod
+    def convertDictToItem(itemType: type, item: dict):
+        newItem = None
+        if itemType is Student:
+            newItem = Student(
+                TypeParser.parseInt(item["studentId"], InvalidStudentId),
+                item["name"],
+                TypeParser.parseInt(item["group"], InvalidStudentGroup)
+            )
+            StudentValidator.validateStudent(newItem)
+        elif itemType is Grade:
+            newItem = Grade(
+                TypeParser.parseInt(item["studentId"], InvalidStudentId),
+                TypeParser.parseInt(item["assignmentId"], InvalidAssignmentId),
+                item["grade"]
+            )
+            GradeValidator.validateGrade(newItem)
+        elif itemType is Assignment:
+            newItem = Assignment(
+                TypeParser.parseInt(item["assignmentId"], InvalidAssignmentId),
+                item["description"],
+                TypeParser.parseDate(item["deadline"], InvalidAssignmentDeadline)
+            )
+            AssignmentValidator.validateAssignment(newItem)
+        return newItem
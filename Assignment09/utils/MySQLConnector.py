@@ -1,55 +1,295 @@
+import queue
+import threading
+from contextlib import contextmanager
 from typing import List, Tuple
 
-import mysql.connector
-
-from model.Assignment import Assignment
-from model.Grade import Grade
-from model.Student import Student
+from model.Assignment import Assignment, AssignmentRecord
+from model.Grade import Grade, GradeRecord
+from model.Student import Student, StudentRecord
 from model.ValidationError import InvalidAssignmentDeadline
 from repository.RepositoryError import RepositoryError
 from utils.TypeParser import TypeParser
 
+try:
+    import mysql.connector
+    from mysql.connector.constants import ClientFlag
+except ImportError:
+    mysql = None
+
 
 class MySQLConnector:
     """
-    Utility class for using MySQL-backed repositories
+    Utility class for using MySQL-backed repositories. Keeps a pool of connections shared by the repositories,
+    which are opened when first needed, and the transaction every thread takes part in.
+    The connections commit every statement on their own, unless it runs inside a transaction, so every query
+    sees the latest data without ending a snapshot first.
     """
-    def __init__(self):
+
+    __recordTypes = {
+        Student: StudentRecord,
+        Grade: GradeRecord,
+        Assignment: AssignmentRecord
+    }
+
+    __keyColumnCounts = {
+        Student: 1,
+        Grade: 2,
+        Assignment: 1
+    }
+
+    class PooledConnection:
+        """
+        Connection of the pool. Every statement it runs is prepared on the server the first time and reused
+        afterwards, so statements must be built once and passed again as the same string.
+        """
+
+        def __init__(self, connection):
+            self.__connection = connection
+            self.__cursors = {}
+            self.__controlCursor = connection.cursor()
+
+        def query(self, statement: str, parameters: tuple = ()) -> list:
+            """
+            Runs a query and returns all the rows of its result
+            """
+            cursor = self.__prepare(statement)
+            cursor.execute(statement, parameters)
+            return cursor.fetchall()
+
+        def execute(self, statement: str, parameters: tuple = ()) -> int:
+            """
+            Runs a statement changing the table
+            :return: The number of rows matched by the statement
+            """
+            cursor = self.__prepare(statement)
+            cursor.execute(statement, parameters)
+            return cursor.rowcount
+
+        def executeMany(self, statement: str, rows: list) -> int:
+            """
+            Runs a statement changing the table once for every row of parameters
+            :return: The number of rows matched by all the runs of the statement
+            """
+            cursor = self.__prepare(statement)
+            cursor.executemany(statement, rows)
+            return cursor.rowcount
+
+        def insertMany(self, statement: str, rows: list):
+            """
+            Runs an INSERT for all the rows of parameters. The statement is not prepared, so that the driver
+            can send all the rows in a single multiple-row INSERT.
+            """
+            self.__controlCursor.executemany(statement, rows)
+
+        def control(self, statement: str):
+            """
+            Runs a transaction control statement, which cannot be prepared
+            """
+            self.__controlCursor.execute(statement)
+
+        def close(self):
+            self.__connection.close()
+
+        def __prepare(self, statement: str):
+            cursor = self.__cursors.get(statement)
+            if cursor is None:
+                cursor = self.__connection.cursor(prepared=True)
+                self.__cursors[statement] = cursor
+            return cursor
+
+    def __init__(self, poolSize: int = 4, driver=None, **connectionArguments):
+        """
+        :param poolSize: The largest number of connections open at once
+        :param driver: The DB-API module opening the connections, mysql.connector by default
+        :param connectionArguments: The arguments of the connect function of the driver, replacing the default ones
+        """
+        if driver is None:
+            if mysql is None:
+                raise RepositoryError("MySQL Connector/Python is not installed")
+            driver = mysql.connector
+            self.__connectionArguments = {
+                "host": "localhost",
+                "user": "root",
+                "passwd": "",
+                "database": "Assignment08",
+                # Updates report the rows they matched, not only the rows they changed
+                "client_flags": [ClientFlag.FOUND_ROWS]
+            }
+        else:
+            self.__connectionArguments = {}
+        self.__connectionArguments["autocommit"] = True
+        self.__connectionArguments.update(connectionArguments)
+        self.__driver = driver
+        self.__poolSize = max(1, poolSize)
+        self.__openCount = 0
+        self.__idleConnections = queue.LifoQueue()
+        self.__lock = threading.Lock()
+        self.__local = threading.local()
+        self.__rollbackListeners = []
+        self.__release(self.__acquire())
+
+    def getIntegrityError(self) -> type:
+        """
+        Returns the exception raised by the driver when a statement breaks a constraint of a table
+        """
+        return self.__driver.IntegrityError
+
+    @contextmanager
+    def connection(self):
+        """
+        Lends a connection of the pool for the with block. Inside a transaction, this is the connection
+        running the transaction.
+        """
+        current = getattr(self.__local, 'connection', None)
+        if current is not None:
+            yield current
+            return
+        connection = self.__acquire()
+        try:
+            yield connection
+        finally:
+            self.__release(connection)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Runs the statements of the current thread inside the with block in a single transaction, on a single
+        connection, which is committed at the end of the block or rolled back if an exception leaves it.
+        A transaction started inside another one is a savepoint of it: rolling it back undoes only its own
+        statements, and nothing is committed before the outermost transaction ends.
+        """
+        depth = getattr(self.__local, 'depth', 0)
+        connection = self.__acquire() if depth == 0 else self.__local.connection
+        self.__local.connection = connection
+        self.__local.depth = depth + 1
+        savepoint = "level" + str(depth + 1)
+        try:
+            connection.control("BEGIN" if depth == 0 else "SAVEPOINT " + savepoint)
+            try:
+                yield
+            except BaseException:
+                if depth == 0:
+                    connection.control("ROLLBACK")
+                else:
+                    connection.control("ROLLBACK TO " + savepoint)
+                    connection.control("RELEASE SAVEPOINT " + savepoint)
+                for listener in self.__rollbackListeners:
+                    listener()
+                raise
+            else:
+                connection.control("COMMIT" if depth == 0 else "RELEASE SAVEPOINT " + savepoint)
+        finally:
+            self.__local.depth = depth
+            if depth == 0:
+                self.__local.connection = None
+                self.__release(connection)
+
+    def addRollbackListener(self, listener: callable):
+        """
+        Registers a function called after a transaction is rolled back
+        """
+        self.__rollbackListeners.append(listener)
+
+    def close(self):
+        """
+        Closes the connections which are not in use
+        """
+        while True:
+            try:
+                connection = self.__idleConnections.get_nowait()
+            except queue.Empty:
+                return
+            connection.close()
+            with self.__lock:
+                self.__openCount -= 1
+
+    def __acquire(self) -> PooledConnection:
+        """
+        Takes an idle connection, opens a new one while the pool is not full, or waits for one to be released
+        """
+        try:
+            return self.__idleConnections.get_nowait()
+        except queue.Empty:
+            pass
+        with self.__lock:
+            canOpen = self.__openCount < self.__poolSize
+            if canOpen:
+                self.__openCount += 1
+        if not canOpen:
+            return self.__idleConnections.get()
         try:
-            self.__connection = mysql.connector.connect(
-                host="localhost",
-                user="root",
-                passwd="",
-                database="Assignment08"
-            )
+            return MySQLConnector.PooledConnection(self.__driver.connect(**self.__connectionArguments))
         except Exception:
+            with self.__lock:
+                self.__openCount -= 1
             raise RepositoryError("Database connection refused")
 
-    def getConnection(self):
-        return self.__connection
+    def __release(self, connection: PooledConnection):
+        self.__idleConnections.put(connection)
+
+    @staticmethod
+    def quote(identifier: str) -> str:
+        """
+        Quotes a table or column name, which cannot be passed as a statement parameter
+        """
+        if not identifier.replace('_', 'a').isalnum():
+            raise RepositoryError("Invalid name: " + identifier)
+        return '`' + identifier + '`'
+
+    @staticmethod
+    def keyCondition(itemType: type) -> str:
+        """
+        Returns the condition matching an item by its key, with a %s parameter for every key column
+        """
+        if itemType is Student:
+            return "studentId = %s"
+        if itemType is Grade:
+            return "studentId = %s AND assignmentId = %s"
+        if itemType is Assignment:
+            return "assignmentId = %s"
+
+    @staticmethod
+    def updateAssignments(itemType: type) -> str:
+        """
+        Returns the SET clause of an update, with a %s parameter for every column which is not part of the key
+        """
+        if itemType is Student:
+            return "name = %s, `group` = %s"
+        if itemType is Grade:
+            return "grade = %s"
+        if itemType is Assignment:
+            return "description = %s, deadline = %s"
+
+    @staticmethod
+    def getColumns(itemType: type) -> tuple:
+        return MySQLConnector.__recordTypes[itemType]._fields
 
     @staticmethod
-    def idCheckString(item):
+    def getKeyColumnCount(itemType: type) -> int:
+        return MySQLConnector.__keyColumnCounts[itemType]
+
+    @staticmethod
+    def keyParameters(item) -> tuple:
         itemType: type = type(item)
         if itemType is Student:
-            return "studentId = '{}'".format(item.getStudentId())
+            return item.getStudentId(),
         if itemType is Grade:
-            return "studentID = '{}' AND assignmentId = '{}'".format(item.getStudentId(), item.getAssignmentId())
+            return item.getStudentId(), item.getAssignmentId()
         if itemType is Assignment:
-            return "assignmentId = '{}'".format(item.getAssignmentId())
+            return item.getAssignmentId(),
 
     @staticmethod
-    def valuesString(item):
+    def valueParameters(item) -> tuple:
+        """
+        Returns the values of the columns which are not part of the key
+        """
         itemType: type = type(item)
         if itemType is Student:
-            return "'{}', '{}', '{}'".format(item.getStudentId(), item.getName(), item.getGroup())
+            return item.getName(), item.getGroup()
         if itemType is Grade:
-            return "'{}', '{}', '{}'".format(
-                item.getStudentId(),
-                item.getAssignmentId(),
-                item.getGrade() if item.getGrade() is not None else "NULL")
+            return item.getGrade(),
         if itemType is Assignment:
-            return "'{}', '{}', '{:%d.%m.%Y}'".format(item.getAssignmentId(), item.getDescription(), item.getDeadline())
+            return item.getDescription(), "{:%d.%m.%Y}".format(item.getDeadline())
 
     @staticmethod
     def convertTuples(tupleList: List[Tuple], itemType: type):
@@ -66,11 +306,11 @@ class MySQLConnector:
         return newList
 
     @staticmethod
-    def updateString(item):
-        itemType: type = type(item)
+    def convertTuplesToRecords(tupleList: List[Tuple], itemType: type):
         if itemType is Student:
-            return "name = '{}', `group` = '{}'".format(item.getName(), item.getGroup())
+            return [StudentRecord(item[0], item[1], item[2]) for item in tupleList]
         if itemType is Grade:
-            return "grade = '{}'".format(item.getGrade() if item.getGrade() is not None else "NULL")
+            return [GradeRecord(item[0], item[1], item[2] if item[2] != "NULL" else None) for item in tupleList]
         if itemType is Assignment:
-            return "description = '{}', deadline = '{:%d.%m.%Y}'".format(item.getDescription(), item.getDeadline())
+            return [AssignmentRecord(item[0], item[1], TypeParser.parseDate(item[2], InvalidAssignmentDeadline))
+                    for item in tupleList]
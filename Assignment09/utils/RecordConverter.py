@@ -0,0 +1,95 @@
+import struct
+from datetime import date
+
+from model.Assignment import Assignment, AssignmentRecord
+from model.Grade import Grade, GradeRecord
+from model.Student import Student, StudentRecord
+from repository.RepositoryError import RepositoryError
+
+
+class RecordConverter:
+    """
+    Utility class converting items to and from packed binary records.
+    Grades are fixed-width records: studentId, assignmentId, grade (0 for a grade not given yet).
+    Students and assignments start with their integer fields, followed by their text in UTF-8:
+    studentId, group, name and assignmentId, deadline (as a day number), description.
+    """
+
+    __fixedFormats = {
+        Grade: struct.Struct('<qqB'),
+        Student: struct.Struct('<qq'),
+        Assignment: struct.Struct('<qi')
+    }
+
+    __typeCodes = {
+        Grade: 1,
+        Student: 2,
+        Assignment: 3
+    }
+
+    @staticmethod
+    def getTypeCode(itemType: type) -> int:
+        if itemType not in RecordConverter.__typeCodes:
+            raise RepositoryError("No record format for " + itemType.__name__)
+        return RecordConverter.__typeCodes[itemType]
+
+    @staticmethod
+    def isFixedWidth(itemType: type) -> bool:
+        return itemType is Grade
+
+    @staticmethod
+    def getFixedSize(itemType: type) -> int:
+        """
+        Returns the size of a fixed-width record, or of the integer fields of a variable-width one
+        """
+        return RecordConverter.__fixedFormats[itemType].size
+
+    @staticmethod
+    def getFixedFormat(itemType: type) -> struct.Struct:
+        return RecordConverter.__fixedFormats[itemType]
+
+    @staticmethod
+    def packItem(item) -> bytes:
+        itemType = type(item)
+        fixedFormat = RecordConverter.__fixedFormats[itemType]
+        if itemType is Grade:
+            return fixedFormat.pack(item.getStudentId(), item.getAssignmentId(),
+                                    item.getGrade() if item.getGrade() is not None else 0)
+        if itemType is Student:
+            return fixedFormat.pack(item.getStudentId(), item.getGroup()) + RecordConverter.__encode(item.getName())
+        return fixedFormat.pack(item.getAssignmentId(), item.getDeadline().toordinal()) + \
+            RecordConverter.__encode(item.getDescription())
+
+    @staticmethod
+    def unpackKey(itemType: type, buffer, offset: int):
+        """
+        Reads the primary key of the record starting at the given offset, without reading the rest of it
+        """
+        values = RecordConverter.__fixedFormats[itemType].unpack_from(buffer, offset)
+        return (values[0], values[1]) if itemType is Grade else values[0]
+
+    @staticmethod
+    def unpackKeys(itemType: type, buffer):
+        """
+        Reads the primary keys of the fixed-width records filling the buffer
+        """
+        return ((values[0], values[1]) for values in RecordConverter.__fixedFormats[itemType].iter_unpack(buffer))
+
+    @staticmethod
+    def unpackRecord(itemType: type, buffer, offset: int, length: int = None):
+        """
+        Reads the record starting at the given offset
+        :param length: The length of a variable-width record
+        """
+        fixedFormat = RecordConverter.__fixedFormats[itemType]
+        values = fixedFormat.unpack_from(buffer, offset)
+        if itemType is Grade:
+            return GradeRecord(values[0], values[1], values[2] if values[2] != 0 else None)
+        text = bytes(buffer[offset + fixedFormat.size:offset + length]).decode('utf-8')
+        if itemType is Student:
+            return StudentRecord(values[0], text, values[1])
+        return AssignmentRecord(values[0], text, date.fromordinal(values[1]))
+
+    @staticmethod
+    def __encode(text: str) -> bytes:
+        return text.encode('utf-8') if text is not None else b''
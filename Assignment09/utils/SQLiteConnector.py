@@ -0,0 +1,140 @@
+import sqlite3
+from contextlib import contextmanager
+from datetime import date
+
+from model.Assignment import Assignment, AssignmentRecord
+from model.Grade import Grade, GradeRecord
+from model.Student import Student, StudentRecord
+from repository.RepositoryError import RepositoryError
+
+
+class SQLiteConnector:
+    """
+    Utility class for using SQLite-backed repositories. Holds the connection shared by the repositories
+    and the transaction they take part in.
+    The connection commits every statement on its own, unless it runs inside a transaction.
+    """
+
+    __recordTypes = {
+        Student: StudentRecord,
+        Grade: GradeRecord,
+        Assignment: AssignmentRecord
+    }
+
+    __columnTypes = {
+        Student: ("INTEGER NOT NULL", "TEXT", "INTEGER"),
+        Grade: ("INTEGER NOT NULL", "INTEGER NOT NULL", "INTEGER"),
+        Assignment: ("INTEGER NOT NULL", "TEXT", "TEXT")
+    }
+
+    __keyColumnCounts = {
+        Student: 1,
+        Grade: 2,
+        Assignment: 1
+    }
+
+    def __init__(self, databaseLocation: str):
+        """
+        :param databaseLocation: The database file, or ':memory:' for a database which is not saved
+        """
+        try:
+            self.__connection = sqlite3.connect(databaseLocation, isolation_level=None)
+            self.__connection.execute("PRAGMA journal_mode = WAL")
+            self.__connection.execute("PRAGMA synchronous = NORMAL")
+        except sqlite3.Error:
+            raise RepositoryError("Database could not be opened")
+        self.__transactionDepth = 0
+        self.__rollbackListeners = []
+
+    def getConnection(self) -> sqlite3.Connection:
+        return self.__connection
+
+    @contextmanager
+    def transaction(self):
+        """
+        Runs the statements inside the with block in a single transaction, which is committed at the end of
+        the block or rolled back if an exception leaves it. A transaction started inside another one is a
+        savepoint of it: rolling it back undoes only its own statements, and nothing is committed before
+        the outermost transaction ends.
+        """
+        self.__transactionDepth += 1
+        savepoint = "level" + str(self.__transactionDepth)
+        if self.__transactionDepth == 1:
+            self.__connection.execute("BEGIN")
+        else:
+            self.__connection.execute("SAVEPOINT " + savepoint)
+        try:
+            yield
+        except BaseException:
+            if self.__transactionDepth == 1:
+                self.__connection.execute("ROLLBACK")
+            else:
+                self.__connection.execute("ROLLBACK TO " + savepoint)
+                self.__connection.execute("RELEASE " + savepoint)
+            for listener in self.__rollbackListeners:
+                listener()
+            raise
+        else:
+            if self.__transactionDepth == 1:
+                self.__connection.execute("COMMIT")
+            else:
+                self.__connection.execute("RELEASE " + savepoint)
+        finally:
+            self.__transactionDepth -= 1
+
+    def addRollbackListener(self, listener: callable):
+        """
+        Registers a function called after a transaction is rolled back
+        """
+        self.__rollbackListeners.append(listener)
+
+    def createTable(self, itemType: type, tableName: str):
+        columns = SQLiteConnector.getColumns(itemType)
+        keyColumns = columns[:SQLiteConnector.__keyColumnCounts[itemType]]
+        definitions = [SQLiteConnector.quote(column) + " " + columnType
+                       for column, columnType in zip(columns, SQLiteConnector.__columnTypes[itemType])]
+        definitions.append("PRIMARY KEY (" + ", ".join(map(SQLiteConnector.quote, keyColumns)) + ")")
+        self.__connection.execute("CREATE TABLE IF NOT EXISTS " + SQLiteConnector.quote(tableName) +
+                                  " (" + ", ".join(definitions) + ")")
+        if itemType is Grade:
+            # The primary key already serves lookups by studentId
+            indexName = SQLiteConnector.quote(tableName + "_assignmentId")
+            self.__connection.execute("CREATE INDEX IF NOT EXISTS " + indexName +
+                                      " ON " + SQLiteConnector.quote(tableName) + " (\"assignmentId\")")
+
+    def close(self):
+        self.__connection.close()
+
+    @staticmethod
+    def quote(identifier: str) -> str:
+        """
+        Quotes a table or column name, which cannot be passed as a statement parameter
+        """
+        if not identifier.replace('_', 'a').isalnum():
+            raise RepositoryError("Invalid name: " + identifier)
+        return '"' + identifier + '"'
+
+    @staticmethod
+    def getColumns(itemType: type) -> tuple:
+        return SQLiteConnector.__recordTypes[itemType]._fields
+
+    @staticmethod
+    def getKeyColumnCount(itemType: type) -> int:
+        return SQLiteConnector.__keyColumnCounts[itemType]
+
+    @staticmethod
+    def convertItemToRow(item) -> tuple:
+        row = tuple(item.toRecord())
+        if type(item) is Assignment:
+            return row[0], row[1], row[2].isoformat() if row[2] is not None else None
+        return row
+
+    @staticmethod
+    def convertRowToRecord(itemType: type, row: tuple):
+        if itemType is Assignment:
+            return AssignmentRecord(row[0], row[1], date.fromisoformat(row[2]) if row[2] is not None else None)
+        return SQLiteConnector.__recordTypes[itemType]._make(row)
+
+    @staticmethod
+    def convertRowToItem(itemType: type, row: tuple):
+        return itemType.fromRecord(SQLiteConnector.convertRowToRecord(itemType, row))
@@ -5,6 +5,14 @@ class Settings:
             "studentRepositoryLocation": '',
             "gradeRepositoryLocation": '',
             "assignmentRepositoryLocation": '',
+            "flushPolicy": 'none',
+            "flushInterval": '0',
+            "journalCompactionSize": '1048576',
+            "databaseLocation": ':memory:',
+            "connectionPoolSize": '4',
+            "historyDepth": '1000',
+            "historyBytes": '0',
+            "historyLocation": '',
             "ui": 'MenuUI'
         }
         self.__settings = {}